@@ -1,7 +1,8 @@
-from tools.logger import setup_logger
+from tools.logger import setup_logger, summarize
+from tools.results_store import ResultsStore
 import json
 import os
-from typing import Dict, Any, List, TextIO, TypedDict
+from typing import Dict, Any, List, TextIO, TypedDict, Optional
 
 logger = setup_logger()
 
@@ -11,42 +12,50 @@ class EvaluationSummary(TypedDict):
     passed: int
     failed: int
     ui_tests: List[Dict[str, Any]]
+    partial: bool  # Fail-fast stopped the run before every suite finished
+    skipped: Dict[str, List[str]]
 
 class Evaluator:
-    def evaluate(self, test_results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    def evaluate(self, test_results: Dict[str, List[Dict[str, Any]]],
+                 results_store: Optional[ResultsStore] = None, run_id: Optional[str] = None,
+                 skipped: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
         try:
             evaluation_summary: EvaluationSummary = {
                 "total_tests": 0,
                 "passed": 0,
                 "failed": 0,
-                "ui_tests": []
+                "ui_tests": [],
+                "partial": bool(skipped),
+                "skipped": skipped or {}
             }
-            results_file: str = os.path.join("results", "test_logs", "results.json")
-            if os.path.exists(results_file):
-                with open(results_file, "r", encoding="utf-8") as f:  # type
-                    results: Dict[str, List[Dict[str, Any]]] = json.load(f)
+            if results_store is not None and run_id is not None:
+                # Counts are aggregated in the store; only UI rows are pulled for the report. Like the
+                # path below, the counts cover the pytest suites; UI flow rows are reported on their own.
+                evaluation_summary.update(results_store.summary(run_id, ["unit", "integration", "ui"]))
+                evaluation_summary["ui_tests"] = [
+                    {"test_id": test["test_id"], "passed": test["passed"], "details": test["details"]}
+                    for test in results_store.iter_results(run_id, "ui")
+                ]
             else:
-                results = test_results
-
-            for test_type in ["unit", "integration", "ui"]:
-                for test in results.get(test_type, []):  # type
-                    evaluation_summary["total_tests"] += 1
-                    if test.get("passed", False):
-                        evaluation_summary["passed"] += 1
-                    else:
-                        evaluation_summary["failed"] += 1
-                    if test_type == "ui":
-                        evaluation_summary["ui_tests"].append({
-                            "test_id": test.get("test_id", "unknown"),
-                            "passed": test.get("passed", False),
-                            "details": test.get("details", {})
-                        })
+                for test_type in ["unit", "integration", "ui"]:
+                    for test in test_results.get(test_type, []):  # type
+                        evaluation_summary["total_tests"] += 1
+                        if test.get("passed", False):
+                            evaluation_summary["passed"] += 1
+                        else:
+                            evaluation_summary["failed"] += 1
+                        if test_type == "ui":
+                            evaluation_summary["ui_tests"].append({
+                                "test_id": test.get("test_id", "unknown"),
+                                "passed": test.get("passed", False),
+                                "details": test.get("details", {})
+                            })
 
             os.makedirs("results", exist_ok=True)
             with open("results/evaluation_summary.json", "w", encoding="utf-8") as f:  # type
                 json.dump(evaluation_summary, f, indent=2)
 
-            logger.info("Evaluation completed successfully: %s", evaluation_summary)
+            logger.info("Evaluation completed successfully: %s", summarize(evaluation_summary))
             return evaluation_summary
         except Exception as e:
             logger.error(f"Error in evaluation: {str(e)}")
@@ -1,5 +1,6 @@
 from tools.llm import LLM
-from tools.logger import setup_logger
+from tools.logger import setup_logger, summarize
+from tools.impact_index import ImpactIndex
 from tasks import PlannerOutput, UITestFlow
 import json
 from typing import Dict, Any, List, Optional, TypedDict
@@ -39,6 +40,7 @@ class Planner:
         self.ui_config: Dict[str, Any] = ui_config
         self.pr_diff: Dict[str, Any] = pr_diff
         self.llm = LLM()
+        self.impact_index: ImpactIndex = ImpactIndex.from_previous_run(ui_config)
 
     def analyze_ui_config(self) -> Dict[str, List[TestConfig]]:
         try:
@@ -49,6 +51,8 @@ class Planner:
             default_action: ActionConfig = {"type": "unknown", "selector": "unknown", "value": None}
             default_expected: ExpectedResult = {"url": "", "status": "success"}
             for flow in self.ui_config.get("flows", []):  # type
+                if flow.get("setup"):
+                    continue  # Session setup, not a test
                 test_plan["ui_tests"].append({
                     "test_id": f"ui_{flow.get('page', 'unknown')}_{flow.get('actions', [default_action])[0].get('type', 'unknown')}",
                     "page": flow.get("page", "unknown"),
@@ -64,22 +68,46 @@ class Planner:
             logger.error(f"Error analyzing UI config: {str(e)}")
             raise
 
-    def analyze_diff(self) -> Dict[str, List[Dict[str, Any]]]:
+    def changed_files(self) -> List[str]:
+        # Accepts PlannerInput-style "changed_files" or GitHub API-style "files"
+        changed: List[str] = list(self.pr_diff.get("changed_files") or [])
+        for entry in self.pr_diff.get("files", []):  # type
+            changed.append(entry.get("filename", "") if isinstance(entry, dict) else str(entry))
+        return [path for path in changed if path]
+
+    def analyze_diff(self) -> Dict[str, Any]:
         try:
+            run_all: Dict[str, Any] = {"unit_tests": [], "integration_tests": [], "selected_flows": None, "selected_suites": None}
             if not self.pr_diff:
                 logger.info("No PR diff provided, skipping diff analysis")
-                return {"unit_tests": [], "integration_tests": []}
-            return {"unit_tests": [], "integration_tests": []}
+                return run_all
+            changed: List[str] = self.changed_files()
+            if not changed:
+                logger.info("PR diff lists no changed files, running everything")
+                return run_all
+            selection: Dict[str, Any] = self.impact_index.select(changed)
+            if selection["unmapped"] and self.ui_config.get("impact_fallback", "all") == "all":
+                logger.info("Unmapped changed files %s, running everything", summarize(selection["unmapped"]))
+                return run_all
+            logger.info("Diff selects flows %s and suites %s", summarize(selection["flows"]), summarize(selection["suites"]))
+            return {"unit_tests": [], "integration_tests": [],
+                    "selected_flows": selection["flows"], "selected_suites": selection["suites"]}
         except Exception as e:
             logger.error(f"Error analyzing PR diff: {str(e)}")
             raise
 
-    def merge_plans(self, ui_plan: Dict[str, List[Dict[str, Any]]], diff_plan: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    def merge_plans(self, ui_plan: Dict[str, List[Dict[str, Any]]], diff_plan: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            merged_plan: Dict[str, List[Dict[str, Any]]] = {
-                "ui_tests": ui_plan.get("ui_tests", []),
+            selected_flows: Optional[List[str]] = diff_plan.get("selected_flows")
+            ui_tests: List[Dict[str, Any]] = ui_plan.get("ui_tests", [])
+            if selected_flows is not None:
+                ui_tests = [t for t in ui_tests if t.get("test_id") in selected_flows]
+            merged_plan: Dict[str, Any] = {
+                "ui_tests": ui_tests,
                 "unit_tests": ui_plan.get("unit_tests", []) + diff_plan.get("unit_tests", []),
-                "integration_tests": ui_plan.get("integration_tests", []) + diff_plan.get("integration_tests", [])
+                "integration_tests": ui_plan.get("integration_tests", []) + diff_plan.get("integration_tests", []),
+                "selected_flows": selected_flows,
+                "selected_suites": diff_plan.get("selected_suites")
             }
             return merged_plan
         except Exception as e:
@@ -89,13 +117,15 @@ class Planner:
     def plan(self) -> PlannerOutput:
         try:
             ui_plan: Dict[str, List[Dict[str, Any]]] = self.analyze_ui_config()
-            diff_plan: Dict[str, List[Dict[str, Any]]] = self.analyze_diff()
-            test_plan: Dict[str, List[Dict[str, Any]]] = self.merge_plans(ui_plan, diff_plan)
+            diff_plan: Dict[str, Any] = self.analyze_diff()
+            test_plan: Dict[str, Any] = self.merge_plans(ui_plan, diff_plan)
             with open("plan.json", "w") as f:
                 json.dump(test_plan, f, indent=2)
             default_expected: ExpectedResult = {"url": "", "status": "success"}
             output = PlannerOutput(
                 test_plan=test_plan,
+                selected_flows=test_plan.get("selected_flows"),
+                selected_suites=test_plan.get("selected_suites"),
                 unit_tests=[t.get("test_id", "unknown") for t in test_plan.get("unit_tests", [])],  # type: TestConfig
                 integration_tests=[t.get("test_id", "unknown") for t in test_plan.get("integration_tests", [])],  # type: TestConfig
                 ui_tests=[UITestFlow(
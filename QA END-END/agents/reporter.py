@@ -1,26 +1,42 @@
 from tools.logger import setup_logger
-from tools.html_report_generator import generate_html_report, generate_markdown_report
+from tools.html_report_generator import generate_reports, TEST_TYPES
+from tools.results_store import ResultsStore
+import itertools
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterable, Optional
 
 logger = setup_logger()
 
 class Reporter:
-    def generate_report(self, evaluation_results: Dict[str, Any]) -> None:
+    def generate_report(self, evaluation_results: Dict[str, Any],
+                        results_store: Optional[ResultsStore] = None, run_id: Optional[str] = None,
+                        timings: Optional[List[Dict[str, Any]]] = None,
+                        skipped: Optional[Dict[str, List[str]]] = None) -> None:
         try:
             os.makedirs("results", exist_ok=True)
             html_report_path: str = os.path.join("results", "final_report.html")
             md_report_path: str = os.path.join("results", "report_summary.md")
 
-            # Convert evaluation_results to expected format if needed
-            formatted_results: Dict[str, List[Dict[str, Any]]] = {
-                "unit": [],
-                "integration": [],
-                "ui": evaluation_results.get("ui_tests", [])
-            }
+            formatted_results: Dict[str, Iterable[Dict[str, Any]]]
+            if results_store is not None and run_id is not None:
+                # Rows stream from the store straight into the report files
+                formatted_results = {test_type: results_store.iter_results(run_id, test_type) for test_type in TEST_TYPES}
+            else:
+                # Convert evaluation_results to expected format if needed
+                formatted_results = {
+                    "unit": [],
+                    "integration": [],
+                    "ui": evaluation_results.get("ui_tests", [])
+                }
 
-            generate_html_report(formatted_results, html_report_path)
-            generate_markdown_report(formatted_results, md_report_path)
+            for test_type, test_ids in (skipped or {}).items():
+                # Tests fail-fast never ran are listed after the ones that did
+                formatted_results[test_type] = itertools.chain(
+                    formatted_results.get(test_type, []),
+                    [{"test_id": test_id, "skipped": True, "details": {"reason": "fail-fast"}} for test_id in test_ids]
+                )
+
+            generate_reports(formatted_results, html_report_path, md_report_path, timings)
             logger.info(f"Reports generated at {html_report_path} and {md_report_path}")
         except Exception as e:
             logger.error(f"Error generating report: {str(e)}")
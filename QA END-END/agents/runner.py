@@ -1,11 +1,21 @@
-import subprocess
+import asyncio
+import tempfile
 import json
 import os
-from tools.logger import setup_logger
-from typing import Dict, Any, List, TextIO, TypedDict, Optional
+import re
+from tools.coverage_analyzer import CoverageAnalyzer
+from tools.logger import setup_logger, summarize
+from tools.results_store import ResultsStore
+from tools.scheduling import FailurePriority, FailFast, cancel_pending
+from tools.stage_executor import StageExecutor
+from tools.tracer import tracer
+from typing import Dict, Any, List, TextIO, TypedDict, Optional, Set, Callable
 
 logger = setup_logger()
 
+# A failed test or errored setup/teardown in pytest -v output
+_FAILED_LINE = re.compile(r"^\S+::\S+ (FAILED|ERROR)\b")
+
 # Define structure of a single test result from pytest JSON report
 class TestResult(TypedDict):
     nodeid: Optional[str]
@@ -13,38 +23,213 @@ class TestResult(TypedDict):
     call: Optional[Dict[str, Any]]
 
 class TestRunner:
-    def run_tests(self, test_files: Dict[str, str]) -> Dict[str, List[Dict[str, Any]]]:
+    def __init__(self, parallel: bool = True, collect_coverage: bool = True,
+                 results_store: Optional[ResultsStore] = None, run_id: Optional[str] = None,
+                 selected_tests: Optional[Dict[str, List[str]]] = None, flaky_tests: Optional[Set[str]] = None,
+                 flaky_retries: int = 2, priority: Optional[FailurePriority] = None,
+                 fail_fast: Optional[FailFast] = None) -> None:
+        self.parallel: bool = parallel
+        self.collect_coverage: bool = collect_coverage
+        self.results_store: Optional[ResultsStore] = results_store
+        self.run_id: Optional[str] = run_id
+        self.selected_tests: Dict[str, List[str]] = selected_tests or {}  # Per suite, run only these node IDs
+        self.flaky_tests: Set[str] = flaky_tests or set()  # Failures of these are retried one by one
+        self.flaky_retries: int = flaky_retries
+        self.priority: Optional[FailurePriority] = priority  # Orders suites by historical failure rate per second
+        self.fail_fast: FailFast = fail_fast or FailFast()
+        self.skipped: Dict[str, List[str]] = {}  # Suites fail-fast cancelled or never started
+        self.coverage_analyzer = CoverageAnalyzer()
+        if self.collect_coverage and not self.coverage_analyzer.plugin_available():
+            logger.warning("pytest-cov is not installed, running tests without coverage")
+            self.collect_coverage = False
+        self.coverage_data: Optional[Dict[str, Dict[str, Any]]] = None  # Filled by run_tests when collecting
+
+    def _command(self, test_file: str, report_file: str, test_ids: Optional[List[str]] = None) -> List[str]:
+        cmd: List[str] = ["pytest", *(test_ids or [test_file]), "--json-report", f"--json-report-file={report_file}"]
+        if self.fail_fast.enabled:
+            # -v prints one line per test outcome, which _run_suite watches for failures
+            cmd += ["-v", f"--maxfail={max(self.fail_fast.remaining, 1)}"]
+        if self.collect_coverage:
+            cmd += self.coverage_analyzer.coverage_args(self._coverage_file(report_file))
+        return cmd
+
+    @staticmethod
+    def _coverage_file(report_file: str) -> str:
+        return report_file.replace(".json", "_cov.json")
+
+    def _env(self, report_file: str) -> Dict[str, str]:
+        # Concurrent pytest-cov runs must not share the default .coverage data file
+        env: Dict[str, str] = dict(os.environ)
+        if self.collect_coverage:
+            env["COVERAGE_FILE"] = report_file.replace(".json", ".coverage")
+        return env
+
+    def _parse_report(self, test_type: str, report_file: str) -> List[Dict[str, Any]]:
+        if not os.path.exists(report_file):
+            logger.warning(f"No test results generated for {test_type}")
+            return []
+        with open(report_file, "r", encoding="utf-8") as f:  # type
+            test_data: Dict[str, Any] = json.load(f)
+        tests: List[TestResult] = test_data.get("tests", [])  # Explicitly type as List[TestResult]
+        return [
+            {
+                "test_id": test.get("nodeid", "unknown"),
+                "passed": test.get("outcome", "") == "passed",
+                "duration": (test.get("call") or {}).get("duration"),
+                "details": test.get("call", {})
+            } for test in tests  # type: TestResult
+        ]
+
+    def _suites(self, test_files: Dict[str, str], report_dir: str) -> Dict[str, str]:
+        # Each suite reports into its own file in a private temp dir, so suites can run
+        # side by side and concurrent pipelines on one host do not clobber each other.
+        suites: Dict[str, str] = {}
+        for test_type, test_file in test_files.items():  # type
+            if not os.path.exists(test_file):
+                logger.warning(f"Test file {test_file} does not exist, skipping")
+                continue
+            suites[test_type] = os.path.join(report_dir, f"{test_type}.json")
+        if self.priority is not None:
+            test_types: List[str] = list(suites)
+            suites = {test_types[i]: suites[test_types[i]] for i in self.priority.order(test_types)}
+            logger.info("Suite order by failure rate and duration: %s", summarize(list(suites)))
+        return suites
+
+    @staticmethod
+    def _failures(report_file: str) -> int:
         try:
-            results: Dict[str, List[Dict[str, Any]]] = {"unit": [], "integration": [], "ui": []}
-            os.makedirs("results/test_logs", exist_ok=True)
-            results_file: str = os.path.join("results", "test_logs", "results.json")
+            with open(report_file, "r", encoding="utf-8") as f:
+                summary: Dict[str, Any] = json.load(f).get("summary", {})
+        except (OSError, ValueError):
+            return 0
+        return summary.get("failed", 0) + summary.get("error", 0)
 
-            for test_type, test_file in test_files.items():  # type
-                logger.debug(f"Running tests for {test_type}: {test_file}")
-                if not os.path.exists(test_file):
-                    logger.warning(f"Test file {test_file} does not exist, skipping")
-                    continue
-                cmd = ["pytest", test_file, "--json-report", "--json-report-file=tmp.json"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if os.path.exists("tmp.json"):
-                    with open("tmp.json", "r", encoding="utf-8") as f:  # type
-                        test_data: Dict[str, Any] = json.load(f)
-                    tests: List[TestResult] = test_data.get("tests", [])  # Explicitly type as List[TestResult]
-                    results[test_type] = [
-                        {
-                            "test_id": test.get("nodeid", "unknown"),
-                            "passed": test.get("outcome", "") == "passed",
-                            "details": test.get("call", {})
-                        } for test in tests  # type: TestResult
-                    ]
-                    os.remove("tmp.json")
+    def _skip_unfinished(self, test_files: Dict[str, str], suites: Dict[str, str], finished: List[str]) -> None:
+        self.skipped = {test_type: [test_files[test_type]] for test_type in suites if test_type not in finished}
+        if self.skipped:
+            logger.warning("Fail-fast skipped suites: %s", summarize(list(self.skipped)))
+
+    def _collect(self, suites: Dict[str, str]) -> Dict[str, List[Dict[str, Any]]]:
+        results: Dict[str, List[Dict[str, Any]]] = {"unit": [], "integration": [], "ui": []}
+        for test_type, report_file in suites.items():
+            results[test_type] = self._parse_report(test_type, report_file)
+            if self.results_store is not None:
+                self.results_store.add_results(self.run_id, test_type, results[test_type])
+
+        if self.collect_coverage:
+            self.coverage_data = {}
+            for test_type, report_file in suites.items():
+                if os.path.exists(self._coverage_file(report_file)):
+                    self.coverage_data[test_type] = self.coverage_analyzer.load_summary(self._coverage_file(report_file))
                 else:
-                    logger.warning(f"No test results generated for {test_type}")
+                    logger.warning(f"No coverage data generated for {test_type}")
 
+        if self.results_store is None:
+            # Standalone use without a store keeps the legacy results.json output
+            os.makedirs("results/test_logs", exist_ok=True)
+            results_file: str = os.path.join("results", "test_logs", "results.json")
             with open(results_file, "w", encoding="utf-8") as f:  # type
                 json.dump(results, f, indent=2)
-            logger.info("Tests executed successfully: %s", results)
+        return results
+
+    async def _retry_flaky(self, results: Dict[str, List[Dict[str, Any]]], stage_executor: StageExecutor) -> None:
+        """Re-run failed tests known to be flaky, each alone in its own pytest process.
+
+        A retry that passes replaces the failure; either way the result is
+        marked flaky with the number of attempts and the store row is updated.
+        """
+        for test_type, type_results in results.items():
+            retried: List[Dict[str, Any]] = []
+            for i, result in enumerate(type_results):
+                if result.get("passed") or result.get("test_id") not in self.flaky_tests:
+                    continue
+                attempts: int = 1
+                for _ in range(self.flaky_retries):
+                    attempts += 1
+                    with tempfile.TemporaryDirectory(prefix="autotest_retry_") as report_dir:
+                        report_file: str = os.path.join(report_dir, f"{test_type}.json")
+                        with tracer.span("pytest_retry", "pytest", test_id=result["test_id"]) as span:
+                            span["returncode"] = (await stage_executor.run_subprocess(
+                                self._command(result["test_id"], report_file), self._env(report_file)
+                            ))[0]
+                        rerun: List[Dict[str, Any]] = await stage_executor.run_blocking(self._parse_report, test_type, report_file)
+                    if rerun and rerun[0]["passed"]:
+                        result = rerun[0]
+                        break
+                result = dict(result, first_passed=False, details=dict(result.get("details") or {}, flaky=True, attempts=attempts))
+                logger.info(f"Flaky test {result['test_id']} {'passed' if result['passed'] else 'still failed'} after {attempts} attempts")
+                type_results[i] = result
+                retried.append(result)
+            if retried and self.results_store is not None:
+                await stage_executor.run_blocking(self.results_store.add_results, self.run_id, test_type, retried)
+
+    def run_tests(self, test_files: Dict[str, str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Blocking entry point for callers without an event loop; see run_tests_async."""
+        stage_executor = StageExecutor()
+        try:
+            return asyncio.run(self.run_tests_async(test_files, stage_executor))
+        finally:
+            stage_executor.shutdown()
+
+    @staticmethod
+    async def _traced_run(test_type: str, cmd: List[str], env: Dict[str, str], stage_executor: StageExecutor,
+                          on_line: Optional[Callable[[str], None]] = None) -> None:
+        with tracer.span("pytest", "pytest", suite=test_type) as span:
+            span["returncode"] = (await stage_executor.run_subprocess(cmd, env, on_line))[0]
+
+    async def _run_suite(self, test_type: str, test_file: str, report_file: str, stage_executor: StageExecutor) -> None:
+        # The command is built at start, so --maxfail reflects the failures recorded by then
+        cmd: List[str] = self._command(test_file, report_file, self.selected_tests.get(test_type))
+        if not self.fail_fast.enabled:
+            await self._traced_run(test_type, cmd, self._env(report_file), stage_executor)
+            return
+        # Failures count as pytest reports them, so one failing test in a long suite stops
+        # the other suites right away instead of when its own suite ends
+        streamed: List[int] = [0]
+
+        def on_line(line: str) -> None:
+            if _FAILED_LINE.match(line):
+                streamed[0] += 1
+                self.fail_fast.record(1)
+
+        await self._traced_run(test_type, cmd, self._env(report_file), stage_executor, on_line)
+        # The report also counts failures the output did not show per test, e.g. collection errors
+        reported: int = await stage_executor.run_blocking(self._failures, report_file)
+        self.fail_fast.record(reported - streamed[0])
+
+    async def run_tests_async(self, test_files: Dict[str, str], stage_executor: StageExecutor) -> Dict[str, List[Dict[str, Any]]]:
+        """Same as run_tests, but pytest is awaited as asyncio subprocesses and report parsing runs off the loop."""
+        try:
+            self.skipped = {}
+            with tempfile.TemporaryDirectory(prefix="autotest_run_") as report_dir:
+                suites: Dict[str, str] = self._suites(test_files, report_dir)
+                runs: Dict[str, asyncio.Task] = {}
+                # Tripping the budget, here or in the UI stage, kills the suites still running
+                self.fail_fast.on_trip(lambda: cancel_pending(runs.values()))
+                for test_type, report_file in suites.items():
+                    if self.fail_fast.tripped:
+                        break
+                    runs[test_type] = asyncio.create_task(self._run_suite(test_type, test_files[test_type], report_file, stage_executor))
+                    if not self.parallel:
+                        await asyncio.gather(runs[test_type], return_exceptions=True)
+                await asyncio.gather(*runs.values(), return_exceptions=True)
+                for task in runs.values():
+                    if not task.cancelled() and task.exception() is not None:
+                        raise task.exception()
+                finished: List[str] = [test_type for test_type, task in runs.items() if not task.cancelled()]
+                self._skip_unfinished(test_files, suites, finished)
+                results: Dict[str, List[Dict[str, Any]]] = await stage_executor.run_blocking(
+                    self._collect, {test_type: suites[test_type] for test_type in finished}
+                )
+                if not self.fail_fast.tripped:
+                    # A trip in the UI stage also kills the retry in flight
+                    retry: asyncio.Task = asyncio.create_task(self._retry_flaky(results, stage_executor))
+                    self.fail_fast.on_trip(lambda: cancel_pending([retry]))
+                    await asyncio.gather(retry, return_exceptions=True)
+                    if not retry.cancelled() and retry.exception() is not None:
+                        raise retry.exception()
+            logger.info("Tests executed successfully: %s", summarize(results))
             return results
         except Exception as e:
             logger.error(f"Error running tests: {str(e)}")
-            raise
\ No newline at end of file
+            raise
@@ -1,6 +1,10 @@
 from tools.logger import setup_logger
+import hashlib
+import json
 import os
-from typing import Dict, List, Any, TextIO, TypedDict
+import re
+import zlib
+from typing import Dict, List, Any, TextIO, TypedDict, Optional
 
 logger = setup_logger()
 
@@ -21,48 +25,113 @@ class TestConfig(TypedDict):
     actions: List[Dict[str, Any]]
     expected_result: ExpectedResult
 
+# Bump when the generated code changes so every shard is regenerated once
+GENERATOR_VERSION = "2"
+FINGERPRINT_PREFIX = "# fingerprint: "
+
+def _slug(value: str) -> str:
+    return re.sub(r"\W+", "_", value).strip("_") or "unknown"
+
 class TestWriter:
+    """Writes generated tests as content-addressed shards.
+
+    Each test is fingerprinted from its plan entry and each shard records the
+    fingerprint of its tests on its first line. A shard is only rewritten when
+    that fingerprint changes, so untouched shards keep their mtimes and
+    pytest/__pycache__ caches stay valid. UI tests get one shard per flow;
+    unit and integration tests are spread over ``shards`` files by a stable
+    hash of their test ID. The returned paths are the per-type directories.
+    """
+    def __init__(self, shards: int = 4) -> None:
+        self.shards: int = max(1, shards)
+
+    @staticmethod
+    def fingerprint(test_type: str, test: Dict[str, Any], expected_url: str) -> str:
+        payload: str = json.dumps({"version": GENERATOR_VERSION, "type": test_type, "test": test,
+                                   "expected_url": expected_url if test_type == "ui" else None},
+                                  sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _shard_name(self, test_type: str, test: Dict[str, Any]) -> str:
+        test_id: str = str(test.get("test_id", "unknown"))
+        if test_type == "ui":
+            return f"test_{_slug(test_id)}.py"
+        return f"test_{test_type}_{zlib.crc32(test_id.encode('utf-8')) % self.shards}.py"
+
+    @staticmethod
+    def _render_test(test_type: str, test: Dict[str, Any], expected_url: str) -> str:
+        test_id: str = str(test.get("test_id", "unknown"))
+        lines: List[str] = [f"# Test {test_id}", f"def test_{_slug(test_id)}():"]
+        if test_type == "ui":
+            lines.append(f"    # Page: {test.get('page', 'unknown')}")
+            for action in test.get("actions", []):  # type
+                lines.append(f"    # Action: {action.get('type', 'unknown')} - {action.get('selector', 'unknown')}")
+            lines.append(f"    assert {test.get('expected_result', {}).get('url', '')!r} == {expected_url!r}  # UI test assertion")
+        else:
+            lines.append("    assert True  # Mock test")
+        return "\n".join(lines) + "\n\n"
+
+    @staticmethod
+    def _current_fingerprint(path: str) -> Optional[str]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:  # type
+                first_line: str = f.readline().strip()
+        except OSError:
+            return None
+        return first_line[len(FINGERPRINT_PREFIX):] if first_line.startswith(FINGERPRINT_PREFIX) else None
+
     def write_tests(self, planner_output: Dict[str, Any], ui_config: Dict[str, Any]) -> Dict[str, str]:
         try:
-            test_files: Dict[str, str] = {
-                "unit": os.path.join("tests", "unit", "test_unit.py"),
-                "integration": os.path.join("tests", "integration", "test_integration.py"),
-                "ui": os.path.join("tests", "ui", "test_ui.py")
+            test_dirs: Dict[str, str] = {
+                "unit": os.path.join("tests", "unit"),
+                "integration": os.path.join("tests", "integration"),
+                "ui": os.path.join("tests", "ui")
             }
-            logger.debug(f"Ensuring directories for test files: {test_files}")
-            for test_file in test_files.values():
-                os.makedirs(os.path.dirname(test_file), exist_ok=True)
+            logger.debug(f"Ensuring directories for test files: {test_dirs}")
+            for test_dir in test_dirs.values():
+                os.makedirs(test_dir, exist_ok=True)
 
             test_plan: Dict[str, List[Dict[str, Any]]] = planner_output.get("test_plan", {})
-            flows: List[FlowConfig] = ui_config.get("flows", [{}])
+            flows: List[FlowConfig] = ui_config.get("flows", [{}]) or [{}]
             expected_url: str = flows[0].get("expected_result", {}).get("url", "")
+            written: int = 0
+            unchanged: int = 0
 
             for test_type, tests in [
                 ("unit", test_plan.get("unit_tests", [])),
                 ("integration", test_plan.get("integration_tests", [])),
                 ("ui", test_plan.get("ui_tests", []))
             ]:
-                logger.debug(f"Writing tests for {test_type}: {test_files[test_type]}")
-                with open(test_files[test_type], "w", encoding="utf-8") as f:  # type
-                    f.write(f"# {test_type.capitalize()} Tests\n\n")
-                    for test in tests:  # type
-                        test_id: str = test.get("test_id", "unknown")
-                        if test_type == "ui":
-                            page: str = test.get("page", "unknown")
-                            actions: List[Dict[str, Any]] = test.get("actions", [])
-                            f.write(f"# Test {test_id}\n")
-                            f.write(f"def test_{test_id}():\n")
-                            f.write(f"    # Page: {page}\n")
-                            for action in actions:  # type
-                                f.write(f"    # Action: {action.get('type', 'unknown')} - {action.get('selector', 'unknown')}\n")
-                            f.write(f"    assert '{test.get('expected_result', {}).get('url', '')}' == '{expected_url}'  # UI test assertion\n\n")
-                        else:
-                            f.write(f"# Test {test_id}\n")
-                            f.write(f"def test_{test_id}():\n")
-                            f.write("    assert True  # Mock test\n\n")
-
-            logger.info("Tests written successfully: %s", test_files)
-            return test_files
+                shards: Dict[str, List[Dict[str, Any]]] = {}
+                for test in tests:  # type
+                    shards.setdefault(self._shard_name(test_type, test), []).append(test)
+
+                for shard_name, shard_tests in shards.items():
+                    path: str = os.path.join(test_dirs[test_type], shard_name)
+                    shard_fingerprint: str = hashlib.sha256("".join(
+                        self.fingerprint(test_type, test, expected_url) for test in shard_tests
+                    ).encode("utf-8")).hexdigest()
+                    if self._current_fingerprint(path) == shard_fingerprint:
+                        unchanged += 1
+                        continue
+                    logger.debug(f"Writing {test_type} shard {path}")
+                    content: str = f"{FINGERPRINT_PREFIX}{shard_fingerprint}\n# {test_type.capitalize()} Tests\n\n" + "".join(
+                        self._render_test(test_type, test, expected_url) for test in shard_tests
+                    )
+                    tmp_path: str = path + ".tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:  # type
+                        f.write(content)
+                    os.replace(tmp_path, path)
+                    written += 1
+
+                # Drop generated shards that no longer correspond to any test in the plan
+                for name in os.listdir(test_dirs[test_type]):
+                    if name.startswith("test_") and name.endswith(".py") and name not in shards:
+                        if self._current_fingerprint(os.path.join(test_dirs[test_type], name)) is not None:
+                            os.remove(os.path.join(test_dirs[test_type], name))
+
+            logger.info(f"Tests written successfully: {written} shards written, {unchanged} unchanged")
+            return test_dirs
         except Exception as e:
             logger.error(f"Error writing tests: {str(e)}")
             raise
\ No newline at end of file
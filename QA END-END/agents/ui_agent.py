@@ -1,10 +1,20 @@
+from tools.browser_pool import BrowserPool
+from tools.crawler import normalize_url
 from tools.playwright_executor import PlaywrightExecutor
 from tools.screenshot_diff import ScreenshotDiff
-from tools.logger import setup_logger
+from tools.flow_scheduler import FlowScheduler
+from tools.impact_index import flow_test_id
+from tools.logger import setup_logger, summarize
+from tools.scheduling import FailurePriority, FailFast
+from tools.session_manager import SessionManager
+from tools.tracer import tracer
+from tools.work_queue import WorkQueue, LocalWorkQueue
 from tasks import UIAgentOutput, UITestFlow
+import asyncio
 import json
+import multiprocessing
 import os
-from typing import Dict, Any, List, TextIO, Optional, TypedDict
+from typing import Dict, Any, List, TextIO, Optional, TypedDict, Callable, Awaitable, Tuple
 
 logger = setup_logger()
 
@@ -14,13 +24,277 @@ class FlowConfig(TypedDict):
     actions: List[Dict[str, Any]]
     expected_result: Dict[str, str]
     reference_screenshot: Optional[str]
+    setup: Optional[bool]  # Session setup flow: run once, its storage state is shared by the others
+    use_session: Optional[bool]  # False starts the flow logged out, e.g. to test the login itself
+
+def _ui_worker_main(worker_id: int, ui_config: Dict[str, Any], work_queue: WorkQueue,
+                    storage_state: Optional[str], concurrency: int) -> None:
+    # Entry point of a UI worker process: its own event loop and browser, fed from work_queue
+    asyncio.run(_ui_worker_loop(worker_id, ui_config, work_queue, storage_state, concurrency))
+
+async def _ui_worker_loop(worker_id: int, ui_config: Dict[str, Any], work_queue: WorkQueue,
+                          storage_state: Optional[str], concurrency: int) -> None:
+    worker_config: Dict[str, Any] = ui_config.get("workers", {})
+    pool_config: Dict[str, Any] = dict(ui_config.get("browser_pool", {}), size=worker_config.get("browsers_per_worker", 1))
+    tracer.configure_from(ui_config)
+    async with BrowserPool.from_config(dict(ui_config, browser_pool=pool_config)) as browser_pool:
+        agent = UIAgent(ui_config, browser_pool)
+        agent.playwright_executor.storage_state = storage_state
+        await asyncio.gather(*(agent.consume(worker_id, work_queue) for _ in range(concurrency)))
 
 class UIAgent:
-    def __init__(self, ui_config: Dict[str, Any]):
+    def __init__(self, ui_config: Dict[str, Any], browser_pool: Optional[BrowserPool] = None,
+                 selected_flows: Optional[List[str]] = None, flaky_flows: Optional[List[str]] = None,
+                 flaky_retries: int = 0, priority: Optional[FailurePriority] = None,
+                 fail_fast: Optional[FailFast] = None):
         self.ui_config: Dict[str, Any] = ui_config
-        self.playwright_executor = PlaywrightExecutor(ui_config)
-        self.screenshot_diff = ScreenshotDiff()
+        self.selected_flows: Optional[List[str]] = selected_flows  # None runs every configured flow
+        self.flaky_flows: List[str] = flaky_flows or []  # Failures of these are retried one at a time
+        self.flaky_retries: int = flaky_retries
+        self.priority: Optional[FailurePriority] = priority  # Orders flows by historical failure rate per second
+        self.fail_fast: FailFast = fail_fast or FailFast()
+        self.playwright_executor = PlaywrightExecutor(ui_config, browser_pool)
+        self.screenshot_diff = ScreenshotDiff.from_config(ui_config)
         self.screenshots_file: str = os.path.join("results", "screenshots", "screenshots.json")
+        self.flow_scheduler = FlowScheduler.from_config(ui_config)
+        self.session_manager = SessionManager.from_config(ui_config)
+        worker_config: Dict[str, Any] = ui_config.get("workers", {})
+        self.worker_processes: int = worker_config.get("processes", 0)  # 0 keeps everything in this process
+        self.worker_concurrency: int = max(1, worker_config.get("concurrency", 2))
+        self._work_queue: Optional[LocalWorkQueue] = None
+        self._workers: List[multiprocessing.process.BaseProcess] = []
+        self._next_task_id: int = 0
+
+    def _flow_job(self, test_id: str, flow: FlowConfig) -> Callable[[], Awaitable[Dict[str, Any]]]:
+        async def job() -> Dict[str, Any]:
+            screenshot_path: str = os.path.join("results", "screenshots", f"{test_id}_step_1.png")
+            step_screenshots: bool = flow.get("step_screenshots", self.ui_config.get("step_screenshots", False))
+            result: Dict[str, Any] = await self.playwright_executor.execute_flow(flow, screenshot_path, step_screenshots)
+            return {
+                "status": result.get("status", "completed"),
+                "screenshots": result.get("screenshots", []),
+                "steps": result.get("steps", [])
+            }
+        return job
+
+    async def _prepare_session(self) -> str:
+        # Setup flows (e.g. login) run once; every later context starts from their storage state
+        setup_flows: List[Dict[str, Any]] = SessionManager.setup_flows(self.ui_config)
+        if not setup_flows:
+            return "completed"
+        session: Dict[str, Any] = await self.session_manager.ensure(
+            self.ui_config.get("url", ""), setup_flows, self.playwright_executor.run_setup
+        )
+        self.playwright_executor.storage_state = session["storage_state"]
+        return session["status"]
+
+    def _crawl_job(self, test_id: str, result: Dict[str, Any]) -> Callable[[], Awaitable[Dict[str, Any]]]:
+        async def job() -> Dict[str, Any]:
+            screenshot_path: str = os.path.join("results", "screenshots", f"{test_id}_step_1.png")
+            await self.playwright_executor.take_screenshot(screenshot_path, result.get("page"))
+            return {"status": "completed", "screenshots": [screenshot_path]}
+        return job
+
+    def _build_flow(self, name: str, flow: Dict[str, Any], outcome: Dict[str, Any]) -> UITestFlow:
+        job_result: Dict[str, Any] = outcome.get("result") or {}
+        metadata: Dict[str, Any] = {"test_id": outcome["name"], "status": outcome["status"],
+                                    "duration": round(outcome["duration"], 3)}
+        if outcome.get("error"):
+            metadata["error"] = outcome["error"]
+        if outcome.get("attempts"):
+            metadata.update(flaky=True, attempts=outcome["attempts"])
+        if job_result.get("steps"):
+            metadata["steps"] = job_result["steps"]
+        return UITestFlow(
+            name=name,
+            steps=[json.dumps(action) for action in flow.get("actions", [])],
+            success_criteria=json.dumps(flow.get("expected_result", {})),
+            screenshots=job_result.get("screenshots", []),
+            metadata=metadata
+        )
+
+    async def consume(self, worker_id: int, work_queue: WorkQueue) -> None:
+        """Worker side: run tasks from the queue until told to stop, reporting each outcome."""
+        scheduler = FlowScheduler(max_parallel=1, timeout=self.flow_scheduler.timeout)
+        while True:
+            task: Optional[Dict[str, Any]] = await asyncio.to_thread(work_queue.next_task)
+            if task is None:
+                return
+            message: Dict[str, Any] = {"task_id": task["task_id"], "worker": worker_id}
+            if task["kind"] == "visit":
+                try:
+                    entries, discovered = await self.playwright_executor.crawl_page(
+                        task["url"], task["actions"], task["depth"], task["root"], task["max_depth"]
+                    )
+                    message.update(entries=entries, discovered=discovered)
+                except Exception as e:
+                    message.update(entries=[], discovered=[], error=str(e))
+            else:
+                job_factory = self._flow_job if task["kind"] == "flow" else self._crawl_job
+                message["outcome"] = (await scheduler.run([job_factory(task["test_id"], task["item"])], [task["test_id"]]))[0]
+            message["spans"] = tracer.drain()  # Merged into the coordinator's trace by _next_message
+            work_queue.report(message)
+
+    def _start_workers(self, storage_state: Optional[str]) -> None:
+        context = multiprocessing.get_context("spawn")  # Playwright is not fork-safe
+        self._work_queue = LocalWorkQueue(context)
+        # Workers get the HAR mode resolved here: by now "auto" would find this run's own recordings
+        network: Dict[str, Any] = self.ui_config.get("network", {})
+        har: Dict[str, Any] = dict(network.get("har", {}), mode=self.playwright_executor.network_router.har_mode)
+        worker_config: Dict[str, Any] = dict(self.ui_config, network=dict(network, har=har))
+        self._workers = [
+            context.Process(target=_ui_worker_main, name=f"ui-worker-{i}", daemon=True,
+                            args=(i, worker_config, self._work_queue, storage_state, self.worker_concurrency))
+            for i in range(self.worker_processes)
+        ]
+        for worker in self._workers:
+            worker.start()
+        logger.info(f"Started {len(self._workers)} UI worker processes x {self.worker_concurrency} concurrent flows")
+
+    def _stop_workers(self) -> None:
+        if self._work_queue is None:
+            return
+        self._work_queue.shutdown(len(self._workers) * self.worker_concurrency)
+        for worker in self._workers:
+            if self.fail_fast.tripped:
+                worker.terminate()  # Their queued flows were cancelled, so do not wait for them to drain
+            worker.join(timeout=30)
+            if worker.is_alive():
+                logger.warning(f"Terminating unresponsive {worker.name}")
+                worker.terminate()
+        self._work_queue.close()
+        self._work_queue = None
+        self._workers = []
+
+    def _submit(self, task: Dict[str, Any]) -> int:
+        task_id: int = self._next_task_id
+        self._next_task_id += 1
+        self._work_queue.submit(dict(task, task_id=task_id))
+        return task_id
+
+    async def _next_message(self, fail_fast: bool = False) -> Optional[Dict[str, Any]]:
+        # With fail_fast set, None means the budget tripped while waiting
+        while True:
+            message: Optional[Dict[str, Any]] = await asyncio.to_thread(self._work_queue.next_result, 1.0)
+            if message is not None:
+                tracer.merge(message.pop("spans", None))
+                return message
+            if fail_fast and self.fail_fast.tripped:
+                return None
+            if not any(worker.is_alive() for worker in self._workers):
+                raise RuntimeError("All UI worker processes exited with work outstanding")
+
+    async def _run_sharded(self, kind: str, test_ids: List[str], items: List[Dict[str, Any]],
+                           count_failures: bool = True) -> List[Dict[str, Any]]:
+        """Coordinator side: spread jobs over the workers; outcomes come back in submission order."""
+        task_ids: List[int] = [self._submit({"kind": kind, "test_id": test_id, "item": item})
+                               for test_id, item in zip(test_ids, items)]
+        index: Dict[int, int] = {task_id: i for i, task_id in enumerate(task_ids)}
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * len(task_ids)
+        for _ in task_ids:
+            if self.fail_fast.tripped:
+                break
+            message: Optional[Dict[str, Any]] = await self._next_message(fail_fast=True)
+            if message is None:
+                break
+            outcomes[index[message["task_id"]]] = message["outcome"]
+            if count_failures:
+                self._record_outcome(message["outcome"])
+        return [outcome or self._cancelled(test_id) for test_id, outcome in zip(test_ids, outcomes)]
+
+    @staticmethod
+    def _cancelled(test_id: str) -> Dict[str, Any]:
+        return {"name": test_id, "status": "cancelled", "result": None, "error": "Cancelled by fail-fast", "duration": 0.0}
+
+    def _record_outcome(self, outcome: Dict[str, Any]) -> None:
+        if outcome["status"] in ("failed", "timeout"):
+            self.fail_fast.record(1)
+
+    async def _run_jobs(self, kind: str, test_ids: List[str], items: List[Dict[str, Any]],
+                        count_failures: bool = True) -> List[Dict[str, Any]]:
+        if self.fail_fast.tripped:
+            return [self._cancelled(test_id) for test_id in test_ids]
+        if self._workers:
+            return await self._run_sharded(kind, test_ids, items, count_failures)
+        job_factory = self._flow_job if kind == "flow" else self._crawl_job
+        return await self.flow_scheduler.run([job_factory(test_id, item) for test_id, item in zip(test_ids, items)], test_ids,
+                                             on_outcome=self._record_outcome if count_failures else None)
+
+    async def _retry_flaky(self, test_ids: List[str], flows: List[FlowConfig], outcomes: List[Dict[str, Any]]) -> None:
+        # Failed flaky flows get retried one at a time, so a retry never competes with other flows for the browser
+        for i, (test_id, flow) in enumerate(zip(test_ids, flows)):
+            if outcomes[i]["status"] == "completed" or test_id not in self.flaky_flows or self.fail_fast.tripped:
+                continue
+            outcome: Dict[str, Any] = outcomes[i]
+            attempts: int = 1
+            for _ in range(self.flaky_retries):
+                attempts += 1
+                outcome = (await self._run_jobs("flow", [test_id], [flow], count_failures=False))[0]
+                if outcome["status"] == "completed":
+                    break
+            logger.info(f"Flaky flow {test_id} {outcome['status']} after {attempts} attempts")
+            outcomes[i] = dict(outcome, attempts=attempts)
+
+    async def _crawl_sharded(self, depth: int) -> List[Dict[str, Any]]:
+        """Crawl with the frontier spread over the workers; the visited set and page budget stay here."""
+        url: str = self.ui_config["url"]
+        root: Optional[str] = normalize_url(url, url)
+        if root is None:
+            raise ValueError(f"Cannot crawl non-HTTP URL: {url}")
+        max_pages: int = max(1, self.ui_config.get("crawl", {}).get("max_pages", 100))
+        max_depth: int = self.ui_config.get("crawl", {}).get("max_depth", depth)
+        visited: set = {root}
+        keys: Dict[int, Tuple[int, ...]] = {}
+        found: List[Tuple[Tuple[int, ...], List[Dict[str, Any]]]] = []
+
+        def submit(page_url: str, actions: List[Dict[str, Any]], page_depth: int, key: Tuple[int, ...]) -> None:
+            task_id: int = self._submit({"kind": "visit", "url": page_url, "actions": actions, "depth": page_depth,
+                                         "root": root, "max_depth": max_depth})
+            keys[task_id] = key
+
+        submit(root, [], 0, (0,))
+        pending: int = 1
+        while pending:
+            message: Dict[str, Any] = await self._next_message()
+            pending -= 1
+            key: Tuple[int, ...] = keys.pop(message["task_id"])
+            if message.get("error"):
+                logger.warning(f"Worker {message['worker']} failed to crawl a page: {message['error']}")
+                continue
+            found.append((key, message["entries"]))
+            for i, (page_url, actions, page_depth) in enumerate(message["discovered"]):
+                if page_url in visited or len(visited) >= max_pages:
+                    continue
+                visited.add(page_url)
+                submit(page_url, actions, page_depth, key + (i,))
+                pending += 1
+        # Breadth-first discovery order, so results do not depend on which worker finished first
+        results: List[Dict[str, Any]] = [entry for _, entries in sorted(found, key=lambda f: (len(f[0]), f[0])) for entry in entries]
+        logger.info(f"Sharded crawl completed, visited {len(visited)} pages, found {len(results)} actions")
+        return results
+
+    async def _diff_screenshots(self, items: List[Dict[str, Any]], ui_test_flows: List[UITestFlow]) -> List[Dict[str, str]]:
+        # One batch per run: reference hashes come from the cache and decoding runs off the event loop
+        compared: List[Tuple[UITestFlow, str, str]] = [
+            (ui_test_flow, ui_test_flow.screenshots[0], item.get("reference_screenshot", "") or "")
+            for item, ui_test_flow in zip(items, ui_test_flows) if ui_test_flow.screenshots
+        ]
+        results: List[bool] = await asyncio.to_thread(
+            self.screenshot_diff.compare_batch,
+            [(screenshot, reference) for _, screenshot, reference in compared],
+            [item.get("ignore_regions") for item, ui_test_flow in zip(items, ui_test_flows) if ui_test_flow.screenshots]
+        )
+        screenshot_diffs: List[Dict[str, str]] = []
+        for (ui_test_flow, screenshot, reference), passed in zip(compared, results):
+            ui_test_flow.metadata["screenshot_passed"] = passed
+            if reference:
+                screenshot_diff: Dict[str, str] = {"name": ui_test_flow.name, "screenshot": screenshot,
+                                                   "reference": reference, "passed": str(passed)}
+                heatmap: Optional[str] = self.screenshot_diff.details.get(screenshot, {}).get("heatmap")
+                if heatmap:
+                    screenshot_diff["heatmap"] = heatmap
+                screenshot_diffs.append(screenshot_diff)
+        return screenshot_diffs
 
     async def execute_ui_flow(self) -> UIAgentOutput:
         try:
@@ -45,53 +319,65 @@ class UIAgent:
                     ui_test_flows=ui_test_flows,
                     screenshot_diffs=[],
                     login_status="mocked",
-                    generated_test_file=os.path.join("tests", "ui", "test_ui.py"),
+                    generated_test_file=os.path.join("tests", "ui"),
                     results_file=os.path.join("results", "test_logs", "results.json"),
                     screenshots_file=self.screenshots_file
                 )
 
-            if self.ui_config.get("autocrawl", False):
-                depth: int = self.ui_config.get("autocrawl", 2) if isinstance(self.ui_config.get("autocrawl"), int) else 2
-                logger.info(f"Executing autocrawl with depth {depth}")
-                crawl_results: List[Dict[str, Any]] = await self.playwright_executor.crawl(depth)
-                for i, result in enumerate(crawl_results):  # type
-                    test_id: str = f"ui_crawl_{i+1}"
-                    screenshot_path: str = os.path.join("results", "screenshots", f"{test_id}_step_1.png")
-                    await self.playwright_executor.take_screenshot(screenshot_path)
-                    passed: bool = self.screenshot_diff.compare(screenshot_path, result.get("reference_screenshot", ""))
-                    ui_test_flows.append(UITestFlow(
-                        name=f"Crawl Test {test_id}",
-                        steps=[json.dumps(action) for action in result.get("actions", [])],
-                        success_criteria=json.dumps(result.get("expected_result", {})),
-                        screenshots=[screenshot_path]
-                    ))
-                    screenshot_paths.append(screenshot_path)
-            else:
-                for flow in self.ui_config.get("flows", []):  # type
-                    test_id: str = f"ui_{flow.get('page', 'unknown')}_{flow.get('actions', [{}])[0].get('type', 'unknown')}"
-                    result: Dict[str, Any] = await self.playwright_executor.execute_flow(flow)
-                    screenshot_path: str = os.path.join("results", "screenshots", f"{test_id}_step_1.png")
-                    await self.playwright_executor.take_screenshot(screenshot_path)
-                    passed: bool = self.screenshot_diff.compare(screenshot_path, flow.get("reference_screenshot", ""))
-                    ui_test_flows.append(UITestFlow(
-                        name=f"Test for {flow.get('page', 'unknown')}",
-                        steps=[json.dumps(action) for action in flow.get("actions", [])],
-                        success_criteria=json.dumps(flow.get("expected_result", {})),
-                        screenshots=[screenshot_path]
-                    ))
-                    screenshot_paths.append(screenshot_path)
+            self.playwright_executor.network_router.prepare_recording()
+            login_status: str = await self._prepare_session()
+            self.fail_fast.on_trip(self.flow_scheduler.cancel)  # Failures in other stages stop the flows too
+            if self.worker_processes:
+                self._start_workers(self.playwright_executor.storage_state)
+            try:
+                ui_test_flows, screenshot_diffs = await self._execute_flows()
+            finally:
+                self._stop_workers()
+            for ui_test_flow in ui_test_flows:
+                screenshot_paths.extend(ui_test_flow.screenshots or [])
 
             with open(self.screenshots_file, "w", encoding="utf-8") as f:  # type
                 json.dump({"screenshots": screenshot_paths}, f, indent=2)
-            logger.info("UI flow execution completed: %s", ui_test_flows)
+            logger.info("UI flow execution completed: %s", summarize(ui_test_flows))
             return UIAgentOutput(
                 ui_test_flows=ui_test_flows,
-                screenshot_diffs=[],
-                login_status="completed",
-                generated_test_file=os.path.join("tests", "ui", "test_ui.py"),
+                screenshot_diffs=screenshot_diffs,
+                login_status=login_status,
+                generated_test_file=os.path.join("tests", "ui"),
                 results_file=os.path.join("results", "test_logs", "results.json"),
                 screenshots_file=self.screenshots_file
             )
         except Exception as e:
             logger.error(f"Error executing UI flow: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    async def _execute_flows(self) -> Tuple[List[UITestFlow], List[Dict[str, str]]]:
+        # Jobs run on the local scheduler, or on the worker processes when they are started
+        if self.ui_config.get("autocrawl", False):
+            depth: int = self.ui_config.get("autocrawl", 2) if isinstance(self.ui_config.get("autocrawl"), int) else 2
+            logger.info(f"Executing autocrawl with depth {depth}")
+            if self._workers:
+                crawl_results: List[Dict[str, Any]] = await self._crawl_sharded(depth)
+            else:
+                crawl_results = await self.playwright_executor.crawl(depth)
+            test_ids: List[str] = [f"ui_crawl_{i+1}" for i in range(len(crawl_results))]
+            names: List[str] = [f"Crawl Test {test_id}" for test_id in test_ids]
+            outcomes: List[Dict[str, Any]] = await self._run_jobs("crawl", test_ids, crawl_results)
+            ui_test_flows: List[UITestFlow] = [self._build_flow(name, result, outcome) for name, result, outcome in zip(names, crawl_results, outcomes)]
+            return ui_test_flows, await self._diff_screenshots(crawl_results, ui_test_flows)
+
+        flows: List[FlowConfig] = [flow for flow in self.ui_config.get("flows", []) if not flow.get("setup")]
+        if self.selected_flows is not None:
+            flows = [flow for flow in flows if flow_test_id(flow) in self.selected_flows]
+            logger.info(f"Diff-aware selection runs {len(flows)} flows")
+        test_ids = [flow_test_id(flow) for flow in flows]
+        names = [f"Test for {flow.get('page', 'unknown')}" for flow in flows]
+        # Scheduled in priority order, but outcomes are put back in config order for stable output
+        order: List[int] = self.priority.order(test_ids) if self.priority is not None else list(range(len(flows)))
+        scheduled: List[Dict[str, Any]] = await self._run_jobs("flow", [test_ids[i] for i in order], [flows[i] for i in order])
+        outcomes = [{}] * len(flows)
+        for i, outcome in zip(order, scheduled):
+            outcomes[i] = outcome
+        await self._retry_flaky(test_ids, flows, outcomes)
+        ui_test_flows = [self._build_flow(name, flow, outcome) for name, flow, outcome in zip(names, flows, outcomes)]
+        return ui_test_flows, await self._diff_screenshots(flows, ui_test_flows)
\ No newline at end of file
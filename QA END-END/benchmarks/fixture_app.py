@@ -0,0 +1,112 @@
+from tools.logger import setup_logger
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, Any, List, Optional
+
+logger = setup_logger()
+
+PAGE_TEMPLATE: str = """<!DOCTYPE html>
+<html>
+<head><title>{title}</title></head>
+<body>
+<h1 id="title">{title}</h1>
+<nav>
+{links}
+</nav>
+{forms}
+</body>
+</html>
+"""
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # Request logging would dominate the timings being measured
+
+class FixtureApp:
+    """Static fixture site served from a local thread, for offline benchmarks.
+
+    ``index.html`` links to every page; each page links to the next
+    ``links_per_page`` pages (wrapping around) and holds ``forms_per_page``
+    forms with two inputs and a submit button. Element IDs are stable, so
+    flows can be generated against them with ``flows()``.
+    """
+    def __init__(self, pages: int = 10, links_per_page: int = 3, forms_per_page: int = 1,
+                 host: str = "127.0.0.1", port: int = 0) -> None:
+        self.pages: int = pages
+        self.links_per_page: int = links_per_page
+        self.forms_per_page: int = forms_per_page
+        self.host: str = host
+        self.port: int = port
+        self.root: Optional[str] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/index.html"
+
+    def _forms(self, page: int) -> str:
+        return "\n".join(
+            f'<form id="p{page}_f{f}" action="page_{page}.html" method="get">'
+            f'<input id="p{page}_f{f}_name" name="name"><input id="p{page}_f{f}_email" name="email">'
+            f'<button id="p{page}_f{f}_submit" type="submit">Submit</button></form>'
+            for f in range(self.forms_per_page)
+        )
+
+    def _write_site(self, root: str) -> None:
+        links: str = "\n".join(f'<a id="link_{i}" href="page_{i}.html">Page {i}</a>' for i in range(self.pages))
+        with open(os.path.join(root, "index.html"), "w", encoding="utf-8") as f:
+            f.write(PAGE_TEMPLATE.format(title="Fixture index", links=links, forms=""))
+        for page in range(self.pages):
+            targets: List[int] = [(page + k) % self.pages for k in range(1, self.links_per_page + 1)]
+            page_links: str = "\n".join(f'<a id="p{page}_link_{t}" href="page_{t}.html">Page {t}</a>' for t in targets)
+            with open(os.path.join(root, f"page_{page}.html"), "w", encoding="utf-8") as f:
+                f.write(PAGE_TEMPLATE.format(title=f"Page {page}", links=page_links, forms=self._forms(page)))
+
+    def flows(self, count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """UI flows that open a page from the index and submit its first form."""
+        flows: List[Dict[str, Any]] = []
+        for page in range(min(count or self.pages, self.pages)):
+            actions: List[Dict[str, Any]] = [{"type": "click", "selector": f"#link_{page}"}]
+            if self.forms_per_page:
+                actions += [
+                    {"type": "fill", "selector": f"#p{page}_f0_name", "value": "bench"},
+                    {"type": "fill", "selector": f"#p{page}_f0_email", "value": "bench@example.com"},
+                    {"type": "click", "selector": f"#p{page}_f0_submit"}
+                ]
+            flows.append({"page": f"page_{page}", "actions": actions, "expected_result": {"url": f"page_{page}.html"}})
+        return flows
+
+    def start(self) -> "FixtureApp":
+        try:
+            self.root = tempfile.mkdtemp(prefix="autotest_fixture_")
+            self._write_site(self.root)
+            self._server = ThreadingHTTPServer((self.host, self.port), partial(_QuietHandler, directory=self.root))
+            self.port = self._server.server_address[1]
+            self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-app", daemon=True)
+            self._thread.start()
+            logger.info(f"Fixture app with {self.pages} pages serving at {self.url}")
+            return self
+        except Exception as e:
+            logger.error(f"Error starting fixture app: {str(e)}")
+            self.stop()
+            raise
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.root is not None:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.root = None
+
+    def __enter__(self) -> "FixtureApp":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
@@ -0,0 +1,105 @@
+"""Offline pipeline benchmarks against a local fixture app.
+
+    python -m benchmarks.run --sizes 10 50 --repeat 3
+    python -m benchmarks.run --stages crawl flows --fail-on-regression
+
+Each run is appended to benchmarks/results/history.jsonl with the current git
+commit; medians are compared against the previous runs to flag regressions.
+"""
+from benchmarks.stages import BENCHMARKS
+from tools.logger import setup_logger
+from tools.tracer import tracer
+from datetime import datetime
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, Any, List, Optional
+
+logger = setup_logger()
+
+HISTORY_FILE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "history.jsonl")
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+def load_history(history_file: str = HISTORY_FILE) -> List[Dict[str, Any]]:
+    if not os.path.exists(history_file):
+        return []
+    with open(history_file, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def append_history(entry: Dict[str, Any], history_file: str = HISTORY_FILE) -> None:
+    os.makedirs(os.path.dirname(history_file), exist_ok=True)
+    with open(history_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+def find_regressions(results: Dict[str, Dict[str, Any]], history: List[Dict[str, Any]],
+                     baseline_runs: int = 5, tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """Benchmarks whose median is more than ``tolerance`` above the median of the last ``baseline_runs`` runs."""
+    regressions: List[Dict[str, Any]] = []
+    for key, result in results.items():
+        previous: List[float] = [entry["results"][key]["median"] for entry in history if key in entry.get("results", {})]
+        previous = previous[-baseline_runs:]
+        if not previous:
+            continue
+        baseline: float = statistics.median(previous)
+        if baseline > 0 and result["median"] > baseline * (1 + tolerance):
+            regressions.append({"benchmark": key, "median": result["median"], "baseline": baseline,
+                                "change": round(result["median"] / baseline - 1, 3)})
+    return regressions
+
+async def run_benchmarks(stages: List[str], sizes: List[int], repeat: int) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    tracer.enabled = False  # Span bookkeeping is not what is being measured
+    for stage in stages:
+        for size in sizes:
+            samples: List[Dict[str, Any]] = []
+            for _ in range(repeat):
+                samples.append(await BENCHMARKS[stage](size))
+            seconds: List[float] = [sample["seconds"] for sample in samples]
+            results[f"{stage}@{size}"] = {
+                "stage": stage, "size": size, "items": samples[-1].get("items"),
+                "min": round(min(seconds), 4), "median": round(statistics.median(seconds), 4), "samples": len(seconds)
+            }
+            logger.info(f"Benchmark {stage}@{size}: median {results[f'{stage}@{size}']['median']:.4f}s")
+    return results
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages against a local fixture app.")
+    parser.add_argument("--stages", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 50])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline-runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown over baseline, 0.2 = 20%%")
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--no-save", action="store_true", help="Compare against history without appending this run")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    history: List[Dict[str, Any]] = load_history(args.history)
+    results: Dict[str, Dict[str, Any]] = asyncio.run(run_benchmarks(args.stages, args.sizes, args.repeat))
+    regressions: List[Dict[str, Any]] = find_regressions(results, history, args.baseline_runs, args.tolerance)
+    if not args.no_save:
+        append_history({"commit": current_commit(), "timestamp": datetime.now().isoformat(), "results": results},
+                       args.history)
+
+    print(f"{'benchmark':<32}{'items':>8}{'min (s)':>12}{'median (s)':>12}")
+    for key, result in results.items():
+        print(f"{key:<32}{str(result['items']):>8}{result['min']:>12.4f}{result['median']:>12.4f}")
+    for regression in regressions:
+        logger.warning(f"Regression in {regression['benchmark']}: median {regression['median']:.4f}s vs "
+                       f"baseline {regression['baseline']:.4f}s (+{regression['change']:.0%})")
+    return 1 if regressions and args.fail_on_regression else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
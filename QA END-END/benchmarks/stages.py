@@ -0,0 +1,137 @@
+from agents.runner import TestRunner
+from agents.ui_agent import UIAgent
+from benchmarks.fixture_app import FixtureApp
+from crewmaster import CrewMaster
+from tools.browser_pool import BrowserPool
+from tools.html_report_generator import generate_reports
+from tools.logger import setup_logger
+from tools.playwright_executor import PlaywrightExecutor
+from tools.screenshot_diff import ScreenshotDiff, HashCache
+from tools.stage_executor import StageExecutor
+from contextlib import contextmanager
+from PIL import Image
+import json
+import numpy as np
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Any, List, Iterator, Callable, Awaitable
+
+logger = setup_logger()
+
+BASE_CONFIG_FILE: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ui_flow_config.json")
+REPORT_ROWS_PER_SIZE: int = 50  # Reports are cheap per row, so scale them up to measurable sizes
+
+@contextmanager
+def workdir() -> Iterator[str]:
+    """Run a benchmark inside a throwaway directory so results/, tests/ and caches never touch the repo."""
+    previous: str = os.getcwd()
+    path: str = tempfile.mkdtemp(prefix="autotest_bench_")
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(path, ignore_errors=True)
+
+def base_config(app: FixtureApp) -> Dict[str, Any]:
+    with open(BASE_CONFIG_FILE, "r", encoding="utf-8") as f:
+        config: Dict[str, Any] = json.load(f)
+    config.update({"url": app.url, "autocrawl": False, "flows": app.flows()})
+    config["crawl"] = dict(config.get("crawl", {}), max_pages=app.pages + 1)
+    config["tracing"] = {"enabled": False}
+    return config
+
+async def _warm_pool(pool: BrowserPool) -> None:
+    # Launch cost is a benchmark of its own (see e2e); keep it out of the stage timings
+    async with pool.context():
+        pass
+
+async def bench_crawl(size: int) -> Dict[str, Any]:
+    with workdir(), FixtureApp(pages=size) as app:
+        config: Dict[str, Any] = base_config(app)
+        async with BrowserPool.from_config(config) as pool:
+            await _warm_pool(pool)
+            start: float = time.perf_counter()
+            flows: List[Dict[str, Any]] = await PlaywrightExecutor(config, pool).crawl(2)
+            return {"seconds": time.perf_counter() - start, "items": len(flows)}
+
+async def bench_flows(size: int) -> Dict[str, Any]:
+    with workdir(), FixtureApp(pages=size) as app:
+        config: Dict[str, Any] = base_config(app)
+        async with BrowserPool.from_config(config) as pool:
+            await _warm_pool(pool)
+            start: float = time.perf_counter()
+            output = await UIAgent(config, pool).execute_ui_flow()
+            return {"seconds": time.perf_counter() - start, "items": len(output.ui_test_flows)}
+
+def _screenshot_pairs(size: int, width: int = 1280, height: int = 720) -> List[tuple]:
+    rng = np.random.default_rng(size)
+    pairs: List[tuple] = []
+    for i in range(size):
+        reference: np.ndarray = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        captured: np.ndarray = reference.copy()
+        captured[:40, :200] = 255  # Small localized change, like a banner
+        Image.fromarray(reference).save(f"ref_{i}.png")
+        Image.fromarray(captured).save(f"shot_{i}.png")
+        pairs.append((f"shot_{i}.png", f"ref_{i}.png"))
+    return pairs
+
+async def _bench_screenshot_diff(size: int, mode: str) -> Dict[str, Any]:
+    with workdir():
+        pairs: List[tuple] = _screenshot_pairs(size)
+        diff = ScreenshotDiff(hash_cache=HashCache(), mode=mode, pixel_options={"write_heatmap": False})
+        start: float = time.perf_counter()
+        results: List[bool] = diff.compare_batch(pairs)
+        return {"seconds": time.perf_counter() - start, "items": len(results)}
+
+async def bench_screenshot_diff_hash(size: int) -> Dict[str, Any]:
+    return await _bench_screenshot_diff(size, "hash")
+
+async def bench_screenshot_diff_pixel(size: int) -> Dict[str, Any]:
+    return await _bench_screenshot_diff(size, "pixel")
+
+async def bench_pytest(size: int) -> Dict[str, Any]:
+    with workdir():
+        test_files: Dict[str, str] = {}
+        for test_type in ("unit", "integration", "ui"):
+            path: str = f"test_bench_{test_type}.py"
+            with open(path, "w", encoding="utf-8") as f:
+                for i in range(size):
+                    f.write(f"def test_{test_type}_{i}():\n    assert {i} + 1 == {i + 1}\n\n")
+            test_files[test_type] = path
+        executor = StageExecutor()
+        try:
+            start: float = time.perf_counter()
+            results = await TestRunner(collect_coverage=False).run_tests_async(test_files, executor)
+            return {"seconds": time.perf_counter() - start, "items": sum(len(r) for r in results.values())}
+        finally:
+            executor.shutdown()
+
+async def bench_report(size: int) -> Dict[str, Any]:
+    with workdir():
+        rows: int = size * REPORT_ROWS_PER_SIZE
+        evaluation_results: Dict[str, List[Dict[str, Any]]] = {
+            "ui": [{"test_id": f"ui_{i}", "passed": i % 7 != 0, "details": {"log": "x" * (i % 500)}} for i in range(rows)]
+        }
+        start: float = time.perf_counter()
+        generate_reports(evaluation_results, "report.html", "report.md")
+        return {"seconds": time.perf_counter() - start, "items": rows}
+
+async def bench_e2e(size: int) -> Dict[str, Any]:
+    with workdir(), FixtureApp(pages=size) as app:
+        config: Dict[str, Any] = base_config(app)
+        start: float = time.perf_counter()
+        await CrewMaster(config, {}).run()
+        return {"seconds": time.perf_counter() - start, "items": len(config["flows"])}
+
+BENCHMARKS: Dict[str, Callable[[int], Awaitable[Dict[str, Any]]]] = {
+    "crawl": bench_crawl,
+    "flows": bench_flows,
+    "screenshot_diff_hash": bench_screenshot_diff_hash,
+    "screenshot_diff_pixel": bench_screenshot_diff_pixel,
+    "pytest": bench_pytest,
+    "report": bench_report,
+    "e2e": bench_e2e
+}
@@ -5,13 +5,78 @@ from agents.ui_agent import UIAgent
 from agents.runner import TestRunner
 from agents.evaluator import Evaluator
 from agents.reporter import Reporter
+from tools.browser_pool import BrowserPool
 from tools.coverage_analyzer import CoverageAnalyzer
-from tools.logger import setup_logger
+from tools.logger import setup_logger, summarize
+from tools.playwright_executor import retry_handler
+from tools.results_store import ResultsStore
+from tools.scheduling import FailurePriority, FailFast
+from tools.stage_cache import StageCache, file_digests
+from tools.stage_executor import StageExecutor
+from tools.tracer import tracer
 import asyncio
-from typing import Dict, Any, List, TypedDict, Optional, Protocol, AsyncIterator
+import json
+import os
+import time
+from typing import Dict, Any, List, Set, TypedDict, Optional, Protocol, AsyncIterator, Callable, Awaitable
 
 logger = setup_logger()
 
+# Pipeline DAG: each stage runs once all of its dependencies have finished, so
+# independent stages (e.g. ui_tests vs. write_tests) share the event loop.
+NODE_DEPENDENCIES: Dict[str, List[str]] = {
+    "plan": [],
+    "write_tests": ["plan"],
+    "ui_tests": ["plan"],
+    "run_tests": ["write_tests"],
+    "evaluate": ["run_tests"],
+    "coverage": ["run_tests"],
+    "report": ["evaluate", "coverage", "ui_tests"]
+}
+
+# Graph nodes and the stage chains each runs concurrently. LangGraph executes in
+# supersteps with a barrier between them, so as separate nodes run_tests could not
+# start before ui_tests finished; sharing one node lets the UI and pytest branches overlap.
+GRAPH_NODES: Dict[str, List[List[str]]] = {
+    "plan": [["plan"]],
+    "tests": [["write_tests", "run_tests"], ["ui_tests"]],
+    "evaluate": [["evaluate"]],
+    "coverage": [["coverage"]],
+    "report": [["report"]]
+}
+
+# State keys each node reads; together with the config, PR diff and tool
+# versions they form the node's stage cache key.
+NODE_INPUTS: Dict[str, List[str]] = {
+    "plan": [],
+    "write_tests": ["planner_output"],
+    "ui_tests": ["planner_output"],
+    "run_tests": ["planner_output", "test_files"],
+    "evaluate": ["test_results", "skipped_tests"],
+    "coverage": ["test_files", "coverage_data"],
+    "report": ["evaluation_results", "ui_output"]
+}
+
+# Files a node reads besides its state; their contents are part of the cache key.
+# Generated tests can be edited by hand between runs, and the planner's impact
+# index is built from the previous run's coverage report.
+NODE_INPUT_FILES: Dict[str, Callable[[Dict[str, Any]], List[str]]] = {
+    "plan": lambda state: [os.path.join("results", "test_logs", "coverage.json")],
+    "run_tests": lambda state: list((state.get("test_files") or {}).values()),
+    "coverage": lambda state: list((state.get("test_files") or {}).values())
+}
+
+# Files a node leaves behind; a cached output is only reused while they are intact
+NODE_ARTIFACTS: Dict[str, Callable[[Dict[str, Any]], List[str]]] = {
+    "write_tests": lambda output: list(output["test_files"].values()),
+    "ui_tests": lambda output: [output["ui_output"]["screenshots_file"]] + [
+        path for flow in output["ui_output"]["ui_test_flows"] for path in flow.get("screenshots") or []
+    ],
+    "evaluate": lambda output: [os.path.join("results", "evaluation_summary.json")],
+    "coverage": lambda output: [os.path.join("results", "test_logs", "coverage.json")],
+    "report": lambda output: [os.path.join("results", "final_report.html"), os.path.join("results", "report_summary.md")]
+}
+
 # Define state schema as a TypedDict to structure the state
 class AgentState(TypedDict):
     planner_output: Optional[Dict[str, Any]]  # Contains the PlannerOutput object
@@ -20,6 +85,7 @@ class AgentState(TypedDict):
     test_results: Optional[Dict[str, List[Dict[str, Any]]]]
     evaluation_results: Optional[Dict[str, Any]]
     coverage_data: Optional[Dict[str, Dict[str, Any]]]
+    skipped_tests: Optional[Dict[str, List[str]]]  # Suites fail-fast stopped, per test type
 
 # Define protocol for compiled graph to type astream
 class CompiledGraphProtocol(Protocol):
@@ -27,35 +93,189 @@ class CompiledGraphProtocol(Protocol):
         ...
 
 class CrewMaster:
-    def __init__(self, ui_config: Dict[str, Any], pr_diff: Dict[str, Any]) -> None:
+    def __init__(self, ui_config: Dict[str, Any], pr_diff: Dict[str, Any], use_cache: bool = True,
+                 rerun_failed: bool = False) -> None:
         self.ui_config: Dict[str, Any] = ui_config
         self.pr_diff: Dict[str, Any] = pr_diff
+        self.rerun_failed: bool = rerun_failed
+        self.rerun: Optional[Dict[str, List[str]]] = None  # Failed test IDs per type of the previous run, when rerunning
+        self.flaky: Dict[str, Dict[str, Any]] = {}
+        self.fail_fast: FailFast = FailFast()
+        self.test_priority: Optional[FailurePriority] = None
+        self.suite_priority: Optional[FailurePriority] = None
+        self.stage_cache: StageCache = StageCache.from_config(ui_config, enabled=use_cache)
+        self.cache_hits: List[str] = []
+        self.browser_pool: Optional[BrowserPool] = None
+        self.stage_executor: StageExecutor = StageExecutor.from_config(ui_config)
+        self.results_store: ResultsStore = ResultsStore()
+        self.run_id: Optional[str] = None
+        self.node_timings: Dict[str, Dict[str, float]] = {}
+        self._run_started: float = time.perf_counter()
         self.graph: CompiledGraphProtocol = self._build_graph()
 
     def _build_graph(self) -> CompiledGraphProtocol:
         graph = StateGraph(AgentState)
-        graph.add_node("plan", self.plan_node)
-        graph.add_node("write_tests", self.write_tests_node)
-        graph.add_node("ui_tests", self.ui_tests_node)
-        graph.add_node("run_tests", self.run_tests_node)
-        graph.add_node("evaluate", self.evaluate_node)
-        graph.add_node("coverage", self.coverage_node)
-        graph.add_node("report", self.report_node)
-        graph.add_edge("plan", "write_tests")
-        graph.add_edge("write_tests", "ui_tests")
-        graph.add_edge("ui_tests", "run_tests")
-        graph.add_edge("run_tests", "evaluate")
-        graph.add_edge("evaluate", "coverage")
-        graph.add_edge("coverage", "report")
-        graph.add_edge("report", END)
+        stages: Dict[str, Callable[[AgentState], Awaitable[Dict[str, Any]]]] = {
+            "plan": self.plan_node,
+            "write_tests": self.write_tests_node,
+            "ui_tests": self.ui_tests_node,
+            "run_tests": self.run_tests_node,
+            "evaluate": self.evaluate_node,
+            "coverage": self.coverage_node,
+            "report": self.report_node
+        }
+        stages = {name: self._timed(name, self._cached(name, stage)) for name, stage in stages.items()}
+        node_of: Dict[str, str] = {stage: node for node, branches in GRAPH_NODES.items() for branch in branches for stage in branch}
+        graph_dependencies: Dict[str, List[str]] = {
+            node: sorted({node_of[dep] for branch in branches for stage in branch for dep in NODE_DEPENDENCIES[stage]} - {node})
+            for node, branches in GRAPH_NODES.items()
+        }
+
+        # Edges only to direct dependencies: a fan-in that also lists an earlier step would wait on it again
+        def upstream(node: str) -> Set[str]:
+            return {a for dep in graph_dependencies[node] for a in upstream(dep) | {dep}}
+        graph_dependencies = {
+            node: [dep for dep in dependencies if not any(dep in upstream(other) for other in dependencies)]
+            for node, dependencies in graph_dependencies.items()
+        }
+        for node, branches in GRAPH_NODES.items():
+            graph.add_node(node, stages[node] if branches == [[node]] else self._branches(branches, stages))
+        for node, dependencies in graph_dependencies.items():
+            if len(dependencies) == 1:
+                graph.add_edge(dependencies[0], node)
+            elif dependencies:
+                graph.add_edge(dependencies, node)  # Fan-in: waits for every dependency
+        downstream = {dep for dependencies in graph_dependencies.values() for dep in dependencies}
+        for node in GRAPH_NODES:
+            if node not in downstream:
+                graph.add_edge(node, END)
         graph.set_entry_point("plan")
         return graph.compile()
 
+    @staticmethod
+    def _branches(branches: List[List[str]], stages: Dict[str, Callable[[AgentState], Awaitable[Dict[str, Any]]]]) -> Callable[[AgentState], Awaitable[Dict[str, Any]]]:
+        async def run_branch(branch: List[str], state: AgentState) -> Dict[str, Any]:
+            branch_state: Dict[str, Any] = dict(state)
+            output: Dict[str, Any] = {}
+            for stage in branch:
+                update: Dict[str, Any] = await stages[stage](branch_state)
+                branch_state.update(update)
+                output.update(update)
+            return output
+
+        async def branches_node(state: AgentState) -> Dict[str, Any]:
+            tasks: List[asyncio.Task] = [asyncio.create_task(run_branch(branch, state)) for branch in branches]
+            try:
+                outputs: List[Dict[str, Any]] = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()  # One failed branch fails the node; do not leave the others running
+                raise
+            merged: Dict[str, Any] = {}
+            for output in outputs:
+                merged.update(output)
+            return merged
+        return branches_node
+
+    def _timed(self, name: str, node: Callable[[AgentState], Awaitable[Dict[str, Any]]]) -> Callable[[AgentState], Awaitable[Dict[str, Any]]]:
+        async def timed_node(state: AgentState) -> Dict[str, Any]:
+            start: float = time.perf_counter()
+            try:
+                with tracer.span(name, "node"):
+                    return await node(state)
+            finally:
+                end: float = time.perf_counter()
+                self.node_timings[name] = {
+                    "start": round(start - self._run_started, 3),
+                    "end": round(end - self._run_started, 3),
+                    "duration": round(end - start, 3)
+                }
+                logger.info("Node %s finished in %.3fs", name, end - start,
+                            extra={"node": name, "duration": self.node_timings[name]["duration"]})
+        return timed_node
+
+    def _cached(self, name: str, node: Callable[[AgentState], Awaitable[Dict[str, Any]]]) -> Callable[[AgentState], Awaitable[Dict[str, Any]]]:
+        async def cached_node(state: AgentState) -> Dict[str, Any]:
+            if not self.stage_cache.enabled:
+                return await node(state)
+            inputs: Dict[str, Any] = {
+                "ui_config": self.ui_config,
+                "pr_diff": self.pr_diff,
+                "state": {key: state.get(key) for key in NODE_INPUTS[name]}
+            }
+            if name in ("ui_tests", "run_tests"):
+                inputs["selection"] = {"rerun": self.rerun, "flaky": sorted(self.flaky)}
+            if name in NODE_INPUT_FILES:
+                inputs["files"] = await self.stage_executor.run_blocking(file_digests, NODE_INPUT_FILES[name](state))
+            key: str = await self.stage_executor.run_blocking(self.stage_cache.key, name, inputs)
+            output: Optional[Dict[str, Any]] = await self.stage_executor.run_blocking(self.stage_cache.get, key)
+            if output is not None:
+                logger.info("Node %s served from stage cache", name, extra={"node": name, "cache": "hit"})
+                self.cache_hits.append(name)
+                self._replay(name, output)
+                return output
+            output = await node(state)
+            if self.fail_fast.tripped:
+                return output  # A partial run depends on timing, so it is never cached
+            artifacts: List[str] = NODE_ARTIFACTS[name](output) if name in NODE_ARTIFACTS else []
+            await self.stage_executor.run_blocking(self.stage_cache.set, key, output, artifacts)
+            return output
+        return cached_node
+
+    def _replay(self, name: str, output: Dict[str, Any]) -> None:
+        # Side effects a cached node would otherwise skip: this run's rows in the results store
+        if name == "run_tests":
+            for test_type, results in output.get("test_results", {}).items():
+                self.results_store.add_results(self.run_id, test_type, results)
+        elif name == "ui_tests":
+            self._store_ui_results(output["ui_output"])
+
+    def _store_ui_results(self, ui_output: Dict[str, Any]) -> None:
+        # UI flows go in the store next to the pytest suites, so reruns and flaky detection cover them too
+        rows: List[Dict[str, Any]] = []
+        for flow in ui_output.get("ui_test_flows", []):
+            metadata: Dict[str, Any] = flow["metadata"]
+            if metadata.get("status") == "cancelled":
+                continue
+            passed: bool = metadata.get("status") == "completed" and metadata.get("screenshot_passed") is not False
+            rows.append({
+                "test_id": metadata.get("test_id", flow["name"]),
+                "passed": passed,
+                "first_passed": passed and not metadata.get("attempts"),  # Attempts are only recorded after a failure
+                "duration": metadata.get("duration"),
+                "details": metadata
+            })
+        self.results_store.add_results(self.run_id, "ui_flow", rows)
+
+    def critical_path(self) -> List[str]:
+        """Walk back from the last node to finish, always via the dependency that finished last."""
+        if not self.node_timings:
+            return []
+        path: List[str] = [max(self.node_timings, key=lambda n: self.node_timings[n]["end"])]
+        while True:
+            dependencies: List[str] = [d for d in NODE_DEPENDENCIES.get(path[-1], []) if d in self.node_timings]
+            if not dependencies:
+                break
+            path.append(max(dependencies, key=lambda n: self.node_timings[n]["end"]))
+        return list(reversed(path))
+
+    def _write_timings(self) -> None:
+        timings_file: str = os.path.join("results", "node_timings.json")
+        os.makedirs(os.path.dirname(timings_file), exist_ok=True)
+        summary: Dict[str, Any] = {
+            "nodes": self.node_timings,
+            "critical_path": self.critical_path(),
+            "total": round(time.perf_counter() - self._run_started, 3)
+        }
+        with open(timings_file, "w", encoding="utf-8") as f:  # type
+            json.dump(summary, f, indent=2)
+        logger.info("Critical path: %s (total %.3fs)", " -> ".join(summary["critical_path"]), summary["total"])
+
     async def plan_node(self, state: AgentState) -> Dict[str, Any]:
         try:
             planner = Planner(self.ui_config, self.pr_diff)
-            planner_output: Dict[str, Any] = {"planner_output": planner.plan().dict()}  # Convert to dict
-            logger.debug("Plan node output: %s", planner_output)
+            planner_output: Dict[str, Any] = {"planner_output": (await self.stage_executor.run_blocking(planner.plan)).dict()}  # Convert to dict
+            logger.debug("Plan node output: %s", summarize(planner_output))
             return planner_output
         except Exception as e:
             logger.error(f"Error in plan node: {str(e)}")
@@ -63,15 +283,14 @@ class CrewMaster:
 
     async def write_tests_node(self, state: AgentState) -> Dict[str, Any]:
         try:
-            logger.debug("Current state in write_tests_node: %s", state)
-            planner_output: Optional[Dict[str, Any]] = state.get("planner_output")
-            if not planner_output or "planner_output" not in planner_output:
-                logger.error("Planner output not found in state: %s", state)
+            logger.debug("Current state in write_tests_node: %s", summarize(state))
+            planner_obj: Optional[Dict[str, Any]] = state.get("planner_output")
+            if not planner_obj:
+                logger.error("Planner output not found in state: %s", summarize(state))
                 raise ValueError("Planner output not found in state")
-            planner_obj: Dict[str, Any] = planner_output["planner_output"]
-            test_writer = TestWriter()
-            test_files: Dict[str, str] = test_writer.write_tests(planner_obj, self.ui_config)
-            logger.info("Write tests node completed: %s", test_files)
+            test_writer = TestWriter(shards=self.ui_config.get("test_shards", 4))
+            test_files: Dict[str, str] = await self.stage_executor.run_blocking(test_writer.write_tests, planner_obj, self.ui_config)
+            logger.info("Write tests node completed: %s", summarize(test_files))
             return {"test_files": test_files}
         except Exception as e:
             logger.error(f"Error in write_tests node: {str(e)}")
@@ -79,9 +298,17 @@ class CrewMaster:
 
     async def ui_tests_node(self, state: AgentState) -> Dict[str, Any]:
         try:
-            ui_agent = UIAgent(self.ui_config)
+            planner_output: Dict[str, Any] = state.get("planner_output") or {}
+            selected_flows: Optional[List[str]] = planner_output.get("selected_flows")
+            if self.rerun is not None:
+                selected_flows = self.rerun.get("ui_flow", [])
+            ui_agent = UIAgent(self.ui_config, self.browser_pool, selected_flows=selected_flows,
+                               flaky_flows=list(self.flaky),
+                               flaky_retries=self.ui_config.get("flaky", {}).get("retries", 2),
+                               priority=self.test_priority, fail_fast=self.fail_fast)
             ui_output: Dict[str, Any] = (await ui_agent.execute_ui_flow()).dict()
-            logger.info("UI tests node completed: %s", ui_output)
+            await self.stage_executor.run_blocking(self._store_ui_results, ui_output)
+            logger.info("UI tests node completed: %s", summarize(ui_output))
             return {"ui_output": ui_output}
         except Exception as e:
             logger.error(f"Error in UI tests node: {str(e)}")
@@ -91,12 +318,30 @@ class CrewMaster:
         try:
             test_files: Optional[Dict[str, str]] = state.get("test_files")
             if not test_files:
-                logger.error("Test files not found in state: %s", state)
+                logger.error("Test files not found in state: %s", summarize(state))
                 raise ValueError("Test files not found in state")
-            test_runner = TestRunner()
-            test_results: Dict[str, List[Dict[str, Any]]] = test_runner.run_tests(test_files)
-            logger.info("Run tests node completed: %s", test_results)
-            return {"test_results": test_results}
+            selected_suites: Optional[List[str]] = (state.get("planner_output") or {}).get("selected_suites")
+            if selected_suites is not None:
+                test_files = {test_type: path for test_type, path in test_files.items() if test_type in selected_suites}
+                logger.info("Diff-aware selection runs suites: %s", summarize(list(test_files)))
+            if self.rerun is not None:
+                test_files = {test_type: path for test_type, path in test_files.items() if self.rerun.get(test_type)}
+                logger.info("Rerunning failed tests of suites: %s", summarize(list(test_files)))
+            test_runner = TestRunner(
+                parallel=self.ui_config.get("parallel_suites", True),
+                collect_coverage=self.ui_config.get("collect_coverage", True),
+                results_store=self.results_store,
+                run_id=self.run_id,
+                selected_tests=self.rerun,
+                flaky_tests=set(self.flaky),
+                flaky_retries=self.ui_config.get("flaky", {}).get("retries", 2),
+                priority=self.suite_priority,
+                fail_fast=self.fail_fast
+            )
+            test_results: Dict[str, List[Dict[str, Any]]] = await test_runner.run_tests_async(test_files, self.stage_executor)
+            logger.info("Run tests node completed: %s", summarize(test_results))
+            return {"test_results": test_results, "coverage_data": test_runner.coverage_data,
+                    "skipped_tests": test_runner.skipped}
         except Exception as e:
             logger.error(f"Error in run tests node: {str(e)}")
             raise
@@ -105,11 +350,12 @@ class CrewMaster:
         try:
             test_results: Optional[Dict[str, List[Dict[str, Any]]]] = state.get("test_results")
             if not test_results:
-                logger.error("Test results not found in state: %s", state)
+                logger.error("Test results not found in state: %s", summarize(state))
                 raise ValueError("Test results not found in state")
             evaluator = Evaluator()
-            evaluation_results: Dict[str, Any] = evaluator.evaluate(test_results)
-            logger.info("Evaluate node completed: %s", evaluation_results)
+            evaluation_results: Dict[str, Any] = await self.stage_executor.run_blocking(evaluator.evaluate, test_results, self.results_store, self.run_id,
+                                                                                        state.get("skipped_tests"))
+            logger.info("Evaluate node completed: %s", summarize(evaluation_results))
             return {"evaluation_results": evaluation_results}
         except Exception as e:
             logger.error(f"Error in evaluate node: {str(e)}")
@@ -119,11 +365,16 @@ class CrewMaster:
         try:
             test_files: Optional[Dict[str, str]] = state.get("test_files")
             if not test_files:
-                logger.error("Test files not found in state: %s", state)
+                logger.error("Test files not found in state: %s", summarize(state))
                 raise ValueError("Test files not found in state")
             coverage_analyzer = CoverageAnalyzer()
-            coverage_data: Dict[str, Dict[str, Any]] = coverage_analyzer.analyze_coverage(test_files)
-            logger.info("Coverage node completed: %s", coverage_data)
+            coverage_data: Optional[Dict[str, Dict[str, Any]]] = state.get("coverage_data")
+            if coverage_data is not None:
+                # Already collected by the test run; just persist it
+                await self.stage_executor.run_blocking(coverage_analyzer.write_report, coverage_data)
+            else:
+                coverage_data = await self.stage_executor.run_blocking(coverage_analyzer.analyze_coverage, test_files)
+            logger.info("Coverage node completed: %s", summarize(coverage_data))
             return {"coverage_data": coverage_data}
         except Exception as e:
             logger.error(f"Error in coverage node: {str(e)}")
@@ -133,17 +384,55 @@ class CrewMaster:
         try:
             evaluation_results: Optional[Dict[str, Any]] = state.get("evaluation_results")
             if not evaluation_results:
-                logger.error("Evaluation results not found in state: %s", state)
+                logger.error("Evaluation results not found in state: %s", summarize(state))
                 raise ValueError("Evaluation results not found in state")
+            skipped: Dict[str, List[str]] = dict(evaluation_results.get("skipped") or {})
+            cancelled_flows: List[str] = [
+                flow["metadata"].get("test_id", flow["name"]) for flow in (state.get("ui_output") or {}).get("ui_test_flows", [])
+                if flow["metadata"].get("status") == "cancelled"
+            ]
+            if cancelled_flows:
+                skipped["ui_flow"] = cancelled_flows
             reporter = Reporter()
-            reporter.generate_report(evaluation_results)
+            await self.stage_executor.run_cpu(reporter.generate_report, evaluation_results, self.results_store, self.run_id,
+                                              tracer.summary(), skipped)
             logger.info("Report node completed")
             return {}
         except Exception as e:
             logger.error(f"Error in report node: {str(e)}")
             raise
 
+    def _rerun_selection(self) -> Optional[Dict[str, List[str]]]:
+        """Failed test IDs per type of the run before this one; ``None`` unless rerunning failures."""
+        if not self.rerun_failed:
+            return None
+        previous_run: Optional[str] = self.results_store.last_run_id(before=self.run_id)
+        rerun: Dict[str, List[str]] = self.results_store.failed_tests(previous_run) if previous_run else {}
+        logger.info(f"Rerunning {sum(len(ids) for ids in rerun.values())} failed tests of run {previous_run}")
+        return rerun
+
     async def run(self) -> None:
+        self.browser_pool = BrowserPool.from_config(self.ui_config)
+        self.stage_executor = StageExecutor.from_config(self.ui_config)
+        self.run_id = self.results_store.start_run(metadata={"url": self.ui_config.get("url", ""), "rerun_failed": self.rerun_failed})
+        flaky_config: Dict[str, Any] = self.ui_config.get("flaky", {})
+        self.flaky = self.results_store.flaky_tests(flaky_config.get("history_runs", 20), flaky_config.get("min_flips", 2))
+        if self.flaky:
+            logger.info("%d tests are flaky over recent runs and will be retried on failure: %s", len(self.flaky), summarize(self.flaky))
+        scheduling: Dict[str, Any] = self.ui_config.get("scheduling", {})
+        self.fail_fast = FailFast(scheduling.get("fail_fast", 0))
+        self.test_priority = self.suite_priority = None
+        if scheduling.get("prioritize", True):
+            history_runs: int = scheduling.get("history_runs", 20)
+            self.test_priority = FailurePriority(self.results_store.pass_rates(history_runs))
+            self.suite_priority = FailurePriority(self.results_store.suite_rates(history_runs))
+        self.rerun = self._rerun_selection()
+        retry_handler.configure_from(self.ui_config)
+        tracer.configure_from(self.ui_config)
+        tracer.reset()
+        self.node_timings = {}
+        self.cache_hits = []
+        self._run_started = time.perf_counter()
         try:
             state: AgentState = {
                 "planner_output": None,
@@ -151,16 +440,28 @@ class CrewMaster:
                 "ui_output": None,
                 "test_results": None,
                 "evaluation_results": None,
-                "coverage_data": None
+                "coverage_data": None,
+                "skipped_tests": None
             }
-            logger.debug("Initial state: %s", state)
+            logger.debug("Initial state: %s", summarize(state))
             async for event in self.graph.astream(state):  # type
-                logger.debug("Received event: %s", event)
+                logger.debug("Received event: %s", summarize(event))
                 if isinstance(event, dict):
-                    logger.debug("Updating state with event: %s", event)
+                    logger.debug("Updating state with event: %s", summarize(event))
                     state.update(event)
-            logger.debug("Final state: %s", state)
+            logger.debug("Final state: %s", summarize(state))
+            logger.info("Retry metrics: %s", retry_handler.metrics)
+            if self.fail_fast.tripped:
+                logger.warning(f"Fail-fast stopped the run after {self.fail_fast.failures} failures; results are partial")
+            if self.cache_hits:
+                logger.info("Stage cache hits: %s", ", ".join(self.cache_hits))
             logger.info("CrewMaster execution completed")
         except Exception as e:
             logger.error(f"Error in CrewMaster run: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+        finally:
+            self._write_timings()
+            tracer.write(self.ui_config.get("tracing", {}).get("file", os.path.join("results", "trace.json")))
+            self.stage_executor.shutdown()
+            await self.browser_pool.close()
+            self.browser_pool = None
\ No newline at end of file
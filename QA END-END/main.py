@@ -1,24 +1,26 @@
+import argparse
 import asyncio
 import json
 import os
 from crewmaster import CrewMaster
 from tools.config_loader import ConfigLoader
-from tools.logger import setup_logger
+from tools.logger import setup_logger, configure_logging, summarize
 from typing import Dict, Any
 
 logger = setup_logger()
 
-async def main() -> None:
+async def main(use_cache: bool = True, rerun_failed: bool = False) -> None:
     try:
         logger.info("Starting autotest_agent")
         config_loader = ConfigLoader()
         ui_config: Dict[str, Any] = config_loader.load_ui_config()
+        configure_logging(ui_config.get("logging"))
         pr_diff: Dict[str, Any] = {}
         if os.path.exists("pr_diff.json"):
             with open("pr_diff.json", "r", encoding="utf-8") as f:
                 pr_diff = json.load(f)
-        logger.debug(f"Loaded UI config: {ui_config}, PR diff: {pr_diff}")
-        crew_master = CrewMaster(ui_config, pr_diff)
+        logger.debug("Loaded UI config: %s, PR diff: %s", summarize(ui_config), summarize(pr_diff))
+        crew_master = CrewMaster(ui_config, pr_diff, use_cache=use_cache, rerun_failed=rerun_failed)
         await crew_master.run()
         logger.info("autotest_agent completed successfully")
     except Exception as e:
@@ -26,4 +28,8 @@ async def main() -> None:
         raise
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the autotest agent pipeline.")
+    parser.add_argument("--no-cache", action="store_true", help="Run every stage even if a cached output matches")
+    parser.add_argument("--rerun-failed", action="store_true", help="Only run the tests that failed in the previous run")
+    args = parser.parse_args()
+    asyncio.run(main(use_cache=not args.no_cache, rerun_failed=args.rerun_failed))
\ No newline at end of file
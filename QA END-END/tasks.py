@@ -35,7 +35,7 @@ class UIAgentOutput(BaseModel):
     """Output schema for UIAgent, referencing test and result files."""
     ui_test_flows: List[UITestFlow]
     screenshot_diffs: List[Dict[str, str]]
-    login_status: str
+    login_status: str # reused, refreshed or failed when setup flows are configured; otherwise completed/mocked
     generated_test_file: str  # Path to tests/ui
     results_file: str  # Path to results/test_logs (for UI specific results)
     screenshots_file: str  # Path to results/screenshots (for screenshot metadata)
@@ -56,6 +56,9 @@ class PlannerOutput(BaseModel):
     test_categories: List[str] # e.g., ["unit", "integration", "ui"]
     priorities: Dict[str, str] # e.g., {"ui": "high"}
     test_types: List[str] # e.g., ["unit", "integration", "ui"]
+    test_plan: Dict[str, Any] = {} # Merged plan consumed by TestWriter
+    selected_flows: Optional[List[str]] = None # Flow test IDs affected by the PR diff; None means run all
+    selected_suites: Optional[List[str]] = None # Suites affected by the PR diff; None means run all
 
 class TestWriterInput(BaseModel):
     """Input schema for TestWriter, containing test plan and UI config."""
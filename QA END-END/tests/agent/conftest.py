@@ -0,0 +1,28 @@
+import json
+import os
+import sys
+from typing import Any, List, Optional
+import pytest
+from agents import runner as runner_module
+
+FAKE_PYTEST: str = os.path.join(os.path.dirname(__file__), "fake_pytest.py")
+
+@pytest.fixture
+def fake_pytest(monkeypatch):
+    """Runs fake_pytest.py instead of pytest; returns the commands issued."""
+    commands: List[List[str]] = []
+
+    def command(self, test_file: str, report_file: str, test_ids: Optional[List[str]] = None) -> List[str]:
+        commands.append(test_ids or [test_file])
+        return [sys.executable, FAKE_PYTEST, (test_ids or [test_file])[0], report_file]
+    monkeypatch.setattr(runner_module.TestRunner, "_command", command)
+    return commands
+
+@pytest.fixture
+def spec(tmp_path):
+    """Writes a fake_pytest.py spec file and returns its path."""
+    def write(name: str, **fields: Any) -> str:
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(fields))
+        return str(path)
+    return write
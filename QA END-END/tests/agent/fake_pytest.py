@@ -0,0 +1,30 @@
+"""Stand-in for ``pytest <test> <report_file>`` driven by a JSON spec file.
+
+The spec lists one outcome per invocation (the last one repeats), so retries
+can see a different result than the first run:
+``{"outcomes": ["failed", "passed"], "before": 0.1, "after": 0.0}``.
+"""
+import json
+import os
+import sys
+import time
+
+def main(test: str, report_file: str) -> None:
+    spec_file: str = test.split("::")[0]
+    with open(spec_file, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    runs_file: str = spec_file + ".runs"
+    runs: int = int(open(runs_file).read()) if os.path.exists(runs_file) else 0
+    with open(runs_file, "w") as f:
+        f.write(str(runs + 1))
+    outcome: str = spec["outcomes"][min(runs, len(spec["outcomes"]) - 1)]
+    nodeid: str = f"{spec_file}::t"
+    time.sleep(spec.get("before", 0))
+    print(f"{nodeid} {outcome.upper()}", flush=True)
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump({"summary": {"failed": int(outcome == "failed")},
+                   "tests": [{"nodeid": nodeid, "outcome": outcome, "call": {"duration": 0.01}}]}, f)
+    time.sleep(spec.get("after", 0))
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2])
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any
+import tools.browser_pool
+from tools.browser_pool import BrowserPool
+
+class FakeContext:
+    async def close(self) -> None:
+        pass
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.connected: bool = True
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def new_context(self, **options: Any) -> FakeContext:
+        return FakeContext()
+
+    async def close(self) -> None:
+        self.connected = False
+
+class FakePlaywright:
+    def __init__(self) -> None:
+        self.chromium = self
+
+    async def launch(self, **options: Any) -> FakeBrowser:
+        return FakeBrowser()
+
+    async def start(self) -> "FakePlaywright":
+        return self
+
+    async def stop(self) -> None:
+        pass
+
+def test_context_released_after_close_is_dropped(monkeypatch):
+    monkeypatch.setattr(tools.browser_pool, "async_playwright", FakePlaywright)
+
+    async def scenario() -> int:
+        pool = BrowserPool(size=1)
+        async with pool.context():
+            await pool.close()
+        async with pool.context():  # The restarted pool still has exactly one slot
+            return pool._idle.qsize()
+
+    assert asyncio.run(scenario()) == 0
+
+def test_disconnected_browser_is_retired_and_relaunched(monkeypatch):
+    monkeypatch.setattr(tools.browser_pool, "async_playwright", FakePlaywright)
+    closed: list = []
+
+    async def scenario() -> tuple:
+        pool = BrowserPool(size=1)
+        async with pool.context():
+            crashed: FakeBrowser = pool._slots[0].browser
+            crashed.connected = False
+            crashed.close = lambda: closed.append(crashed) or asyncio.sleep(0)
+        assert pool._slots == [] and closed == [crashed]
+        async with pool.context():
+            browsers: list = [slot.browser for slot in pool._slots]
+        await pool.close()
+        return crashed, browsers
+
+    crashed, browsers = asyncio.run(scenario())
+    assert len(browsers) == 1 and browsers[0] is not crashed
+    assert closed == [crashed]  # close() did not try to retire the dead browser again
@@ -0,0 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+from tools.crawler import Crawler, normalize_url, same_origin
+
+def test_normalize_url_canonicalizes():
+    base: str = "http://Example.com/app/"
+    assert normalize_url("page/?b=2&a=1#top", base) == "http://example.com/app/page?a=1&b=2"
+    assert normalize_url("https://example.com:443/", base) == "https://example.com/"
+    assert normalize_url("http://example.com:8080/x/", base) == "http://example.com:8080/x"
+
+def test_normalize_url_rejects_non_http():
+    for href in ["", "javascript:void(0)", "mailto:a@b.c", "tel:123", "ftp://example.com/"]:
+        assert normalize_url(href, "http://example.com/") is None
+
+def test_normalize_url_keeps_ipv6_brackets():
+    assert normalize_url("http://[::1]:8080/x", "http://[::1]:8080/") == "http://[::1]:8080/x"
+    assert normalize_url("/y", "http://[::1]/") == "http://[::1]/y"
+
+def test_same_origin():
+    assert same_origin("http://a.com/x", "http://a.com/")
+    assert not same_origin("https://a.com/x", "http://a.com/")
+
+class FakePage:
+    """Every page links to ``fanout`` children named after its own path."""
+    def __init__(self, fanout: int) -> None:
+        self.fanout: int = fanout
+        self.url: str = ""
+
+    async def goto(self, url: str, timeout: int = 0) -> None:
+        self.url = url
+
+    async def eval_on_selector_all(self, selector: str, script: str, limits: List[int]) -> Dict[str, Any]:
+        elements = [{"id": f"l{i}", "cls": None, "href": f"{self.url.rstrip('/')}/{i}"} for i in range(self.fanout)]
+        return {"elements": elements[:limits[0]], "links": elements[:limits[1]]}
+
+def _crawl(fanout: int, **kwargs: Any) -> List[Dict[str, Any]]:
+    @asynccontextmanager
+    async def new_page():
+        yield FakePage(fanout)
+    return asyncio.run(Crawler(new_page, **kwargs).crawl("http://app.test/"))
+
+def test_link_discovery_is_not_capped_by_action_limit():
+    results = _crawl(fanout=10, max_depth=1, max_pages=100, max_elements=3, max_links=10, workers=2)
+    assert len({entry["page"] for entry in results}) == 11
+    assert all(len([e for e in results if e["page"] == page]) == 3 for page in {e["page"] for e in results})
+
+def test_crawl_respects_page_budget():
+    results = _crawl(fanout=10, max_depth=3, max_pages=5, max_elements=1, max_links=10)
+    assert len({entry["page"] for entry in results}) == 5
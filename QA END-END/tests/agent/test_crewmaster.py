@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any, Dict, List
+import pytest
+import crewmaster
+from crewmaster import CrewMaster
+
+@pytest.fixture
+def crew(tmp_path, monkeypatch) -> CrewMaster:
+    monkeypatch.chdir(tmp_path)  # The results store and stage outputs live under ./results
+    return CrewMaster({"collect_coverage": False, "flaky": {"retries": 0}}, {}, use_cache=False, rerun_failed=True)
+
+def test_rerun_selects_the_previous_runs_failures(crew, fake_pytest, spec, monkeypatch):
+    unit: str = spec("unit", outcomes=["passed"])
+    integration: str = spec("integration", outcomes=["passed"])
+    store = crew.results_store
+    previous: str = store.start_run()
+    store.add_results(previous, "unit", [{"test_id": f"{unit}::t", "passed": False}, {"test_id": f"{unit}::ok", "passed": True}])
+    store.add_results(previous, "integration", [{"test_id": f"{integration}::t", "passed": True}])
+    store.add_results(previous, "ui_flow", [{"test_id": "flow_login", "passed": False}])
+    crew.run_id = store.start_run()
+    crew.rerun = crew._rerun_selection()
+    assert crew.rerun == {"unit": [f"{unit}::t"], "ui_flow": ["flow_login"]}
+
+    output: Dict[str, Any] = asyncio.run(crew.run_tests_node({"test_files": {"unit": unit, "integration": integration}}))
+    assert fake_pytest == [[f"{unit}::t"]]
+    assert [result["test_id"] for result in output["test_results"]["unit"]] == [f"{unit}::t"]
+
+    selected: List[Any] = []
+
+    class FakeUIAgent:
+        def __init__(self, ui_config: Dict[str, Any], browser_pool: Any, selected_flows: Any = None, **kwargs: Any) -> None:
+            selected.append(selected_flows)
+
+        async def execute_ui_flow(self) -> Any:
+            return type("Output", (), {"dict": lambda self: {"ui_test_flows": []}})()
+    monkeypatch.setattr(crewmaster, "UIAgent", FakeUIAgent)
+    asyncio.run(crew.ui_tests_node({"planner_output": {"selected_flows": ["flow_login", "flow_home"]}}))
+    assert selected == [["flow_login"]]
+
+def test_without_rerun_nothing_is_selected(crew):
+    crew.rerun_failed = False
+    assert crew._rerun_selection() is None
+
+def test_branches_chain_stages_and_merge_outputs():
+    async def plan(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {"test_files": {"unit": "u.py"}}
+
+    async def run(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {"test_results": sorted(state["test_files"])}  # Sees the output of the stage before it
+
+    async def ui(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {"ui_output": state["seed"]}
+
+    node = CrewMaster._branches([["write", "run"], ["ui"]], {"write": plan, "run": run, "ui": ui})
+    assert asyncio.run(node({"seed": 1})) == {"test_files": {"unit": "u.py"}, "test_results": ["unit"], "ui_output": 1}
+
+def test_failing_branch_cancels_its_sibling():
+    cancelled: List[str] = []
+
+    async def fails(state: Dict[str, Any]) -> Dict[str, Any]:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("write_tests broke")
+
+    async def slow(state: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("ui")
+            raise
+        return {}
+
+    node = CrewMaster._branches([["fails"], ["slow"]], {"fails": fails, "slow": slow})
+
+    async def scenario() -> None:
+        with pytest.raises(RuntimeError, match="write_tests broke"):
+            await node({})
+        await asyncio.sleep(0)  # Let the cancellation reach the sibling
+
+    asyncio.run(scenario())
+    assert cancelled == ["ui"]
+
+def test_critical_path_follows_the_latest_finishing_dependency(crew):
+    assert crew.critical_path() == []
+    crew.node_timings = {
+        "plan": {"end": 1.0}, "write_tests": {"end": 3.0}, "ui_tests": {"end": 5.0}, "run_tests": {"end": 4.0},
+        "evaluate": {"end": 4.5}, "coverage": {"end": 4.2}, "report": {"end": 6.0}
+    }
+    assert crew.critical_path() == ["plan", "ui_tests", "report"]
+    crew.node_timings["ui_tests"]["end"] = 2.0
+    assert crew.critical_path() == ["plan", "write_tests", "run_tests", "evaluate", "report"]
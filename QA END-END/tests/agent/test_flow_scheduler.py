@@ -0,0 +1,53 @@
+import asyncio
+from typing import Any, Callable, Awaitable, Dict, List
+from tools.flow_scheduler import FlowScheduler
+
+def _job(log: List[str], name: str, delay: float, error: bool = False) -> Callable[[], Awaitable[str]]:
+    async def job() -> str:
+        log.append(f"start {name}")
+        await asyncio.sleep(delay)
+        if error:
+            raise RuntimeError(f"{name} broke")
+        log.append(f"end {name}")
+        return name
+    return job
+
+def test_outcomes_keep_submission_order_and_start_in_list_order():
+    log: List[str] = []
+    scheduler = FlowScheduler(max_parallel=1)
+    jobs = [_job(log, "slow", 0.05), _job(log, "fast", 0.0)]
+    outcomes: List[Dict[str, Any]] = asyncio.run(scheduler.run(jobs, ["slow", "fast"]))
+    assert [outcome["result"] for outcome in outcomes] == ["slow", "fast"]
+    assert log == ["start slow", "end slow", "start fast", "end fast"]
+
+def test_completion_order_is_reported_through_on_outcome():
+    seen: List[str] = []
+    scheduler = FlowScheduler(max_parallel=2)
+    jobs = [_job([], "slow", 0.05), _job([], "fast", 0.0)]
+    asyncio.run(scheduler.run(jobs, ["slow", "fast"], on_outcome=lambda outcome: seen.append(outcome["name"])))
+    assert seen == ["fast", "slow"]
+
+def test_timeouts_and_errors_are_recorded_per_job():
+    scheduler = FlowScheduler(max_parallel=2, timeout=0.05)
+    jobs = [_job([], "hangs", 1.0), _job([], "breaks", 0.0, error=True), _job([], "ok", 0.0)]
+    outcomes = asyncio.run(scheduler.run(jobs, ["hangs", "breaks", "ok"]))
+    assert [outcome["status"] for outcome in outcomes] == ["timeout", "failed", "completed"]
+    assert outcomes[1]["error"] == "breaks broke"
+
+def test_queue_wait_is_not_part_of_duration():
+    scheduler = FlowScheduler(max_parallel=1)
+    outcomes = asyncio.run(scheduler.run([_job([], "a", 0.1), _job([], "b", 0.0)], ["a", "b"]))
+    assert outcomes[1]["duration"] < 0.05
+
+def test_cancel_marks_unfinished_jobs_cancelled():
+    scheduler = FlowScheduler(max_parallel=1)
+
+    async def scenario() -> List[Dict[str, Any]]:
+        def cancel_rest(outcome: Dict[str, Any]) -> None:
+            scheduler.cancel()  # From inside a job's task, as a fail-fast trip would
+        return await scheduler.run([_job([], "first", 0.0), _job([], "queued", 0.0), _job([], "queued2", 0.0)],
+                                   ["first", "queued", "queued2"], on_outcome=cancel_rest)
+
+    outcomes = asyncio.run(scenario())
+    assert [outcome["status"] for outcome in outcomes] == ["completed", "cancelled", "cancelled"]
+    assert outcomes[1]["duration"] == 0.0
@@ -0,0 +1,43 @@
+import json
+from typing import Any, Dict
+from agents.planner import Planner
+from tools.impact_index import ImpactIndex
+
+UI_CONFIG: Dict[str, Any] = {
+    "flows": [
+        {"page": "session", "setup": True, "actions": [{"type": "fill"}]},
+        {"page": "login", "covers": ["**/auth/**"], "actions": [{"type": "fill"}]},
+        {"page": "checkout", "components": ["CartSummary"], "actions": [{"type": "click"}]}
+    ]
+}
+COVERAGE: Dict[str, Dict[str, Any]] = {
+    "unit": {"files": {"src/auth/token.py": {}, "src/cart.py": {}}},
+    "integration": {"files": {"src/cart.py": {}}}
+}
+
+def test_select_maps_globs_tokens_and_coverage():
+    index = ImpactIndex.build(UI_CONFIG, COVERAGE)
+    assert index.select(["src/auth/token.py"]) == {"flows": ["ui_login_fill"], "suites": ["unit"], "unmapped": []}
+    assert index.select(["web/checkout/CartSummary.tsx"])["flows"] == ["ui_checkout_click"]
+    assert index.select(["./src/cart.py"]) == {"flows": [], "suites": ["integration", "unit"], "unmapped": []}
+    assert "ui_session_fill" not in index.flow_globs  # Setup flows are not tests
+
+def test_select_reports_files_nothing_maps_to():
+    index = ImpactIndex.build(UI_CONFIG, COVERAGE)
+    selection = index.select(["README.md", "src/auth/login.py"])
+    assert selection == {"flows": ["ui_login_fill"], "suites": [], "unmapped": ["README.md"]}
+
+def _planner(tmp_path, monkeypatch, changed, **config: Any) -> Planner:
+    monkeypatch.chdir(tmp_path)
+    coverage_file = tmp_path / "results" / "test_logs" / "coverage.json"
+    coverage_file.parent.mkdir(parents=True)
+    coverage_file.write_text(json.dumps(COVERAGE))
+    return Planner(dict(UI_CONFIG, **config), {"changed_files": changed})
+
+def test_unmapped_file_falls_back_to_running_everything(tmp_path, monkeypatch):
+    plan = _planner(tmp_path, monkeypatch, ["src/auth/token.py", "README.md"]).analyze_diff()
+    assert plan["selected_flows"] is None and plan["selected_suites"] is None
+
+def test_fallback_none_runs_only_the_mapped_selection(tmp_path, monkeypatch):
+    plan = _planner(tmp_path, monkeypatch, ["src/auth/token.py", "README.md"], impact_fallback="none").analyze_diff()
+    assert plan["selected_flows"] == ["ui_login_fill"] and plan["selected_suites"] == ["unit"]
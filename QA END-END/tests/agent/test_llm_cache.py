@@ -0,0 +1,19 @@
+from tools.llm_utils import ResponseCache, backend_name, get_llm_response
+
+def first_backend(prompt, model, params):
+    return f"first:{model}"
+
+def second_backend(prompt, model, params):
+    return f"second:{model}"
+
+def test_responses_are_cached_per_backend_and_model(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path))
+    assert get_llm_response("p", cache=cache, backend=first_backend) == "first:gpt-4.1-nano"
+    assert get_llm_response("p", cache=cache, backend=second_backend) == "second:gpt-4.1-nano"
+    assert get_llm_response("p", model="other", cache=cache, backend=first_backend) == "first:other"
+    assert get_llm_response("p", cache=cache, backend=second_backend) == "second:gpt-4.1-nano"
+    assert len(list(tmp_path.iterdir())) == 3
+
+def test_backend_name_defaults_to_openai():
+    assert backend_name(None) == "openai"
+    assert backend_name(first_backend).endswith("test_llm_cache.first_backend")
@@ -0,0 +1,26 @@
+import json
+import logging
+import queue
+from tools.logger import JsonFormatter, TracebackQueueHandler
+
+def _enqueued(exc: bool) -> logging.LogRecord:
+    log_queue: queue.Queue = queue.Queue()
+    logger = logging.getLogger(f"test_logger_{exc}")
+    logger.propagate = False
+    logger.addHandler(TracebackQueueHandler(log_queue))
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.error("failed %s", "step", exc_info=exc, extra={"stage": "plan"})
+    return log_queue.get_nowait()
+
+def test_traceback_survives_the_queue_as_its_own_field():
+    entry = json.loads(JsonFormatter().format(_enqueued(exc=True)))
+    assert entry["message"] == "failed step"
+    assert entry["stage"] == "plan"
+    assert "ValueError: boom" in entry["exc_info"]
+
+def test_text_format_still_appends_the_traceback():
+    text: str = logging.Formatter("%(levelname)s - %(message)s").format(_enqueued(exc=True))
+    assert text.startswith("ERROR - failed step\nTraceback")
+    assert "exc_info" not in json.loads(JsonFormatter().format(_enqueued(exc=False)))
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Any, Dict, List, Tuple
+import pytest
+from tools.network_router import NetworkRouter
+
+class FakeRoute:
+    def __init__(self, resource_type: str) -> None:
+        self.request = type("Request", (), {"resource_type": resource_type})()
+        self.handled: str = ""
+
+    async def abort(self, reason: str) -> None:
+        self.handled = f"abort:{reason}"
+
+    async def fallback(self) -> None:
+        self.handled = "fallback"
+
+class FakeContext:
+    def __init__(self) -> None:
+        self.routes: List[Tuple[str, Any]] = []
+        self.hars: List[Dict[str, Any]] = []
+
+    async def route(self, pattern: str, handler: Any) -> None:
+        self.routes.append((pattern, handler))
+
+    async def route_from_har(self, path: str, **options: Any) -> None:
+        self.hars.append(dict(options, path=path))
+
+def test_blocked_resource_types_are_aborted_and_others_fall_through():
+    router = NetworkRouter(block_resource_types=["image", "font"])
+
+    async def handle(resource_type: str) -> str:
+        route = FakeRoute(resource_type)
+        await router._block(route)
+        return route.handled
+
+    assert asyncio.run(handle("image")) == "abort:blockedbyclient"
+    assert asyncio.run(handle("document")) == "fallback"
+    assert router.blocked == 1
+
+def test_routes_install_har_first_and_blocking_last(tmp_path):
+    (tmp_path / "page_0.har").write_text("{}")
+    router = NetworkRouter(block_resource_types=["image"], block_url_patterns=["**/ads/**"], har_mode="replay",
+                           har_dir=str(tmp_path))
+    context = FakeContext()
+    asyncio.run(router.apply(context))
+    assert [pattern for pattern, _ in context.routes] == ["**/*", "**/*", "**/ads/**"]
+    assert [har["path"] for har in context.hars] == [str(tmp_path / "page_0.har")]
+    assert router.context_options() == {"service_workers": "block"}
+
+def test_inactive_router_installs_nothing():
+    router = NetworkRouter()
+    context = FakeContext()
+    asyncio.run(router.apply(context))
+    assert not router.active and context.routes == [] and router.context_options() == {}
+
+def test_auto_mode_records_until_recordings_exist(tmp_path):
+    assert NetworkRouter(har_mode="auto", har_dir=str(tmp_path)).har_mode == "record"
+    (tmp_path / "page_0.har").write_text("{}")
+    assert NetworkRouter(har_mode="auto", har_dir=str(tmp_path)).har_mode == "replay"
+    with pytest.raises(ValueError):
+        NetworkRouter(har_mode="sometimes")
+
+def test_prepare_recording_removes_only_har_files(tmp_path):
+    (tmp_path / "old_0.har").write_text("{}")
+    (tmp_path / "notes.txt").write_text("keep")
+    router = NetworkRouter(har_mode="record", har_dir=str(tmp_path))
+    router.prepare_recording()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["notes.txt"]
+    context = FakeContext()
+    asyncio.run(router.apply(context, key="login page"))
+    asyncio.run(router.apply(context, key="login page"))
+    assert [har["path"] for har in context.hars] == [str(tmp_path / "login_page_0.har"), str(tmp_path / "login_page_1.har")]
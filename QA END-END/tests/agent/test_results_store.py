@@ -0,0 +1,34 @@
+import os
+from tools.results_store import ResultsStore
+
+def _store(tmp_path) -> ResultsStore:
+    return ResultsStore(os.path.join(str(tmp_path), "results.db"))
+
+def _run(store: ResultsStore, index: int, results: list) -> str:
+    run_id: str = store.start_run(run_id=f"run_{index:02d}")
+    store.add_results(run_id, "unit", results)
+    return run_id
+
+def test_flaky_tests_counts_flips(tmp_path):
+    store = _store(tmp_path)
+    for i, passed in enumerate([True, False, True, False]):
+        _run(store, i, [{"test_id": "a", "passed": passed}, {"test_id": "b", "passed": True}])
+    flaky = store.flaky_tests(min_flips=2)
+    assert list(flaky) == ["a"]
+    assert flaky["a"] == {"runs": 4, "flips": 3, "pass_rate": 0.5}
+
+def test_flaky_tests_uses_first_attempt(tmp_path):
+    # A flaky test that passes on retry keeps flipping in the history
+    store = _store(tmp_path)
+    for i in range(4):
+        retried: bool = i % 2 == 1
+        _run(store, i, [{"test_id": "a", "passed": True, "first_passed": not retried}])
+    assert store.flaky_tests(min_flips=2)["a"]["flips"] == 3
+    assert store.failed_tests("run_03") == {}
+
+def test_failed_tests_groups_by_type(tmp_path):
+    store = _store(tmp_path)
+    run_id: str = _run(store, 0, [{"test_id": "a", "passed": False}, {"test_id": "b", "passed": True}])
+    store.add_results(run_id, "ui_flow", [{"test_id": "ui_login_fill", "passed": False}])
+    assert store.failed_tests(run_id) == {"unit": ["a"], "ui_flow": ["ui_login_fill"]}
+    assert store.summary(run_id, ["unit"]) == {"total_tests": 2, "passed": 1, "failed": 1}
@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from tools.retry_handler import CircuitBreaker, CircuitOpenError, RetryHandler, RetryPolicy
+
+def test_retry_policy_backs_off_up_to_max_delay():
+    policy = RetryPolicy(delay=1, backoff=2.0, max_delay=5, jitter=0)
+    assert [policy.delay_for(attempt) for attempt in range(4)] == [1, 2, 4, 5]
+    jittered = RetryPolicy(delay=1, backoff=2.0, jitter=0.5)
+    assert all(1.0 <= jittered.delay_for(1) <= 3.0 for _ in range(20))
+
+def test_circuit_opens_after_threshold_and_half_open_allows_one_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "half_open"  # reset_timeout=0 makes it probe-ready immediately
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow() and breaker.allow()
+
+def test_failed_probe_reopens_and_released_probe_frees_the_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    assert not breaker.allow()
+    breaker.opened_at -= 60
+    assert breaker.allow() and not breaker.allow()
+    breaker.release_probe()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+def test_retry_stops_at_the_circuit_breaker():
+    handler = RetryHandler(max_retries=5, delay=0, jitter=0, failure_threshold=2, reset_timeout=60)
+    calls: list = []
+
+    @handler.retry
+    async def flaky() -> None:
+        calls.append(1)
+        raise ConnectionError("down")
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(flaky())
+    assert len(calls) == 2
+    assert handler.metrics["flaky"]["retries"] == 2
+
+def test_concurrent_half_open_calls_send_a_single_probe():
+    handler = RetryHandler(max_retries=1, delay=0, jitter=0, failure_threshold=1, reset_timeout=0)
+    handler.circuit_breaker.record_failure()
+    started: list = []
+
+    @handler.retry
+    async def call() -> str:
+        started.append(1)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def scenario() -> list:
+        return await asyncio.gather(call(), call(), call(), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert len(started) == 1
+    assert results[0] == "ok" and all(isinstance(r, CircuitOpenError) for r in results[1:])
+    assert handler.circuit_breaker.state == "closed"
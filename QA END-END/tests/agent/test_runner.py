@@ -0,0 +1,34 @@
+from typing import Any, Dict, List
+from agents import runner as runner_module
+from tools.results_store import ResultsStore
+from tools.scheduling import FailFast
+
+def _runner(tmp_path, **kwargs: Any) -> runner_module.TestRunner:
+    store = ResultsStore(str(tmp_path / "results.db"))
+    return runner_module.TestRunner(collect_coverage=False, results_store=store, run_id=store.start_run(), **kwargs)
+
+def test_fail_fast_keeps_the_tripping_suite_and_skips_the_rest(tmp_path, fake_pytest, spec):
+    failing: str = spec("failing", outcomes=["failed"], before=0.2, after=0.3)
+    slow: str = spec("slow", outcomes=["passed"], before=10)
+    runner = _runner(tmp_path, fail_fast=FailFast(1))
+    results: Dict[str, List[Dict[str, Any]]] = runner.run_tests({"unit": failing, "integration": slow})
+    assert [result["passed"] for result in results["unit"]] == [False]
+    assert results["integration"] == []
+    assert runner.skipped == {"integration": [slow]}
+    assert [row["test_id"] for row in runner.results_store.iter_results(runner.run_id)] == [f"{failing}::t"]
+
+def test_flaky_failure_is_retried_through_the_runner_command(tmp_path, fake_pytest, spec):
+    flaky: str = spec("flaky", outcomes=["failed", "failed", "passed"])
+    runner = _runner(tmp_path, flaky_tests={f"{flaky}::t"}, flaky_retries=2)
+    result: Dict[str, Any] = runner.run_tests({"unit": flaky})["unit"][0]
+    assert result["passed"] and not result["first_passed"]
+    assert result["details"]["attempts"] == 3
+    assert fake_pytest == [[flaky], [f"{flaky}::t"], [f"{flaky}::t"]]
+    stored: List[Dict[str, Any]] = list(runner.results_store.iter_results(runner.run_id))
+    assert [(row["passed"], row["details"]["flaky"]) for row in stored] == [(True, True)]
+
+def test_failures_of_stable_tests_are_not_retried(tmp_path, fake_pytest, spec):
+    stable: str = spec("stable", outcomes=["failed", "passed"])
+    runner = _runner(tmp_path, flaky_tests={"other::t"})
+    assert not runner.run_tests({"unit": stable})["unit"][0]["passed"]
+    assert fake_pytest == [[stable]]
@@ -0,0 +1,33 @@
+from tools.scheduling import FailFast, FailurePriority
+
+def test_order_prefers_likely_and_cheap_failures():
+    priority = FailurePriority({
+        "stable": {"runs": 10, "passed": 10, "avg_duration": 1.0},
+        "flaky": {"runs": 10, "passed": 5, "avg_duration": 1.0},
+        "flaky_slow": {"runs": 10, "passed": 5, "avg_duration": 2.0},
+    })
+    assert priority.order(["stable", "flaky_slow", "flaky"]) == [2, 1, 0]
+
+def test_unknown_tests_count_as_coin_flips_with_median_duration():
+    priority = FailurePriority({"a": {"runs": 2, "passed": 2, "avg_duration": 2.0}, "b": {"runs": 2, "passed": 2, "avg_duration": 4.0}})
+    assert priority.failure_probability("new") == 0.5
+    assert priority.expected_duration("new") == 3.0
+    assert priority.order(["a", "b", "new"]) == [2, 0, 1]
+
+def test_fail_fast_trips_once_at_the_limit():
+    fail_fast = FailFast(max_failures=2)
+    calls: list = []
+    fail_fast.on_trip(lambda: calls.append("trip"))
+    assert not fail_fast.record(1)
+    assert fail_fast.remaining == 1
+    assert fail_fast.record(3)
+    fail_fast.record(1)
+    assert calls == ["trip"]
+    late: list = []
+    fail_fast.on_trip(lambda: late.append("trip"))
+    assert late == ["trip"]
+
+def test_fail_fast_disabled_never_trips():
+    fail_fast = FailFast(max_failures=0)
+    assert not fail_fast.record(5)
+    assert not fail_fast.enabled and fail_fast.remaining is None
@@ -0,0 +1,51 @@
+import numpy as np
+from PIL import Image
+from tools.screenshot_diff import ScreenshotDiff, pixel_diff
+
+def _save(path, pixels: np.ndarray) -> str:
+    Image.fromarray(pixels.astype(np.uint8)).save(path)
+    return str(path)
+
+def _blank(height: int = 64, width: int = 64) -> np.ndarray:
+    return np.full((height, width, 3), 255, dtype=np.uint8)
+
+def test_identical_screenshots_pass(tmp_path):
+    reference = _save(tmp_path / "ref.png", _blank())
+    result = pixel_diff(_save(tmp_path / "shot.png", _blank()), reference)
+    assert result == {"passed": True, "failed_tiles": 0}
+
+def test_changed_tile_fails_and_writes_heatmap(tmp_path):
+    changed = _blank()
+    changed[40:60, 40:60] = 0
+    result = pixel_diff(_save(tmp_path / "shot.png", changed), _save(tmp_path / "ref.png", _blank()), tile_size=32)
+    assert not result["passed"] and result["failed_tiles"] == 1
+    assert result["heatmap"] == str(tmp_path / "shot_diff.png")
+
+def test_ignore_regions_mask_the_difference(tmp_path):
+    changed = _blank()
+    changed[40:60, 40:60] = 0
+    result = pixel_diff(_save(tmp_path / "shot.png", changed), _save(tmp_path / "ref.png", _blank()),
+                        ignore_regions=[[40, 40, 20, 20]], write_heatmap=False)
+    assert result["passed"]
+
+def test_size_mismatch_fails(tmp_path):
+    result = pixel_diff(_save(tmp_path / "shot.png", _blank(32, 64)), _save(tmp_path / "ref.png", _blank()))
+    assert not result["passed"] and result["failed_tiles"] == -1
+
+def test_decoded_references_are_bounded_lru(tmp_path):
+    diff = ScreenshotDiff(mode="pixel", reference_cache_size=2)
+    shot = _save(tmp_path / "shot.png", _blank())
+    references = [_save(tmp_path / f"ref_{i}.png", _blank()) for i in range(3)]
+    for reference in (references[0], references[1], references[0], references[2]):
+        assert diff.compare_pixels(shot, reference)
+    assert list(diff._references) == [references[0], references[2]]
+
+def test_partly_ignored_tile_is_scored_on_its_visible_pixels(tmp_path):
+    changed = _blank(32, 32)
+    changed[:, 16:] = 200  # Visible half differs by ~0.22 per pixel: 0.11 over the whole tile
+    reference = _save(tmp_path / "ref.png", _blank(32, 32))
+    shot = _save(tmp_path / "shot.png", changed)
+    options = {"tile_size": 32, "tile_threshold": 0.15, "write_heatmap": False}
+    assert pixel_diff(shot, reference, **options)["passed"]
+    assert not pixel_diff(shot, reference, ignore_regions=[[0, 0, 16, 32]], **options)["passed"]
+    assert pixel_diff(shot, reference, ignore_regions=[[0, 0, 32, 32]], **options)["passed"]
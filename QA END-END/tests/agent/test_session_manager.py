@@ -0,0 +1,55 @@
+import asyncio
+import json
+import os
+from typing import Any, Dict, List
+from tools.session_manager import SessionManager
+
+LOGIN: List[Dict[str, Any]] = [{"page": "session", "setup": True, "actions": [{"type": "fill", "selector": "#user"}]}]
+
+class FakeSetup:
+    """Stands in for PlaywrightExecutor.run_setup: writes a storage state and counts runs."""
+    def __init__(self, fail: bool = False) -> None:
+        self.runs: int = 0
+        self.fail: bool = fail
+
+    async def __call__(self, flows: List[Dict[str, Any]], state_file: str) -> None:
+        self.runs += 1
+        if self.fail:
+            raise RuntimeError("login page down")
+        with open(state_file, "w", encoding="utf-8") as f:
+            json.dump({"cookies": [{"name": "sid", "value": str(self.runs)}]}, f)
+
+def _ensure(manager: SessionManager, setup: FakeSetup, flows: List[Dict[str, Any]] = LOGIN,
+            url: str = "http://app.test") -> Dict[str, Any]:
+    return asyncio.run(manager.ensure(url, flows, setup))
+
+def test_session_is_reused_until_ttl_expires(tmp_path):
+    manager = SessionManager(state_file=str(tmp_path / "state.json"), ttl=60)
+    setup = FakeSetup()
+    assert _ensure(manager, setup) == {"status": "refreshed", "storage_state": manager.state_file}
+    assert _ensure(manager, setup)["status"] == "reused"
+    with open(manager.meta_file, "r", encoding="utf-8") as f:
+        meta: Dict[str, Any] = json.load(f)
+    with open(manager.meta_file, "w", encoding="utf-8") as f:
+        json.dump(dict(meta, created=meta["created"] - 61), f)
+    assert _ensure(manager, setup)["status"] == "refreshed"
+    assert setup.runs == 2
+
+def test_changed_setup_flows_or_url_refresh_the_session(tmp_path):
+    manager = SessionManager(state_file=str(tmp_path / "state.json"))
+    setup = FakeSetup()
+    _ensure(manager, setup)
+    changed: List[Dict[str, Any]] = [dict(LOGIN[0], actions=[{"type": "fill", "selector": "#email"}])]
+    assert _ensure(manager, setup, flows=changed)["status"] == "refreshed"
+    assert _ensure(manager, setup, flows=changed, url="http://staging.test")["status"] == "refreshed"
+    assert setup.runs == 3
+
+def test_failed_setup_leaves_no_session(tmp_path):
+    manager = SessionManager(state_file=str(tmp_path / "state.json"))
+    _ensure(manager, FakeSetup())
+    assert _ensure(manager, FakeSetup(fail=True), url="http://other.test") == {"status": "failed", "storage_state": None}
+    assert not os.path.exists(manager.state_file) and not os.path.exists(manager.meta_file)
+
+def test_setup_flows_are_picked_from_config():
+    ui_config: Dict[str, Any] = {"flows": LOGIN + [{"page": "login", "use_session": False}]}
+    assert SessionManager.setup_flows(ui_config) == LOGIN
@@ -0,0 +1,44 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+from agents.ui_agent import UIAgent
+
+class FakeWorkQueue:
+    """Answers visit tasks newest first, so results arrive out of breadth-first order.
+
+    Every page links to ``fanout`` children named after its own path.
+    """
+    def __init__(self, fanout: int) -> None:
+        self.fanout: int = fanout
+        self.tasks: List[Dict[str, Any]] = []
+        self.visits: int = 0
+
+    def submit(self, task: Dict[str, Any]) -> None:
+        self.tasks.append(task)
+
+    def next_result(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        if not self.tasks:
+            return None
+        task: Dict[str, Any] = self.tasks.pop()
+        self.visits += 1
+        url: str = task["url"].rstrip("/")
+        discovered: List[Any] = [(f"{url}/{i}", [], task["depth"] + 1) for i in range(self.fanout)] \
+            if task["depth"] < task["max_depth"] else []
+        return {"task_id": task["task_id"], "worker": 0, "entries": [{"page": task["url"]}], "discovered": discovered}
+
+def _crawl(fanout: int, max_pages: int, max_depth: int) -> List[str]:
+    agent = UIAgent({"url": "http://app.test/", "crawl": {"max_pages": max_pages, "max_depth": max_depth}})
+    agent._work_queue = FakeWorkQueue(fanout)
+    return [entry["page"] for entry in asyncio.run(agent._crawl_sharded(depth=max_depth))]
+
+def test_results_are_in_breadth_first_order_whatever_the_completion_order():
+    pages: List[str] = _crawl(fanout=2, max_pages=100, max_depth=2)
+    assert pages == [
+        "http://app.test/",
+        "http://app.test/0", "http://app.test/1",
+        "http://app.test/0/0", "http://app.test/0/1", "http://app.test/1/0", "http://app.test/1/1"
+    ]
+
+def test_page_budget_caps_the_visits():
+    pages: List[str] = _crawl(fanout=10, max_pages=5, max_depth=3)
+    assert len(pages) == 5 and len(set(pages)) == 5
+    assert pages[0] == "http://app.test/"
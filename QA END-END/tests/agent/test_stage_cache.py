@@ -0,0 +1,38 @@
+import os
+import time
+from tools.disk_cache import evict
+from tools.stage_cache import StageCache
+
+def test_key_depends_on_node_and_inputs():
+    key: str = StageCache.key("plan", {"pr_diff": {"files": ["a.py"]}})
+    assert key == StageCache.key("plan", {"pr_diff": {"files": ["a.py"]}})
+    assert key != StageCache.key("plan", {"pr_diff": {"files": ["b.py"]}})
+    assert key != StageCache.key("write_tests", {"pr_diff": {"files": ["a.py"]}})
+
+def test_get_rejects_modified_artifacts(tmp_path):
+    cache = StageCache(cache_dir=str(tmp_path / "stages"))
+    artifact = tmp_path / "report.html"
+    artifact.write_text("v1")
+    cache.set("k", {"done": True}, [str(artifact)])
+    assert cache.get("k") == {"done": True}
+    artifact.write_text("v2")
+    assert cache.get("k") is None
+    artifact.unlink()
+    assert cache.get("k") is None
+
+def test_evict_removes_oldest_entries_over_budget(tmp_path):
+    for i in range(4):
+        path = tmp_path / f"entry_{i}.json"
+        path.write_text("x" * 100)
+        os.utime(path, (1000 + i, 1000 + i))
+    assert evict(str(tmp_path), max_bytes=250) == 2
+    assert sorted(os.listdir(tmp_path)) == ["entry_2.json", "entry_3.json"]
+
+def test_evict_removes_expired_entries(tmp_path):
+    old = tmp_path / "old.json"
+    old.write_text("{}")
+    os.utime(old, (time.time() - 120, time.time() - 120))
+    (tmp_path / "new.json").write_text("{}")
+    (tmp_path / "notes.txt").write_text("not an entry")
+    assert evict(str(tmp_path), max_bytes=1 << 20, ttl=60) == 1
+    assert sorted(os.listdir(tmp_path)) == ["new.json", "notes.txt"]
@@ -0,0 +1,43 @@
+import os
+from typing import Any, Dict, List
+from agents import test_writer as writer_module
+
+UI_CONFIG: Dict[str, Any] = {"flows": [{"expected_result": {"url": "http://app.test/home"}}]}
+
+def _plan(unit_ids: List[str], ui_pages: List[str]) -> Dict[str, Any]:
+    return {"test_plan": {
+        "unit_tests": [{"test_id": test_id} for test_id in unit_ids],
+        "ui_tests": [{"test_id": f"ui_{page}_click", "page": page, "actions": [{"type": "click", "selector": "#go"}],
+                      "expected_result": {"url": "http://app.test/home"}} for page in ui_pages]
+    }}
+
+def _mtimes(directory: str) -> Dict[str, int]:
+    return {name: os.stat(os.path.join(directory, name)).st_mtime_ns for name in os.listdir(directory)}
+
+def test_unchanged_shards_are_not_rewritten(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    writer = writer_module.TestWriter(shards=2)
+    test_dirs: Dict[str, str] = writer.write_tests(_plan(["u1", "u2", "u3"], ["login", "cart"]), UI_CONFIG)
+    before: Dict[str, int] = _mtimes(test_dirs["ui"])
+    assert sorted(before) == ["test_ui_cart_click.py", "test_ui_login_click.py"]
+    plan = _plan(["u1", "u2", "u3"], ["login", "cart"])
+    plan["test_plan"]["ui_tests"][1]["actions"][0]["selector"] = "#checkout"
+    writer.write_tests(plan, UI_CONFIG)
+    after: Dict[str, int] = _mtimes(test_dirs["ui"])
+    assert after["test_ui_login_click.py"] == before["test_ui_login_click.py"]
+    assert "#checkout" in (tmp_path / test_dirs["ui"] / "test_ui_cart_click.py").read_text()
+
+def test_stale_generated_shards_are_removed_and_hand_written_files_kept(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    writer = writer_module.TestWriter(shards=4)
+    test_dirs: Dict[str, str] = writer.write_tests(_plan([], ["login", "cart"]), UI_CONFIG)
+    hand_written = tmp_path / test_dirs["ui"] / "test_manual.py"
+    hand_written.write_text("def test_manual():\n    assert True\n")
+    writer.write_tests(_plan([], ["login"]), UI_CONFIG)
+    assert sorted(os.listdir(test_dirs["ui"])) == ["test_manual.py", "test_ui_login_click.py"]
+
+def test_fingerprint_tracks_the_test_and_ui_expected_url():
+    test: Dict[str, Any] = {"test_id": "u1"}
+    assert writer_module.TestWriter.fingerprint("unit", test, "a") == writer_module.TestWriter.fingerprint("unit", test, "b")
+    assert writer_module.TestWriter.fingerprint("ui", test, "a") != writer_module.TestWriter.fingerprint("ui", test, "b")
+    assert writer_module.TestWriter.fingerprint("unit", test, "a") != writer_module.TestWriter.fingerprint("unit", {"test_id": "u2"}, "a")
@@ -0,0 +1,27 @@
+from tools.tracer import Tracer
+
+def test_drain_hands_over_events_once():
+    worker = Tracer()
+    worker.record("flow", "ui", worker.now(), worker.now())
+    batch = worker.drain()
+    assert [event["name"] for event in batch["events"]] == ["thread_name", "flow"]
+    assert worker.drain()["events"] == []
+
+def test_merge_shifts_worker_spans_onto_the_coordinator_clock():
+    coordinator, worker = Tracer(), Tracer()
+    start: float = worker.now()
+    worker.record("flow", "ui", start, start + 0.5)
+    batch = worker.drain()
+    batch["epoch"] = coordinator._epoch + 2.0  # Worker started two seconds after the coordinator
+    span = next(event for event in batch["events"] if event["ph"] == "X")
+    coordinator.merge(batch)
+    merged = next(event for event in coordinator.events if event["ph"] == "X")
+    assert merged["ts"] == round(span["ts"] + 2e6, 1)
+    assert coordinator.summary()[0]["name"] == "flow"
+
+def test_merge_is_a_no_op_when_disabled():
+    coordinator, worker = Tracer(enabled=False), Tracer()
+    worker.record("flow", "ui", worker.now(), worker.now())
+    coordinator.merge(worker.drain())
+    coordinator.merge(None)
+    assert coordinator.events == []
@@ -0,0 +1,22 @@
+import asyncio
+from typing import Any, Dict, List
+from agents.ui_agent import UIAgent
+
+def _outcome(name: str, status: str) -> Dict[str, Any]:
+    return {"name": name, "status": status, "result": None, "duration": 0.1}
+
+def test_flaky_flow_failures_are_retried_one_at_a_time():
+    agent = UIAgent({}, flaky_flows=["flow_a"], flaky_retries=2)
+    attempts: List[Any] = []
+    statuses: List[str] = ["failed", "completed"]
+
+    async def run_jobs(kind: str, test_ids: List[str], items: List[Dict[str, Any]], count_failures: bool = True) -> List[Dict[str, Any]]:
+        attempts.append((test_ids, count_failures))
+        return [_outcome(test_ids[0], statuses.pop(0))]
+    agent._run_jobs = run_jobs
+
+    outcomes: List[Dict[str, Any]] = [_outcome("flow_a", "failed"), _outcome("flow_b", "failed"), _outcome("flow_c", "completed")]
+    asyncio.run(agent._retry_flaky(["flow_a", "flow_b", "flow_c"], [{}, {}, {}], outcomes))
+    assert attempts == [(["flow_a"], False), (["flow_a"], False)]  # Retries never count towards fail-fast
+    assert outcomes[0]["status"] == "completed" and outcomes[0]["attempts"] == 3
+    assert outcomes[1] == _outcome("flow_b", "failed") and "attempts" not in outcomes[2]
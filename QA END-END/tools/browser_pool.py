@@ -0,0 +1,136 @@
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+from tools.logger import setup_logger
+from tools.tracer import tracer
+from contextlib import asynccontextmanager
+import asyncio
+from typing import Dict, Any, List, Optional, AsyncIterator
+
+logger = setup_logger()
+
+class BrowserSlot:
+    """A pooled Chromium process and the number of contexts it has served."""
+    def __init__(self, browser: Browser) -> None:
+        self.browser: Browser = browser
+        self.uses: int = 0
+
+class BrowserPool:
+    """Long-lived pool of Chromium processes shared by every PlaywrightExecutor call.
+
+    Browsers are launched lazily on first use and handed out one at a time; each
+    acquisition gets a fresh BrowserContext so flows stay isolated without paying
+    for a new process. A browser is relaunched when it fails its health check or
+    after serving ``max_uses`` contexts.
+    """
+    def __init__(self, size: int = 2, max_uses: int = 50, headless: bool = True,
+                 launch_options: Optional[Dict[str, Any]] = None) -> None:
+        self.size: int = max(1, size)
+        self.max_uses: int = max(1, max_uses)
+        self.headless: bool = headless
+        self.launch_options: Dict[str, Any] = launch_options or {}
+        self._playwright: Optional[Playwright] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._slots: List[BrowserSlot] = []
+        self._lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def from_config(cls, ui_config: Dict[str, Any]) -> "BrowserPool":
+        pool_config: Dict[str, Any] = ui_config.get("browser_pool", {})
+        return cls(
+            size=pool_config.get("size", 2),
+            max_uses=pool_config.get("max_uses", 50),
+            headless=pool_config.get("headless", True),
+            launch_options=pool_config.get("launch_options", {})
+        )
+
+    async def __aenter__(self) -> "BrowserPool":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _launch(self) -> BrowserSlot:
+        with tracer.span("launch_browser", "playwright", pooled=True):
+            browser: Browser = await self._playwright.chromium.launch(headless=self.headless, **self.launch_options)
+        slot = BrowserSlot(browser)
+        self._slots.append(slot)
+        logger.debug(f"Browser pool launched browser {len(self._slots)}/{self.size}")
+        return slot
+
+    async def _retire(self, slot: BrowserSlot) -> None:
+        if slot in self._slots:
+            self._slots.remove(slot)
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled browser: {str(e)}")
+
+    async def _start(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._playwright is not None:
+                return
+            self._playwright = await async_playwright().start()
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(None)  # Placeholder slot, launched on demand
+            logger.info(f"Browser pool started with size {self.size}")
+
+    async def _checkout(self) -> BrowserSlot:
+        await self._start()
+        slot: Optional[BrowserSlot] = await self._idle.get()
+        try:
+            if slot is not None and (not slot.browser.is_connected() or slot.uses >= self.max_uses):
+                logger.info(f"Recycling pooled browser after {slot.uses} uses")
+                await self._retire(slot)
+                slot = None
+            if slot is None:
+                slot = await self._launch()
+            slot.uses += 1
+            return slot
+        except Exception:
+            self._idle.put_nowait(None)
+            raise
+
+    @asynccontextmanager
+    async def context(self, **context_options: Any) -> AsyncIterator[BrowserContext]:
+        slot: BrowserSlot = await self._checkout()
+        idle: asyncio.Queue = self._idle
+        browser_context: Optional[BrowserContext] = None
+        try:
+            browser_context = await slot.browser.new_context(**context_options)
+            yield browser_context
+        finally:
+            if browser_context is not None:
+                try:
+                    await browser_context.close()
+                except Exception as e:
+                    logger.warning(f"Error closing browser context: {str(e)}")
+            await self._release(idle, slot)
+
+    async def _release(self, idle: asyncio.Queue, slot: BrowserSlot) -> None:
+        if self._idle is not idle:
+            # The pool was closed (and maybe restarted) while this context was out; its browser is already gone
+            logger.debug("Browser context released after the pool closed")
+            return
+        if slot.browser.is_connected():
+            idle.put_nowait(slot)
+            return
+        logger.info("Pooled browser disconnected, relaunching it on next use")
+        idle.put_nowait(None)  # Requeued first, so a cancelled cleanup cannot shrink the pool
+        await self._retire(slot)
+
+    async def close(self) -> None:
+        try:
+            for slot in list(self._slots):
+                await self._retire(slot)
+            if self._playwright is not None:
+                await self._playwright.stop()
+                logger.info("Browser pool closed")
+        except Exception as e:
+            logger.error(f"Error closing browser pool: {str(e)}")
+            raise
+        finally:
+            self._playwright = None
+            self._idle = None
+            self._slots = []
@@ -19,6 +19,10 @@ class ConfigLoader:
             elif isinstance(autocrawl, int) and autocrawl < 1:
                 logger.warning("Invalid 'autocrawl' depth. Defaulting to false.")
                 config["autocrawl"] = False
+            max_parallel_flows = config.get("max_parallel_flows", 4)
+            if not isinstance(max_parallel_flows, int) or isinstance(max_parallel_flows, bool) or max_parallel_flows < 1:
+                logger.warning("Invalid 'max_parallel_flows' value in ui_flow_config.json. Defaulting to 4.")
+                config["max_parallel_flows"] = 4
             logger.info("UI config loaded successfully")
             return config
         except Exception as e:
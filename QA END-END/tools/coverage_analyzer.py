@@ -1,4 +1,6 @@
-from tools.logger import setup_logger
+from tools.logger import setup_logger, summarize as log_summary
+from tools.tracer import tracer
+import importlib.util
 import subprocess
 import json
 import os
@@ -7,29 +9,75 @@ from typing import Dict, Any, List, TextIO
 logger = setup_logger()
 
 class CoverageAnalyzer:
+    @staticmethod
+    def plugin_available() -> bool:
+        """Whether pytest-cov is installed; without it pytest rejects --cov and runs no tests at all."""
+        return importlib.util.find_spec("pytest_cov") is not None
+
+    @staticmethod
+    def coverage_args(report_file: str) -> List[str]:
+        """pytest arguments that make a test run also write coverage JSON to report_file."""
+        return ["--cov", f"--cov-report=json:{report_file}"]
+
+    @staticmethod
+    def summarize(raw_coverage: Dict[str, Any]) -> Dict[str, Any]:
+        """Reduce a coverage.py JSON report to per-file line counts and missing lines."""
+        files: Dict[str, Dict[str, Any]] = {}
+        for path, data in raw_coverage.get("files", {}).items():  # type
+            summary: Dict[str, Any] = data.get("summary", {})
+            files[path] = {
+                "statements": summary.get("num_statements", 0),
+                "covered": summary.get("covered_lines", 0),
+                "percent": round(summary.get("percent_covered", 0.0), 2),
+                "missing_lines": data.get("missing_lines", [])
+            }
+        totals: Dict[str, Any] = raw_coverage.get("totals", {})
+        return {
+            "totals": {
+                "statements": totals.get("num_statements", 0),
+                "covered": totals.get("covered_lines", 0),
+                "percent": round(totals.get("percent_covered", 0.0), 2)
+            },
+            "files": files
+        }
+
+    def load_summary(self, report_file: str) -> Dict[str, Any]:
+        with open(report_file, "r", encoding="utf-8") as f:  # type
+            return self.summarize(json.load(f))
+
+    def write_report(self, coverage_data: Dict[str, Dict[str, Any]]) -> str:
+        cov_report_file: str = os.path.join("results", "test_logs", "coverage.json")
+        os.makedirs(os.path.dirname(cov_report_file), exist_ok=True)
+        with open(cov_report_file, "w", encoding="utf-8") as f:  # type
+            json.dump(coverage_data, f, indent=2)
+        return cov_report_file
+
     def analyze_coverage(self, test_files: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        # Fallback for runs where TestRunner did not collect coverage alongside the tests
         try:
             coverage_data: Dict[str, Dict[str, Any]] = {}
-            cov_report_file: str = os.path.join("results", "test_logs", "coverage.json")
-            os.makedirs(os.path.dirname(cov_report_file), exist_ok=True)
+            tmp_cov_file: str = "tmp_cov.json"
+            if not self.plugin_available():
+                logger.warning("pytest-cov is not installed, skipping coverage analysis")
+                self.write_report(coverage_data)
+                return coverage_data
 
             for test_type, test_file in test_files.items():  # type
                 logger.debug(f"Running coverage for {test_type}: {test_file}")
                 if not os.path.exists(test_file):
                     logger.warning(f"Test file {test_file} does not exist, skipping")
                     continue
-                cmd = ["pytest", test_file, "--cov", "--cov-report=json:tmp_cov.json"]
-                subprocess.run(cmd, capture_output=True, text=True)
-                if os.path.exists("tmp_cov.json"):
-                    with open("tmp_cov.json", "r", encoding="utf-8") as f:  # type
-                        coverage_data[test_type] = json.load(f)
-                    os.remove("tmp_cov.json")
+                cmd = ["pytest", test_file] + self.coverage_args(tmp_cov_file)
+                with tracer.span("pytest_coverage", "pytest", suite=test_type):
+                    subprocess.run(cmd, capture_output=True, text=True)
+                if os.path.exists(tmp_cov_file):
+                    coverage_data[test_type] = self.load_summary(tmp_cov_file)
+                    os.remove(tmp_cov_file)
                 else:
                     logger.warning(f"No coverage data generated for {test_type}")
 
-            with open(cov_report_file, "w", encoding="utf-8") as f:  # type
-                json.dump(coverage_data, f, indent=2)
-            logger.info("Coverage analysis completed: %s", coverage_data)
+            self.write_report(coverage_data)
+            logger.info("Coverage analysis completed: %s", log_summary(coverage_data))
             return coverage_data
         except Exception as e:
             logger.error(f"Error analyzing coverage: {str(e)}")
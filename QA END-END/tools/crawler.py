@@ -0,0 +1,176 @@
+from tools.logger import setup_logger
+from tools.tracer import tracer
+from urllib.parse import urljoin, urldefrag, urlsplit, urlunsplit, parse_qsl, urlencode
+import asyncio
+from typing import Dict, Any, List, Optional, Callable, Set, Tuple
+
+logger = setup_logger()
+
+# Collect everything a page offers in one round trip instead of per-element get_attribute calls.
+# Action entries and followed links have separate limits, so a small per-page action
+# budget does not also cap how far the crawl can spread.
+_ELEMENTS_SCRIPT = """
+(elements, [maxElements, maxLinks]) => {
+    const describe = el => ({
+        id: el.getAttribute("id"),
+        cls: el.getAttribute("class"),
+        href: el.getAttribute("href")
+    });
+    return {
+        elements: elements.slice(0, maxElements).map(describe),
+        links: elements.filter(el => el.hasAttribute("href")).slice(0, maxLinks).map(describe)
+    };
+}
+"""
+
+_DEFAULT_PORTS: Dict[str, int] = {"http": 80, "https": 443}
+
+def normalize_url(href: str, base: str) -> Optional[str]:
+    """Resolve href against base and return a canonical URL, or None if not crawlable."""
+    if not href:
+        return None
+    href = href.strip()
+    if href.startswith(("javascript:", "mailto:", "tel:", "data:")):
+        return None
+    url, _ = urldefrag(urljoin(base, href))
+    parts = urlsplit(url)
+    scheme: str = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS:
+        return None
+    host: str = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"  # hostname strips the brackets of IPv6 literals
+    if parts.port and parts.port != _DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+    path: str = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+    query: str = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+def same_origin(url: str, root: str) -> bool:
+    a, b = urlsplit(url), urlsplit(root)
+    return (a.scheme, a.netloc) == (b.scheme, b.netloc)
+
+class Crawler:
+    """Breadth-first crawl engine fed by a shared frontier and N concurrent page workers.
+
+    The frontier is an asyncio.Queue (FIFO, so breadth-first) and the visited
+    index is keyed on canonical URLs, so relative, fragment and trailing-slash
+    variants of a page are visited once. Results are ordered by discovery so
+    repeated crawls of the same app produce the same list.
+    """
+    def __init__(self, new_page: Callable[[], Any], max_depth: int = 2, max_pages: int = 100,
+                 max_elements: int = 3, workers: int = 4, same_origin_only: bool = True,
+                 page_timeout: int = 10000, max_links: int = 50) -> None:
+        self.new_page = new_page
+        self.max_depth: int = max_depth
+        self.max_pages: int = max(1, max_pages)
+        self.max_elements: int = max(0, max_elements)
+        self.max_links: int = max(0, max_links)
+        self.workers: int = max(1, workers)
+        self.same_origin_only: bool = same_origin_only
+        self.page_timeout: int = page_timeout
+
+    @classmethod
+    def from_config(cls, new_page: Callable[[], Any], ui_config: Dict[str, Any], max_depth: int) -> "Crawler":
+        crawl_config: Dict[str, Any] = ui_config.get("crawl", {})
+        return cls(
+            new_page,
+            max_depth=crawl_config.get("max_depth", max_depth),
+            max_pages=crawl_config.get("max_pages", 100),
+            max_elements=crawl_config.get("max_elements_per_page", 3),
+            workers=crawl_config.get("workers", 4),
+            same_origin_only=crawl_config.get("same_origin", True),
+            page_timeout=crawl_config.get("page_timeout", 10000),
+            max_links=crawl_config.get("max_links_per_page", 50)
+        )
+
+    async def crawl(self, start_url: str) -> List[Dict[str, Any]]:
+        try:
+            root: Optional[str] = normalize_url(start_url, start_url)
+            if root is None:
+                raise ValueError(f"Cannot crawl non-HTTP URL: {start_url}")
+            frontier: asyncio.Queue = asyncio.Queue()
+            visited: Set[str] = {root}
+            found: List[Tuple[int, List[Dict[str, Any]]]] = []
+            counter: List[int] = [0]
+
+            def enqueue(url: str, actions: List[Dict[str, Any]], depth: int) -> None:
+                seq: int = counter[0]
+                counter[0] += 1
+                frontier.put_nowait((seq, url, actions, depth))
+
+            async def worker() -> None:
+                async with self.new_page() as page:
+                    while True:
+                        seq, url, actions, depth = await frontier.get()
+                        try:
+                            found.append((seq, await self._visit(page, url, actions, depth, visited, enqueue, root)))
+                        except Exception as e:
+                            logger.warning(f"Error crawling {url}: {str(e)}")
+                        finally:
+                            frontier.task_done()
+
+            enqueue(root, [], 0)
+            tasks: List[asyncio.Task] = [asyncio.create_task(worker()) for _ in range(self.workers)]
+            done: asyncio.Task = asyncio.create_task(frontier.join())
+            try:
+                await asyncio.wait([done, *tasks], return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if task.done() and task.exception():
+                        raise task.exception()
+            finally:
+                for task in [done, *tasks]:
+                    task.cancel()
+                await asyncio.gather(done, *tasks, return_exceptions=True)
+
+            results: List[Dict[str, Any]] = [entry for _, entries in sorted(found, key=lambda f: f[0]) for entry in entries]
+            logger.info(f"Crawl completed, visited {len(visited)} pages, found {len(results)} actions")
+            return results
+        except Exception as e:
+            logger.error(f"Error in crawl engine: {str(e)}")
+            raise
+
+    async def visit(self, page: Any, url: str, actions: List[Dict[str, Any]], depth: int,
+                    root: str) -> Tuple[List[Dict[str, Any]], List[Tuple[str, List[Dict[str, Any]], int]]]:
+        """Visit a single frontier entry for an external coordinator.
+
+        Returns the page's entries and every link it would enqueue; the
+        coordinator owns the visited set and the page budget.
+        """
+        discovered: List[Tuple[str, List[Dict[str, Any]], int]] = []
+        entries: List[Dict[str, Any]] = await self._visit(
+            page, url, actions, depth, set(), lambda *item: discovered.append(item), root
+        )
+        return entries, discovered
+
+    async def _visit(self, page: Any, url: str, actions: List[Dict[str, Any]], depth: int,
+                     visited: Set[str], enqueue: Callable[..., None], root: str) -> List[Dict[str, Any]]:
+        with tracer.span("goto", "playwright", url=url, depth=depth):
+            await page.goto(url, timeout=self.page_timeout)
+        with tracer.span("collect_elements", "playwright", url=url):
+            collected: Dict[str, List[Dict[str, Optional[str]]]] = await page.eval_on_selector_all(
+                "a, button", _ELEMENTS_SCRIPT, [self.max_elements, self.max_links]
+            )
+        entries: List[Dict[str, Any]] = [
+            {"page": url, "actions": actions + [self._click(element)], "expected_result": {"status": "navigated"}}
+            for element in collected["elements"]
+        ]
+        if depth + 1 > self.max_depth:
+            return entries
+        for link in collected["links"]:
+            if len(visited) >= self.max_pages:
+                break
+            target: Optional[str] = normalize_url(link.get("href") or "", page.url or url)
+            if target is None or target in visited:
+                continue
+            if self.same_origin_only and not same_origin(target, root):
+                continue
+            visited.add(target)
+            enqueue(target, actions + [self._click(link)], depth + 1)
+        return entries
+
+    @staticmethod
+    def _click(element: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        return {"type": "click", "selector": element.get("id") or element.get("cls") or "unknown"}
@@ -0,0 +1,28 @@
+import os
+import time
+from typing import List, Optional, Tuple
+
+def evict(cache_dir: str, max_bytes: int, ttl: Optional[float] = None, suffix: str = ".json") -> int:
+    """Trim a one-file-per-entry cache directory; returns the number of entries removed.
+
+    Entries written more than ``ttl`` seconds ago are removed first, then the
+    least recently written ones until the directory fits in ``max_bytes``.
+    """
+    entries: List[Tuple[float, int, str]] = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(suffix):
+            stat = os.stat(os.path.join(cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total: int = sum(size for _, size, _ in entries)
+    expired_before: float = time.time() - ttl if ttl is not None else float("-inf")
+    removed: int = 0
+    for mtime, size, name in sorted(entries):
+        if mtime >= expired_before and total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except OSError:
+            continue  # Already removed by a concurrent writer
+        total -= size
+        removed += 1
+    return removed
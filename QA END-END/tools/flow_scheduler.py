@@ -0,0 +1,80 @@
+from tools.logger import setup_logger
+from tools.scheduling import cancel_pending
+import asyncio
+import time
+from typing import Dict, Any, List, Callable, Awaitable, Optional
+
+logger = setup_logger()
+
+class FlowScheduler:
+    """Runs independent UI jobs concurrently with a bounded number in flight.
+
+    Outcomes are returned in submission order regardless of completion order.
+    Each job gets its own timeout; a job that times out or raises is recorded
+    as such instead of failing the whole batch.
+    """
+    def __init__(self, max_parallel: int = 4, timeout: Optional[float] = None) -> None:
+        self.max_parallel: int = max(1, max_parallel)
+        self.timeout: Optional[float] = timeout
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_config(cls, ui_config: Dict[str, Any]) -> "FlowScheduler":
+        return cls(
+            max_parallel=ui_config.get("max_parallel_flows", 4),
+            timeout=ui_config.get("flow_timeout")
+        )
+
+    async def _run_one(self, semaphore: asyncio.Semaphore, name: str, job: Callable[[], Awaitable[Any]],
+                       on_outcome: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        outcome: Dict[str, Any] = await self._attempt(semaphore, name, job)
+        if on_outcome is not None:
+            on_outcome(outcome)
+        return outcome
+
+    async def _attempt(self, semaphore: asyncio.Semaphore, name: str, job: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        # Timed from when the job gets a slot: queue wait is not part of a flow's duration,
+        # which is stored and used to order flows in later runs.
+        start: Optional[float] = None
+
+        def elapsed() -> float:
+            return time.perf_counter() - start if start is not None else 0.0
+
+        try:
+            async with semaphore:
+                start = time.perf_counter()
+                result: Any = await asyncio.wait_for(job(), timeout=self.timeout)
+            return {"name": name, "status": "completed", "result": result, "error": None,
+                    "duration": elapsed()}
+        except asyncio.TimeoutError:
+            logger.warning(f"Flow {name} timed out after {self.timeout}s")
+            return {"name": name, "status": "timeout", "result": None,
+                    "error": f"Timed out after {self.timeout}s", "duration": elapsed()}
+        except asyncio.CancelledError:
+            logger.warning(f"Flow {name} cancelled")
+            return {"name": name, "status": "cancelled", "result": None, "error": "Cancelled",
+                    "duration": elapsed()}
+        except Exception as e:
+            logger.error(f"Flow {name} failed: {str(e)}")
+            return {"name": name, "status": "failed", "result": None, "error": str(e),
+                    "duration": elapsed()}
+
+    async def run(self, jobs: List[Callable[[], Awaitable[Any]]], names: List[str],
+                  on_outcome: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Jobs start in list order; ``on_outcome`` sees each outcome as soon as its job ends."""
+        try:
+            semaphore = asyncio.Semaphore(self.max_parallel)
+            self._tasks = [
+                asyncio.create_task(self._run_one(semaphore, name, job, on_outcome))
+                for name, job in zip(names, jobs)
+            ]
+            logger.info(f"Scheduling {len(self._tasks)} flows with max_parallel={self.max_parallel}")
+            return list(await asyncio.gather(*self._tasks))
+        except Exception as e:
+            logger.error(f"Error scheduling flows: {str(e)}")
+            raise
+        finally:
+            self._tasks = []
+
+    def cancel(self) -> None:
+        cancel_pending(self._tasks)
@@ -1,55 +1,165 @@
+import html
 import json
 import os
 from tools.logger import setup_logger
-from typing import Dict, Any, List, TextIO
+from typing import Dict, Any, List, TextIO, Optional, Iterable, Tuple
 
 logger = setup_logger()
 
+TEST_TYPES: List[str] = ["unit", "integration", "ui", "ui_flow"]
+
+HTML_HEADER: str = """<html>
+<head>
+    <title>Test Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; vertical-align: top; }
+        th { background-color: #f2f2f2; }
+        pre { margin: 0; white-space: pre-wrap; word-break: break-all; }
+        .passed { color: green; }
+        .failed { color: red; }
+        .skipped { color: gray; }
+    </style>
+</head>
+<body>
+    <h1>Test Report</h1>
+    <table>
+        <tr>
+            <th>Test Type</th>
+            <th>Test ID</th>
+            <th>Status</th>
+            <th>Details</th>
+        </tr>
+"""
+
+HTML_FOOTER: str = """</body>
+</html>
+"""
+
+TIMING_COLUMNS: List[str] = ["category", "name", "count", "total", "mean", "max"]
+TIMING_LABELS: List[str] = ["Category", "Span", "Count", "Total (s)", "Mean (s)", "Max (s)"]
+
+MD_HEADER: str = "# Test Report\n\n| Test Type | Test ID | Status | Details |\n|-----------|---------|--------|---------|\n"
+
+MD_TIMING_HEADER: str = ("\n## Performance\n\n| Category | Span | Count | Total (s) | Mean (s) | Max (s) |\n"
+                         "|----------|------|-------|-----------|----------|---------|\n")
+
+class ReportWriter:
+    """Streams report rows straight to the HTML and/or Markdown files.
+
+    Rows are written as they arrive, so memory stays flat regardless of the
+    number of tests. Each test's details are serialised once and shared by both
+    formats; payloads longer than ``max_details_chars`` are truncated, and in
+    HTML anything longer than ``collapse_chars`` is folded into a <details> block.
+    ``timings`` (rows from ``Tracer.summary``) are appended as a performance table.
+    """
+    def __init__(self, html_file: Optional[str] = None, markdown_file: Optional[str] = None,
+                 max_details_chars: int = 2000, collapse_chars: int = 200,
+                 timings: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.html_file: Optional[str] = html_file
+        self.markdown_file: Optional[str] = markdown_file
+        self.max_details_chars: int = max_details_chars
+        self.collapse_chars: int = collapse_chars
+        self.timings: List[Dict[str, Any]] = timings or []
+        self._html: Optional[TextIO] = None
+        self._md: Optional[TextIO] = None
+        self.rows: int = 0
+
+    def __enter__(self) -> "ReportWriter":
+        for path in (self.html_file, self.markdown_file):
+            if path:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if self.html_file:
+            self._html = open(self.html_file, "w", encoding="utf-8")
+            self._html.write(HTML_HEADER)
+        if self.markdown_file:
+            self._md = open(self.markdown_file, "w", encoding="utf-8")
+            self._md.write(MD_HEADER)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._html is not None:
+            self._html.write("    </table>\n")
+            self._write_html_timings()
+            self._html.write(HTML_FOOTER)
+            self._html.close()
+        if self._md is not None:
+            self._write_md_timings()
+            self._md.close()
+
+    def _write_html_timings(self) -> None:
+        if not self.timings:
+            return
+        self._html.write("    <h2>Performance</h2>\n    <table>\n        <tr>\n")
+        for label in TIMING_LABELS:
+            self._html.write(f"            <th>{label}</th>\n")
+        self._html.write("        </tr>\n")
+        for row in self.timings:
+            cells: str = "".join(f"<td>{html.escape(str(row.get(column, '')))}</td>" for column in TIMING_COLUMNS)
+            self._html.write(f"        <tr>{cells}</tr>\n")
+        self._html.write("    </table>\n")
+
+    def _write_md_timings(self) -> None:
+        if not self.timings:
+            return
+        self._md.write(MD_TIMING_HEADER)
+        for row in self.timings:
+            cells: str = " | ".join(str(row.get(column, "")).replace("|", "\\|") for column in TIMING_COLUMNS)
+            self._md.write(f"| {cells} |\n")
+
+    def _details(self, test: Dict[str, Any]) -> Tuple[str, int]:
+        details: str = json.dumps(test.get("details", {}), default=str)
+        size: int = len(details)
+        if size > self.max_details_chars:
+            details = details[:self.max_details_chars]
+        return details, size
+
+    def write_row(self, test_type: str, test: Dict[str, Any]) -> None:
+        passed: bool = test.get("passed", False)
+        status: str = "Skipped" if test.get("skipped") else "Passed" if passed else "Failed"
+        test_id: str = str(test.get("test_id", "unknown"))
+        details, size = self._details(test)
+        suffix: str = f"... ({size} chars total)" if size > len(details) else ""
+
+        if self._html is not None:
+            body: str = f"<pre>{html.escape(details + suffix)}</pre>"
+            if size > self.collapse_chars:
+                body = f"<details><summary>{size} chars</summary>{body}</details>"
+            self._html.write(
+                f'        <tr>\n'
+                f'            <td>{html.escape(test_type)}</td>\n'
+                f'            <td>{html.escape(test_id)}</td>\n'
+                f'            <td class="{status.lower()}">{status}</td>\n'
+                f'            <td>{body}</td>\n'
+                f'        </tr>\n'
+            )
+        if self._md is not None:
+            cell: str = (details + suffix).replace("|", "\\|").replace("\n", " ")
+            md_test_id: str = test_id.replace("|", "\\|")
+            self._md.write(f"| {test_type} | {md_test_id} | {status} | {cell} |\n")
+        self.rows += 1
+
+    def write_rows(self, evaluation_results: Dict[str, Iterable[Dict[str, Any]]]) -> None:
+        for test_type in TEST_TYPES:
+            for test in evaluation_results.get(test_type, []):  # type
+                self.write_row(test_type, test)
+
+def generate_reports(evaluation_results: Dict[str, List[Dict[str, Any]]], html_file: Optional[str],
+                     markdown_file: Optional[str], timings: Optional[List[Dict[str, Any]]] = None) -> None:
+    """Write the HTML and Markdown reports in a single pass over the results."""
+    try:
+        with ReportWriter(html_file, markdown_file, timings=timings) as writer:
+            writer.write_rows(evaluation_results)
+        logger.info(f"Reports generated ({writer.rows} rows): {', '.join(p for p in (html_file, markdown_file) if p)}")
+    except Exception as e:
+        logger.error(f"Error generating reports: {str(e)}")
+        raise
+
 def generate_html_report(evaluation_results: Dict[str, List[Dict[str, Any]]], output_file: str) -> None:
     try:
-        html_content: str = """
-        <html>
-        <head>
-            <title>Test Report</title>
-            <style>
-                body { font-family: Arial, sans-serif; }
-                table { border-collapse: collapse; width: 100%; }
-                th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-                th { background-color: #f2f2f2; }
-                .passed { color: green; }
-                .failed { color: red; }
-            </style>
-        </head>
-        <body>
-            <h1>Test Report</h1>
-            <table>
-                <tr>
-                    <th>Test Type</th>
-                    <th>Test ID</th>
-                    <th>Status</th>
-                    <th>Details</th>
-                </tr>
-        """
-        for test_type in ["unit", "integration", "ui"]:
-            for test in evaluation_results.get(test_type, []):  # type
-                status: str = "Passed" if test.get("passed", False) else "Failed"
-                status_class: str = "passed" if test.get("passed", False) else "failed"
-                html_content += f"""
-                <tr>
-                    <td>{test_type}</td>
-                    <td>{test.get('test_id', 'unknown')}</td>
-                    <td class="{status_class}">{status}</td>
-                    <td>{json.dumps(test.get('details', {}))}</td>
-                </tr>
-                """
-        html_content += """
-            </table>
-        </body>
-        </html>
-        """
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        with open(output_file, "w", encoding="utf-8") as f:  # type
-            f.write(html_content)
+        with ReportWriter(html_file=output_file) as writer:
+            writer.write_rows(evaluation_results)
         logger.info(f"HTML report generated at {output_file}")
     except Exception as e:
         logger.error(f"Error generating HTML report: {str(e)}")
@@ -57,18 +167,9 @@ def generate_html_report(evaluation_results: Dict[str, List[Dict[str, Any]]], ou
 
 def generate_markdown_report(evaluation_results: Dict[str, List[Dict[str, Any]]], output_file: str) -> None:
     try:
-        md_content: str = "# Test Report\n\n"
-        md_content += "| Test Type | Test ID | Status | Details |\n"
-        md_content += "|-----------|---------|--------|---------|\n"
-        for test_type in ["unit", "integration", "ui"]:
-            for test in evaluation_results.get(test_type, []):  # type
-                status: str = "Passed" if test.get("passed", False) else "Failed"
-                details: str = json.dumps(test.get("details", {})).replace("|", "\\|")
-                md_content += f"| {test_type} | {test.get('test_id', 'unknown')} | {status} | {details} |\n"
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        with open(output_file, "w", encoding="utf-8") as f:  # type
-            f.write(md_content)
+        with ReportWriter(markdown_file=output_file) as writer:
+            writer.write_rows(evaluation_results)
         logger.info(f"Markdown report generated at {output_file}")
     except Exception as e:
         logger.error(f"Error generating Markdown report: {str(e)}")
-        raise
\ No newline at end of file
+        raise
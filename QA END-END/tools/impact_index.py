@@ -0,0 +1,83 @@
+from tools.logger import setup_logger
+from fnmatch import fnmatch
+import json
+import os
+import re
+from typing import Dict, Any, List, Optional, Set
+
+logger = setup_logger()
+
+def flow_test_id(flow: Dict[str, Any]) -> str:
+    return f"ui_{flow.get('page', 'unknown')}_{flow.get('actions', [{}])[0].get('type', 'unknown')}"
+
+def _normalize(path: str) -> str:
+    return os.path.normpath(path).replace("\\", "/")
+
+def _tokens(path: str) -> Set[str]:
+    # "src/pages/Login-Form.tsx" -> {"src", "pages", "login", "form", "tsx"}
+    return {t for t in re.split(r"[^a-z0-9]+", path.lower()) if t}
+
+class ImpactIndex:
+    """Maps changed source files to the UI flows and test suites they affect.
+
+    UI flows are mapped from the flow config: explicit ``covers`` globs, plus
+    the tokens of the flow's ``page``, ``routes`` and ``components`` matched
+    against path segments of the changed file. Suites are mapped from the
+    per-file coverage collected on previous runs. Files nothing maps to are
+    reported as unmapped so the caller can fall back to running everything.
+    """
+    def __init__(self) -> None:
+        self.flow_globs: Dict[str, List[str]] = {}
+        self.flow_tokens: Dict[str, Set[str]] = {}
+        self.file_suites: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def build(cls, ui_config: Dict[str, Any], coverage_data: Optional[Dict[str, Dict[str, Any]]] = None) -> "ImpactIndex":
+        index = cls()
+        for flow in ui_config.get("flows", []):  # type
+            if flow.get("setup"):
+                continue
+            test_id: str = flow_test_id(flow)
+            index.flow_globs.setdefault(test_id, []).extend(flow.get("covers", []))
+            tokens: Set[str] = index.flow_tokens.setdefault(test_id, set())
+            for name in [flow.get("page", "")] + flow.get("routes", []) + flow.get("components", []):
+                tokens.update(_tokens(name))
+        for suite, data in (coverage_data or {}).items():
+            for path in data.get("files", {}):
+                index.file_suites.setdefault(_normalize(path), set()).add(suite)
+        logger.info(f"Impact index built: {len(index.flow_globs)} flows, {len(index.file_suites)} covered files")
+        return index
+
+    @classmethod
+    def from_previous_run(cls, ui_config: Dict[str, Any],
+                          coverage_file: str = os.path.join("results", "test_logs", "coverage.json")) -> "ImpactIndex":
+        coverage_data: Optional[Dict[str, Dict[str, Any]]] = None
+        if os.path.exists(coverage_file):
+            try:
+                with open(coverage_file, "r", encoding="utf-8") as f:
+                    coverage_data = json.load(f)
+            except ValueError as e:
+                logger.warning(f"Ignoring unreadable coverage file {coverage_file}: {str(e)}")
+        return cls.build(ui_config, coverage_data)
+
+    def flows_for(self, changed_file: str) -> Set[str]:
+        path: str = _normalize(changed_file)
+        tokens: Set[str] = _tokens(path)
+        return {
+            test_id for test_id in self.flow_globs
+            if any(fnmatch(path, pattern) for pattern in self.flow_globs[test_id])
+            or (self.flow_tokens.get(test_id) and self.flow_tokens[test_id] <= tokens)
+        }
+
+    def select(self, changed_files: List[str]) -> Dict[str, Any]:
+        flows: Set[str] = set()
+        suites: Set[str] = set()
+        unmapped: List[str] = []
+        for changed_file in changed_files:
+            file_flows: Set[str] = self.flows_for(changed_file)
+            file_suites: Set[str] = self.file_suites.get(_normalize(changed_file), set())
+            if not file_flows and not file_suites:
+                unmapped.append(changed_file)
+            flows |= file_flows
+            suites |= file_suites
+        return {"flows": sorted(flows), "suites": sorted(suites), "unmapped": unmapped}
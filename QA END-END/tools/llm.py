@@ -1,14 +1,40 @@
-from tools.llm_utils import get_llm_response
+from tools.llm_utils import get_llm_response, ResponseCache
 from tools.logger import setup_logger
+import asyncio
+from typing import Dict, Any, List, Optional, Callable
 
 logger = setup_logger()
 
 class LLM:
+    def __init__(self, backend: Optional[Callable[[str, str, Dict[str, Any]], str]] = None,
+                 cache: Optional[ResponseCache] = None, use_cache: bool = True) -> None:
+        self.backend = backend
+        self.cache = cache
+        self.use_cache: bool = use_cache
+
     def generate(self, prompt):
         try:
-            response = get_llm_response(prompt)
+            response = get_llm_response(prompt, cache=self.cache, use_cache=self.use_cache, backend=self.backend)
             logger.info("LLM response generated successfully")
             return response
         except Exception as e:
             logger.error(f"Error generating LLM response: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    async def generate_batch(self, prompts: List[str], max_concurrency: int = 4) -> List[str]:
+        """Generate responses for many prompts concurrently; duplicates are requested once."""
+        try:
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+            unique: List[str] = list(dict.fromkeys(prompts))
+
+            async def one(prompt: str) -> str:
+                async with semaphore:
+                    return await asyncio.to_thread(get_llm_response, prompt, cache=self.cache,
+                                                   use_cache=self.use_cache, backend=self.backend)
+
+            responses: Dict[str, str] = dict(zip(unique, await asyncio.gather(*(one(p) for p in unique))))
+            logger.info(f"LLM batch of {len(prompts)} prompts generated ({len(unique)} unique)")
+            return [responses[p] for p in prompts]
+        except Exception as e:
+            logger.error(f"Error generating LLM batch: {str(e)}")
+            raise
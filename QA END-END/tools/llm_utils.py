@@ -1,28 +1,116 @@
+from tools.disk_cache import evict
 from tools.logger import setup_logger
+from tools.tracer import tracer
 from openai import OpenAI
 from dotenv import load_dotenv
+import hashlib
+import json
 import os
+import threading
+import time
+from typing import Dict, Any, Optional, Callable
 
 # Load .env and setup logger
 load_dotenv()
 logger = setup_logger()
 
-def get_llm_response(prompt):
-    try:
-        # Get the key from the environment
-        api_key = os.getenv("OPENAI_API_KEY")
-        client = OpenAI(api_key=api_key)
+DEFAULT_MODEL = "gpt-4.1-nano"
+
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+
+def get_client() -> OpenAI:
+    # One client per process so the underlying HTTP connection pool is reused.
+    # OPENAI_BASE_URL (read by the SDK) can point it at a local stub server.
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return _client
+
+class ResponseCache:
+    """On-disk LLM response cache keyed by backend, model, prompt and parameters.
+
+    One JSON file per entry. Entries older than ``ttl`` seconds are ignored and
+    removed; when the directory grows past ``max_bytes`` the least recently
+    written entries are evicted.
+    """
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None) -> None:
+        self.cache_dir: str = cache_dir or os.getenv("LLM_CACHE_DIR", os.path.join(".cache", "llm"))
+        self.ttl: float = ttl if ttl is not None else float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+        self.max_bytes: int = max_bytes if max_bytes is not None else int(os.getenv("LLM_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, prompt: str, params: Dict[str, Any], backend: str = "openai") -> str:
+        payload: str = json.dumps({"backend": backend, "model": model, "prompt": prompt, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-        # Use completions for text-davinci-003
-        response = client.completions.create(
-            model="gpt-4.1-nano",
-            prompt=prompt,
-            max_tokens=1000,
-            temperature=0.7
-        )
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
 
-        return response.choices[0].text.strip()
+    def get(self, key: str) -> Optional[str]:
+        path: str = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry.get("response")
 
+    def set(self, key: str, response: str) -> None:
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path: str = self._path(key) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "response": response}, f)
+            os.replace(tmp_path, self._path(key))
+            evict(self.cache_dir, self.max_bytes, self.ttl)
+
+_default_cache: Optional[ResponseCache] = None
+
+def get_cache() -> ResponseCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
+
+def _openai_backend(prompt: str, model: str, params: Dict[str, Any]) -> str:
+    response = get_client().completions.create(model=model, prompt=prompt, **params)
+    return response.choices[0].text.strip()
+
+def backend_name(backend: Optional[Callable[..., str]]) -> str:
+    """Stable identity of a completion backend for cache keys; ``None`` is the OpenAI backend."""
+    if backend is None or backend is _openai_backend:
+        return "openai"
+    target = getattr(backend, "func", backend)  # functools.partial
+    return f"{getattr(target, '__module__', '')}.{getattr(target, '__qualname__', type(target).__qualname__)}"
+
+def get_llm_response(prompt, model: str = DEFAULT_MODEL, max_tokens: int = 1000, temperature: float = 0.7,
+                     cache: Optional[ResponseCache] = None, use_cache: bool = True,
+                     backend: Optional[Callable[[str, str, Dict[str, Any]], str]] = None):
+    # backend(prompt, model, params) replaces the OpenAI call, e.g. with a fake for offline tests
+    params: Dict[str, Any] = {"max_tokens": max_tokens, "temperature": temperature}
+    cache = cache or get_cache()
+    key: str = ResponseCache.key(model, prompt, params, backend_name(backend))
+    if use_cache:
+        cached: Optional[str] = cache.get(key)
+        if cached is not None:
+            logger.debug("LLM cache hit")
+            return cached
+    try:
+        with tracer.span("completion", "llm", model=model, prompt_chars=len(prompt)):
+            text: str = (backend or _openai_backend)(prompt, model, params)
     except Exception as e:
         logger.error(f"Error in LLM response: {str(e)}")
         return "Mock LLM response"
+    if use_cache:
+        cache.set(key, text)
+    return text
@@ -1,19 +1,132 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
+from typing import Dict, Any, Optional
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; structured fields passed via ``extra`` are kept."""
+    _reserved = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in self._reserved})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class TracebackQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps the traceback in ``exc_text`` instead of folding it into the message.
+
+    The stock ``prepare`` merges the formatted traceback into ``msg`` and clears
+    ``exc_info``, which leaves file formatters nothing to put in a field of its own.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+class Summary:
+    """Lazily rendered, size-bounded view of a large payload for log messages.
+
+    Nothing is rendered unless the record is actually emitted, and the rendered
+    text is capped, so logging a whole state dict stays cheap.
+    """
+    def __init__(self, payload: Any, max_items: int = 5, max_chars: int = 300) -> None:
+        self.payload: Any = payload
+        self.max_items: int = max_items
+        self.max_chars: int = max_chars
+
+    def _shape(self, value: Any, depth: int = 0) -> Any:
+        if hasattr(value, "dict") and callable(value.dict):
+            value = value.dict()
+        if isinstance(value, dict):
+            if depth >= 2:
+                return f"<dict {len(value)} keys>"
+            items = list(value.items())
+            shaped = {str(k): self._shape(v, depth + 1) for k, v in items[:self.max_items]}
+            if len(items) > self.max_items:
+                shaped["..."] = f"{len(items) - self.max_items} more keys"
+            return shaped
+        if isinstance(value, (list, tuple, set)):
+            if depth >= 2:
+                return f"<{type(value).__name__} {len(value)} items>"
+            items = list(value)
+            shaped = [self._shape(v, depth + 1) for v in items[:self.max_items]]
+            if len(items) > self.max_items:
+                shaped.append(f"... {len(items) - self.max_items} more items")
+            return shaped
+        return value
+
+    def __str__(self) -> str:
+        text: str = json.dumps(self._shape(self.payload), default=str)
+        return text if len(text) <= self.max_chars else f"{text[:self.max_chars]}... ({len(text)} chars)"
+
+    __repr__ = __str__
+
+def summarize(payload: Any, max_items: int = 5, max_chars: int = 300) -> Summary:
+    return Summary(payload, max_items, max_chars)
+
+def _level(value: Optional[str], default: int) -> int:
+    level = logging.getLevelName(value.upper()) if value else default
+    return level if isinstance(level, int) else default
+
+def configure_logging(config: Optional[Dict[str, Any]] = None) -> None:
+    """Apply levels from the ``logging`` block of the UI config; environment variables win."""
+    config = config or {}
+    logger = setup_logger()
+    logger.setLevel(_level(os.getenv("AUTOTEST_LOG_LEVEL") or config.get("level"), logging.INFO))
+    for handler in logger.handlers:
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.handlers.QueueHandler):
+            handler.setLevel(_level(os.getenv("AUTOTEST_CONSOLE_LOG_LEVEL") or config.get("console_level"), logging.INFO))
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 def setup_logger() -> logging.Logger:
+    global _listener
     logger = logging.getLogger("autotest_agent")
     if not logger.handlers:
-        logger.setLevel(logging.DEBUG)  # Set to DEBUG for detailed tracing
+        logger.setLevel(_level(os.getenv("AUTOTEST_LOG_LEVEL"), logging.INFO))
+        logger.propagate = False
         os.makedirs("logs", exist_ok=True)  # Create logs directory
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        handler = logging.FileHandler(f"logs/autotest_log_{timestamp}.log")
-        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        text_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        # File writes happen on a listener thread; callers only enqueue the record
+        file_handler = logging.FileHandler(f"logs/autotest_log_{timestamp}.log")
+        if os.getenv("AUTOTEST_LOG_FORMAT", "json").lower() == "json":
+            file_handler.setFormatter(JsonFormatter())
+        else:
+            file_handler.setFormatter(text_formatter)
+        log_queue: queue.Queue = queue.Queue(-1)
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop_listener)
+        logger.addHandler(TracebackQueueHandler(log_queue))
         # Add console handler for immediate feedback
         console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
+        console_handler.setLevel(_level(os.getenv("AUTOTEST_CONSOLE_LOG_LEVEL"), logging.INFO))
+        console_handler.setFormatter(text_formatter)
         logger.addHandler(console_handler)
-    return logger
\ No newline at end of file
+    return logger
@@ -0,0 +1,113 @@
+from tools.logger import setup_logger
+import glob
+import multiprocessing
+import os
+import re
+import threading
+from typing import Dict, Any, List, Optional
+
+logger = setup_logger()
+
+HAR_MODES: List[str] = ["off", "record", "replay", "auto"]
+
+class NetworkRouter:
+    """Request routing applied to every browser context the executor opens.
+
+    Requests whose resource type (``image``, ``font``, ``media``, ...) or URL
+    glob is blocked are aborted before they leave the browser. With a HAR mode
+    set, ``record`` saves each context's traffic to ``har_dir`` and ``replay``
+    serves requests from the recorded HARs, aborting anything not recorded so
+    runs never touch the network; ``auto`` replays when recordings exist and
+    records otherwise. Before recording, the coordinating process calls
+    ``prepare_recording()`` once; worker processes only add files.
+    """
+    def __init__(self, block_resource_types: Optional[List[str]] = None, block_url_patterns: Optional[List[str]] = None,
+                 har_mode: str = "off", har_dir: str = os.path.join("data", "har"),
+                 har_url_filter: Optional[str] = None) -> None:
+        if har_mode not in HAR_MODES:
+            raise ValueError(f"Unknown HAR mode '{har_mode}', expected one of {HAR_MODES}")
+        self.block_resource_types: List[str] = block_resource_types or []
+        self.block_url_patterns: List[str] = block_url_patterns or []
+        self.har_dir: str = har_dir
+        self.har_url_filter: Optional[str] = har_url_filter
+        if har_mode == "auto":
+            har_mode = "replay" if self.recordings() else "record"
+        self.har_mode: str = har_mode
+        if har_mode == "replay" and not self.recordings():
+            logger.warning(f"HAR replay requested but no recordings in {har_dir}; every request will be aborted")
+        self.blocked: int = 0
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, ui_config: Dict[str, Any]) -> "NetworkRouter":
+        network: Dict[str, Any] = ui_config.get("network", {})
+        har: Dict[str, Any] = network.get("har", {})
+        return cls(
+            block_resource_types=network.get("block_resource_types", []),
+            block_url_patterns=network.get("block_url_patterns", []),
+            har_mode=har.get("mode", "off"),
+            har_dir=har.get("dir", os.path.join("data", "har")),
+            har_url_filter=har.get("url_filter")
+        )
+
+    @property
+    def active(self) -> bool:
+        return bool(self.block_resource_types or self.block_url_patterns or self.har_mode != "off")
+
+    def context_options(self) -> Dict[str, Any]:
+        # Service workers fetch outside page routing, which would defeat both blocking and replay
+        return {"service_workers": "block"} if self.active else {}
+
+    def recordings(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.har_dir, "*.har")))
+
+    def prepare_recording(self) -> None:
+        """Remove the previous recording so a new one does not mix with it; only ``*.har`` files are touched."""
+        if self.har_mode != "record":
+            return
+        os.makedirs(self.har_dir, exist_ok=True)
+        for har_path in self.recordings():
+            os.remove(har_path)
+
+    def _record_path(self, key: str) -> str:
+        with self._lock:
+            index: int = self._counters.get(key, 0)
+            self._counters[key] = index + 1
+        name: str = re.sub(r"[^A-Za-z0-9_.-]+", "_", key)
+        if multiprocessing.parent_process() is not None:
+            name = f"{name}_{os.getpid()}"  # Worker processes record the same keys side by side
+        os.makedirs(self.har_dir, exist_ok=True)
+        return os.path.join(self.har_dir, f"{name}_{index}.har")
+
+    async def _block(self, route: Any) -> None:
+        if route.request.resource_type in self.block_resource_types:
+            self.blocked += 1
+            await route.abort("blockedbyclient")
+        else:
+            await route.fallback()
+
+    async def _abort(self, route: Any) -> None:
+        self.blocked += 1
+        await route.abort("blockedbyclient")
+
+    async def apply(self, context: Any, key: str = "page") -> None:
+        """Install the routes on ``context``; ``key`` names the HAR file recorded for it."""
+        if not self.active:
+            return
+        try:
+            # Routes registered later take precedence, so the HAR routes go first and blocking last
+            if self.har_mode == "replay":
+                await context.route("**/*", self._abort)  # Anything not in a recording stays offline
+                for har_path in self.recordings():
+                    await context.route_from_har(har_path, url=self.har_url_filter, not_found="fallback")
+            elif self.har_mode == "record":
+                await context.route_from_har(self._record_path(key), url=self.har_url_filter, update=True,
+                                             update_content="embed", update_mode="minimal")
+            if self.block_resource_types:
+                await context.route("**/*", self._block)
+            for pattern in self.block_url_patterns:
+                await context.route(pattern, self._abort)
+        except Exception as e:
+            logger.error(f"Error applying network routes: {str(e)}")
+            raise
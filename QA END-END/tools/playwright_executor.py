@@ -1,51 +1,136 @@
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from tools.crawler import Crawler
+from tools.impact_index import flow_test_id
 from tools.logger import setup_logger
-from tools.retry_handler import RetryHandler
+from tools.network_router import NetworkRouter
+from tools.retry_handler import RetryHandler, RetryPolicy
+from tools.tracer import tracer
+from contextlib import asynccontextmanager
+import os
 
 logger = setup_logger()
-retry_handler = RetryHandler()
+# Shared by every executor so the retry budget and circuit breaker span the whole run
+retry_handler = RetryHandler(policies={PlaywrightTimeoutError: RetryPolicy(max_retries=2, delay=0.5)})
 
 class PlaywrightExecutor:
-    def __init__(self, ui_config):
+    def __init__(self, ui_config, browser_pool=None):
         self.ui_config = ui_config
+        self.browser_pool = browser_pool
+        self.network_router = NetworkRouter.from_config(ui_config)
+        self.storage_state = None  # Session state file injected into every new context
 
-    @retry_handler.retry
-    async def execute_flow(self, flow):
-        try:
-            async with async_playwright() as p:
+    def _context_options(self, use_session=True):
+        options = self.network_router.context_options()
+        if self.storage_state and use_session:
+            options["storage_state"] = self.storage_state
+        return options
+
+    @asynccontextmanager
+    async def _new_page(self, key="crawl", use_session=True):
+        # Pooled path: fresh context on a shared browser. Fallback: one-off browser.
+        # key names the HAR recorded for this page when the router is recording;
+        # use_session=False opens the context without the shared session state.
+        if self.browser_pool is not None:
+            async with self.browser_pool.context(**self._context_options(use_session)) as context:
+                with tracer.span("new_page", "playwright", pooled=True):
+                    await self.network_router.apply(context, key)
+                    page = await context.new_page()
+                yield page
+            return
+        async with async_playwright() as p:
+            with tracer.span("launch_browser", "playwright"):
                 browser = await p.chromium.launch()
-                page = await browser.new_page()
-                if "yourapp.com" in self.ui_config.get("url", ""):
-                    logger.warning("Placeholder URL detected. Using mock execution.")
-                    return {"status": "mocked"}
-                
-                await page.goto(self.ui_config["url"])
-                for action in flow["actions"]:
-                    if action["type"] == "click":
-                        await page.click(action["selector"])
-                    elif action["type"] == "fill":
-                        await page.fill(action["selector"], action["value"])
-                result = {"status": "completed"}
+            try:
+                with tracer.span("new_page", "playwright", pooled=False):
+                    page = await browser.new_page(**self._context_options(use_session))
+                    await self.network_router.apply(page.context, key)
+                yield page
+            finally:
                 await browser.close()
+
+    @retry_handler.retry
+    async def execute_flow(self, flow, screenshot_path=None, step_screenshots=False):
+        # Screenshots are captured from the same page that ran the actions, so they
+        # show the post-flow state and need no second navigation.
+        try:
+            if "yourapp.com" in self.ui_config.get("url", ""):
+                logger.warning("Placeholder URL detected. Using mock execution.")
+                result = {"status": "mocked", "screenshots": [], "steps": []}
+                if screenshot_path:
+                    with open(screenshot_path, "w") as f:
+                        f.write("Mock screenshot")
+                    result["screenshots"].append(screenshot_path)
+                return result
+            async with self._new_page(flow_test_id(flow), flow.get("use_session", True)) as page:
+                with tracer.span("goto", "playwright", url=self.ui_config["url"], page=flow.get("page")):
+                    await page.goto(self.ui_config["url"])
+                steps = []
+                for i, action in enumerate(flow["actions"]):
+                    await self._perform(page, action)
+                    step = {"action": action, "url": page.url}
+                    if step_screenshots and screenshot_path:
+                        step["screenshot"] = self._step_path(screenshot_path, i + 1)
+                        with tracer.span("screenshot", "playwright"):
+                            await page.screenshot(path=step["screenshot"])
+                    steps.append(step)
+                result = {"status": "completed", "screenshots": [], "steps": steps, "final_url": page.url}
+                if screenshot_path:
+                    with tracer.span("screenshot", "playwright"):
+                        await page.screenshot(path=screenshot_path)
+                    result["screenshots"].append(screenshot_path)
+                    logger.info(f"Screenshot saved at {screenshot_path}")
                 return result
         except Exception as e:
             logger.error(f"Error executing Playwright flow: {str(e)}")
             raise
 
+    @staticmethod
+    async def _perform(page, action):
+        with tracer.span(action["type"], "playwright", selector=action.get("selector")):
+            if action["type"] == "click":
+                await page.click(action["selector"])
+            elif action["type"] == "fill":
+                await page.fill(action["selector"], action["value"])
+
     @retry_handler.retry
-    async def take_screenshot(self, path):
+    async def run_setup(self, flows, state_file):
+        # Setup flows share one context so the session they build up is what gets saved
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch()
-                page = await browser.new_page()
-                if "yourapp.com" in self.ui_config.get("url", ""):
-                    logger.warning("Placeholder URL detected. Saving mock screenshot.")
-                    with open(path, "w") as f:
-                        f.write("Mock screenshot")
-                    return
-                await page.goto(self.ui_config["url"])
-                await page.screenshot(path=path)
-                await browser.close()
+            if "yourapp.com" in self.ui_config.get("url", ""):
+                logger.warning("Placeholder URL detected. Saving empty session state.")
+                with open(state_file, "w") as f:
+                    f.write('{"cookies": [], "origins": []}')
+                return
+            async with self._new_page("session_setup") as page:
+                for flow in flows:
+                    with tracer.span("goto", "playwright", url=self.ui_config["url"], page=flow.get("page")):
+                        await page.goto(self.ui_config["url"])
+                    for action in flow["actions"]:
+                        await self._perform(page, action)
+                await page.context.storage_state(path=state_file)
+                logger.info(f"Session state saved at {state_file}")
+        except Exception as e:
+            logger.error(f"Error running session setup flows: {str(e)}")
+            raise
+
+    @staticmethod
+    def _step_path(screenshot_path, step):
+        root, ext = os.path.splitext(screenshot_path)
+        return f"{root}_action_{step}{ext or '.png'}"
+
+    @retry_handler.retry
+    async def take_screenshot(self, path, url=None):
+        try:
+            if "yourapp.com" in self.ui_config.get("url", ""):
+                logger.warning("Placeholder URL detected. Saving mock screenshot.")
+                with open(path, "w") as f:
+                    f.write("Mock screenshot")
+                return
+            async with self._new_page("screenshot") as page:
+                with tracer.span("goto", "playwright", url=url or self.ui_config["url"]):
+                    await page.goto(url or self.ui_config["url"])
+                with tracer.span("screenshot", "playwright"):
+                    await page.screenshot(path=path)
                 logger.info(f"Screenshot saved at {path}")
         except Exception as e:
             logger.error(f"Error taking screenshot: {str(e)}")
@@ -54,48 +139,28 @@ class PlaywrightExecutor:
     @retry_handler.retry
     async def crawl(self, max_depth):
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch()
-                page = await browser.new_page()
-                if "yourapp.com" in self.ui_config.get("url", ""):
-                    logger.warning("Placeholder URL detected. Using mock crawl.")
-                    return [
-                        {
-                            "page": f"mock_page_{i}",
-                            "actions": [{"type": "click", "selector": f"mock_selector_{i}"}],
-                            "expected_result": {"status": "mocked"}
-                        } for i in range(1, 3)
-                    ]
-                
-                results = []
-                visited = set()
-                queue = [(self.ui_config["url"], [], 0)]
-                
-                while queue and len(results) < 10:  # Limit to 10 pages for performance
-                    url, actions, depth = queue.pop(0)
-                    if url in visited or depth > max_depth:
-                        continue
-                    visited.add(url)
-                    
-                    try:
-                        await page.goto(url, timeout=10000)
-                        elements = await page.query_selector_all("a, button")
-                        for element in elements[:3]:  # Limit to 3 elements per page
-                            selector = await element.get_attribute("id") or await element.get_attribute("class") or "unknown"
-                            results.append({
-                                "page": url,
-                                "actions": actions + [{"type": "click", "selector": selector}],
-                                "expected_result": {"status": "navigated"}
-                            })
-                            href = await element.get_attribute("href")
-                            if href and depth + 1 <= max_depth:
-                                queue.append((href, actions + [{"type": "click", "selector": selector}], depth + 1))
-                    except Exception as e:
-                        logger.warning(f"Error crawling {url}: {str(e)}")
-                
-                await browser.close()
-                logger.info(f"Crawl completed, found {len(results)} pages")
-                return results
+            if "yourapp.com" in self.ui_config.get("url", ""):
+                logger.warning("Placeholder URL detected. Using mock crawl.")
+                return [
+                    {
+                        "page": f"mock_page_{i}",
+                        "actions": [{"type": "click", "selector": f"mock_selector_{i}"}],
+                        "expected_result": {"status": "mocked"}
+                    } for i in range(1, 3)
+                ]
+            crawler = Crawler.from_config(self._new_page, self.ui_config, max_depth)
+            return await crawler.crawl(self.ui_config["url"])
         except Exception as e:
             logger.error(f"Error in crawl: {str(e)}")
+            raise
+
+    @retry_handler.retry
+    async def crawl_page(self, url, actions, depth, root, max_depth):
+        # One frontier entry of a crawl coordinated across worker processes
+        try:
+            crawler = Crawler.from_config(self._new_page, self.ui_config, max_depth)
+            async with self._new_page("crawl") as page:
+                return await crawler.visit(page, url, actions, depth, root)
+        except Exception as e:
+            logger.error(f"Error crawling page {url}: {str(e)}")
             raise
\ No newline at end of file
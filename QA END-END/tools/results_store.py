@@ -0,0 +1,184 @@
+from tools.logger import setup_logger
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+logger = setup_logger()
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    test_type TEXT NOT NULL,
+    test_id TEXT NOT NULL,
+    passed INTEGER NOT NULL,
+    first_passed INTEGER,
+    duration REAL,
+    details TEXT,
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, test_type, test_id)
+);
+CREATE INDEX IF NOT EXISTS idx_results_test ON results (test_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_results_type ON results (run_id, test_type);
+"""
+
+class ResultsStore:
+    """SQLite-backed store of test results indexed by run ID, test ID and test type.
+
+    Stages append and query rows incrementally instead of rewriting one JSON
+    file, and every run is kept so pass/fail history can be queried per test.
+    Connections are opened per operation, so the store is safe to use from the
+    stage thread pool.
+    """
+    def __init__(self, db_path: str = os.path.join("results", "results.db")) -> None:
+        self.db_path: str = db_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns: List[str] = [row[1] for row in conn.execute("PRAGMA table_info(results)")]
+            if "first_passed" not in columns:
+                # Stores created before retries existed: their rows are all first attempts
+                conn.execute("ALTER TABLE results ADD COLUMN first_passed INTEGER")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Picklable for the stage process pool; the lock is per process anyway
+        return {"db_path": self.db_path}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.db_path = state["db_path"]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def start_run(self, run_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> str:
+        run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO runs (run_id, started_at, metadata) VALUES (?, ?, ?)",
+                         (run_id, datetime.now().isoformat(), json.dumps(metadata or {})))
+        logger.info(f"Results store run started: {run_id}")
+        return run_id
+
+    def add_results(self, run_id: str, test_type: str, results: List[Dict[str, Any]]) -> None:
+        """Insert or replace rows; ``first_passed`` (default: ``passed``) keeps the outcome before any retry."""
+        recorded_at: str = datetime.now().isoformat()
+        rows: List[Tuple[Any, ...]] = [
+            (run_id, test_type, result.get("test_id", "unknown"), int(bool(result.get("passed", False))),
+             int(bool(result.get("first_passed", result.get("passed", False)))),
+             result.get("duration"), json.dumps(result.get("details", {}), default=str), recorded_at)
+            for result in results
+        ]
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO results (run_id, test_type, test_id, passed, first_passed, duration, details, "
+                "recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def iter_results(self, run_id: str, test_type: Optional[str] = None,
+                     passed: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        query: str = "SELECT test_type, test_id, passed, duration, details FROM results WHERE run_id = ?"
+        params: List[Any] = [run_id]
+        if test_type is not None:
+            query += " AND test_type = ?"
+            params.append(test_type)
+        if passed is not None:
+            query += " AND passed = ?"
+            params.append(int(passed))
+        with self._connect() as conn:
+            for row_type, test_id, row_passed, duration, details in conn.execute(query + " ORDER BY rowid", params):
+                yield {"test_type": row_type, "test_id": test_id, "passed": bool(row_passed),
+                       "duration": duration, "details": json.loads(details) if details else {}}
+
+    def summary(self, run_id: str, test_types: Optional[List[str]] = None) -> Dict[str, int]:
+        query: str = "SELECT COUNT(*), COALESCE(SUM(passed), 0) FROM results WHERE run_id = ?"
+        params: Tuple[Any, ...] = (run_id,)
+        if test_types is not None:
+            query += f" AND test_type IN ({', '.join('?' * len(test_types))})"
+            params += tuple(test_types)
+        with self._connect() as conn:
+            total, passed = conn.execute(query, params).fetchone()
+        return {"total_tests": total, "passed": passed, "failed": total - passed}
+
+    def last_run_id(self, before: Optional[str] = None) -> Optional[str]:
+        query: str = "SELECT run_id FROM runs"
+        params: Tuple[Any, ...] = ()
+        if before is not None:
+            query += " WHERE started_at < (SELECT started_at FROM runs WHERE run_id = ?)"
+            params = (before,)
+        with self._connect() as conn:
+            row = conn.execute(query + " ORDER BY started_at DESC LIMIT 1", params).fetchone()
+        return row[0] if row else None
+
+    def history(self, test_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent outcomes of one test across runs, newest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT r.run_id, r.passed, r.duration FROM results r JOIN runs ON runs.run_id = r.run_id "
+                "WHERE r.test_id = ? ORDER BY runs.started_at DESC LIMIT ?", (test_id, limit)
+            ).fetchall()
+        return [{"run_id": run_id, "passed": bool(passed), "duration": duration} for run_id, passed, duration in rows]
+
+    def pass_rates(self, last_runs: int = 20) -> Dict[str, Dict[str, Any]]:
+        """Per-test pass rate over the most recent ``last_runs`` runs, for trend queries."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT test_id, COUNT(*), SUM(passed), AVG(duration) FROM results WHERE run_id IN "
+                "(SELECT run_id FROM runs ORDER BY started_at DESC LIMIT ?) GROUP BY test_id", (last_runs,)
+            ).fetchall()
+        return {test_id: {"runs": runs, "passed": passed, "pass_rate": passed / runs, "avg_duration": avg}
+                for test_id, runs, passed, avg in rows}
+
+    def suite_rates(self, last_runs: int = 20) -> Dict[str, Dict[str, Any]]:
+        """Per test type: runs without any failure and average total duration over the recent runs."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT test_type, COUNT(*), SUM(clean), AVG(total) FROM (SELECT run_id, test_type, MIN(passed) AS clean, "
+                "SUM(duration) AS total FROM results WHERE run_id IN (SELECT run_id FROM runs ORDER BY started_at DESC "
+                "LIMIT ?) GROUP BY run_id, test_type) GROUP BY test_type", (last_runs,)
+            ).fetchall()
+        return {test_type: {"runs": runs, "passed": passed, "pass_rate": passed / runs, "avg_duration": avg}
+                for test_type, runs, passed, avg in rows}
+
+    def failed_tests(self, run_id: str) -> Dict[str, List[str]]:
+        """Failed test IDs of one run, grouped by test type."""
+        failed: Dict[str, List[str]] = {}
+        for result in self.iter_results(run_id, passed=False):
+            failed.setdefault(result["test_type"], []).append(result["test_id"])
+        return failed
+
+    def flaky_tests(self, last_runs: int = 20, min_flips: int = 2) -> Dict[str, Dict[str, Any]]:
+        """Tests whose first-attempt outcome flipped between pass and fail at least ``min_flips`` times over the recent runs.
+
+        First attempts are used so that a flaky test passing on retry keeps counting as flaky.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT r.test_id, COALESCE(r.first_passed, r.passed) FROM results r JOIN runs ON runs.run_id = r.run_id WHERE r.run_id IN "
+                "(SELECT run_id FROM runs ORDER BY started_at DESC LIMIT ?) ORDER BY r.test_id, runs.started_at", (last_runs,)
+            ).fetchall()
+        outcomes: Dict[str, List[bool]] = {}
+        for test_id, passed in rows:
+            outcomes.setdefault(test_id, []).append(bool(passed))
+        flaky: Dict[str, Dict[str, Any]] = {}
+        for test_id, history in outcomes.items():
+            flips: int = sum(1 for previous, current in zip(history, history[1:]) if previous != current)
+            if flips >= min_flips:
+                flaky[test_id] = {"runs": len(history), "flips": flips, "pass_rate": sum(history) / len(history)}
+        return flaky
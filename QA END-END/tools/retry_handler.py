@@ -1,22 +1,169 @@
 from tools.logger import setup_logger
+import asyncio
+import functools
+import random
 import time
+from typing import Dict, Any, Optional, Tuple, Type
 
 logger = setup_logger()
 
+class CircuitOpenError(Exception):
+    """Raised instead of calling the wrapped function while the circuit is open."""
+
+class RetryPolicy:
+    """Retry schedule for one exception class: exponential backoff with jitter."""
+    def __init__(self, max_retries: int = 3, delay: float = 1, backoff: float = 2.0,
+                 max_delay: float = 30, jitter: float = 0.5) -> None:
+        self.max_retries: int = max(1, max_retries)
+        self.delay: float = delay
+        self.backoff: float = backoff
+        self.max_delay: float = max_delay
+        self.jitter: float = jitter
+
+    def delay_for(self, attempt: int) -> float:
+        delay: float = min(self.max_delay, self.delay * (self.backoff ** attempt))
+        return delay * (1 + random.uniform(-self.jitter, self.jitter)) if self.jitter else delay
+
+class RetryBudget:
+    """Caps the total number of retries spent across a run."""
+    def __init__(self, max_retries: Optional[int] = None) -> None:
+        self.max_retries: Optional[int] = max_retries
+        self.spent: int = 0
+
+    def try_consume(self) -> bool:
+        if self.max_retries is not None and self.spent >= self.max_retries:
+            return False
+        self.spent += 1
+        return True
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets a single call probe again after reset_timeout."""
+    def __init__(self, failure_threshold: int = 10, reset_timeout: float = 30) -> None:
+        self.failure_threshold: int = max(1, failure_threshold)
+        self.reset_timeout: float = reset_timeout
+        self.failures: int = 0
+        self.opened_at: Optional[float] = None
+        self.probing: bool = False  # A half-open trial call is in flight
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        state: str = self.state
+        if state == "half_open":
+            if self.probing:
+                return False
+            self.probing = True
+        return state != "open"
+
+    def release_probe(self) -> None:
+        """End a probe that neither succeeded nor failed, e.g. it was cancelled, so another call may try."""
+        self.probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probing = False
+        # A failure while opened_at is set can only be a half-open probe, so re-open
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            logger.warning(f"Circuit breaker opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
 class RetryHandler:
-    def __init__(self, max_retries=3, delay=1):
-        self.max_retries = max_retries
-        self.delay = delay
+    """Async retry decorator with per-exception policies, a shared budget and a circuit breaker.
+
+    Exceptions listed in ``non_retryable`` fail on the first attempt. Otherwise the
+    most specific policy in ``policies`` (by MRO) applies, falling back to the
+    default policy. Waits use asyncio.sleep so other coroutines keep running.
+    """
+    def __init__(self, max_retries: int = 3, delay: float = 1, backoff: float = 2.0, max_delay: float = 30,
+                 jitter: float = 0.5, policies: Optional[Dict[Type[BaseException], RetryPolicy]] = None,
+                 non_retryable: Tuple[Type[BaseException], ...] = (ValueError, TypeError, KeyError, CircuitOpenError),
+                 budget: Optional[int] = None, failure_threshold: int = 10, reset_timeout: float = 30) -> None:
+        self.configure(max_retries=max_retries, delay=delay, backoff=backoff, max_delay=max_delay, jitter=jitter,
+                       policies=policies, non_retryable=non_retryable, budget=budget,
+                       failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+
+    def configure(self, max_retries: int = 3, delay: float = 1, backoff: float = 2.0, max_delay: float = 30,
+                  jitter: float = 0.5, policies: Optional[Dict[Type[BaseException], RetryPolicy]] = None,
+                  non_retryable: Tuple[Type[BaseException], ...] = (ValueError, TypeError, KeyError, CircuitOpenError),
+                  budget: Optional[int] = None, failure_threshold: int = 10, reset_timeout: float = 30) -> None:
+        """(Re)configure in place; resets the budget, breaker and metrics for a new run."""
+        self.max_retries: int = max_retries
+        self.delay: float = delay
+        self.default_policy = RetryPolicy(max_retries, delay, backoff, max_delay, jitter)
+        self.policies: Dict[Type[BaseException], RetryPolicy] = policies or {}
+        self.non_retryable: Tuple[Type[BaseException], ...] = non_retryable
+        self.budget = RetryBudget(budget)
+        self.circuit_breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    def configure_from(self, ui_config: Dict[str, Any]) -> None:
+        # Exception-class policies cannot be expressed in JSON, so keep the ones set in code
+        retry_config: Dict[str, Any] = dict(ui_config.get("retry", {}))
+        retry_config.setdefault("policies", self.policies)
+        retry_config.setdefault("non_retryable", self.non_retryable)
+        self.configure(**retry_config)
+
+    def policy_for(self, error: BaseException) -> Optional[RetryPolicy]:
+        if isinstance(error, self.non_retryable):
+            return None
+        for cls in type(error).__mro__:
+            if cls in self.policies:
+                return self.policies[cls]
+        return self.default_policy
+
+    def _metrics_for(self, name: str) -> Dict[str, Any]:
+        return self.metrics.setdefault(name, {"calls": 0, "attempts": 0, "retries": 0, "failures": 0, "retry_time": 0.0})
 
     def retry(self, func):
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            for attempt in range(self.max_retries):
+            stats: Dict[str, Any] = self._metrics_for(func.__name__)
+            stats["calls"] += 1
+            attempt: int = 0
+            while True:
+                probe: bool = self.circuit_breaker.state == "half_open"  # This attempt would be the trial call
+                if not self.circuit_breaker.allow():
+                    stats["failures"] += 1
+                    raise CircuitOpenError(f"Circuit open, not calling {func.__name__}")
+                stats["attempts"] += 1
                 try:
-                    return await func(*args, **kwargs)
+                    result = await func(*args, **kwargs)
+                    self.circuit_breaker.record_success()
+                    return result
                 except Exception as e:
                     logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
-                    if attempt == self.max_retries - 1:
+                    policy: Optional[RetryPolicy] = self.policy_for(e)
+                    if policy is None:
+                        logger.error(f"Non-retryable error in {func.__name__}: {type(e).__name__}")
+                        stats["failures"] += 1
+                        if probe:
+                            self.circuit_breaker.release_probe()
+                        raise
+                    self.circuit_breaker.record_failure()
+                    if attempt >= policy.max_retries - 1:
                         logger.error(f"Max retries reached for {func.__name__}")
+                        stats["failures"] += 1
+                        raise
+                    if not self.budget.try_consume():
+                        logger.error(f"Retry budget exhausted, giving up on {func.__name__}")
+                        stats["failures"] += 1
                         raise
-                    time.sleep(self.delay)
-        return wrapper
\ No newline at end of file
+                    delay: float = policy.delay_for(attempt)
+                    stats["retries"] += 1
+                    stats["retry_time"] += delay
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                except BaseException:
+                    if probe:
+                        self.circuit_breaker.release_probe()  # Cancelled mid-call
+                    raise
+        return wrapper
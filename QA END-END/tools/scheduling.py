@@ -0,0 +1,89 @@
+from tools.logger import setup_logger
+import asyncio
+import statistics
+import threading
+from typing import Dict, Any, List, Optional, Callable, Iterable
+
+logger = setup_logger()
+
+def cancel_pending(tasks: Iterable[asyncio.Task]) -> None:
+    """Cancel every unfinished task except the calling one, which would otherwise lose its own result."""
+    try:
+        current: Optional[asyncio.Task] = asyncio.current_task()
+    except RuntimeError:
+        current = None
+    for task in tasks:
+        if not task.done() and task is not current:
+            task.cancel()
+
+class FailurePriority:
+    """Orders tests so the likeliest failures per second of runtime run first.
+
+    ``rates`` maps a test (or suite) ID to ``{"runs", "passed", "avg_duration"}``
+    as returned by ``ResultsStore.pass_rates``/``suite_rates``. The failure
+    probability is Laplace-smoothed, so a test without history counts as a coin
+    flip; a missing duration falls back to the median of the known ones.
+    """
+    def __init__(self, rates: Dict[str, Dict[str, Any]], min_duration: float = 0.01) -> None:
+        self.rates: Dict[str, Dict[str, Any]] = rates
+        self.min_duration: float = min_duration
+        durations: List[float] = [rate["avg_duration"] for rate in rates.values() if rate.get("avg_duration")]
+        self.default_duration: float = statistics.median(durations) if durations else 1.0
+
+    def failure_probability(self, test_id: str) -> float:
+        rate: Dict[str, Any] = self.rates.get(test_id, {})
+        runs: int = rate.get("runs", 0)
+        return (runs - rate.get("passed", 0) + 1) / (runs + 2)
+
+    def expected_duration(self, test_id: str) -> float:
+        return max(self.rates.get(test_id, {}).get("avg_duration") or self.default_duration, self.min_duration)
+
+    def score(self, test_id: str) -> float:
+        return self.failure_probability(test_id) / self.expected_duration(test_id)
+
+    def order(self, test_ids: List[str]) -> List[int]:
+        """Indices of ``test_ids`` by descending score; ties keep their configured order."""
+        return sorted(range(len(test_ids)), key=lambda i: -self.score(test_ids[i]))
+
+class FailFast:
+    """Failure budget shared by the pipeline's test stages.
+
+    Once ``max_failures`` failures have been recorded the budget trips and every
+    registered callback runs once, cancelling whatever work is still queued or
+    running. ``max_failures=0`` disables it.
+    """
+    def __init__(self, max_failures: int = 0) -> None:
+        self.max_failures: int = max(0, max_failures)
+        self.failures: int = 0
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_failures > 0
+
+    @property
+    def tripped(self) -> bool:
+        return self.enabled and self.failures >= self.max_failures
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return max(self.max_failures - self.failures, 0) if self.enabled else None
+
+    def on_trip(self, callback: Callable[[], None]) -> None:
+        self._callbacks.append(callback)
+        if self.tripped:
+            callback()
+
+    def record(self, failures: int = 1) -> bool:
+        if not self.enabled or failures <= 0:
+            return self.tripped
+        with self._lock:
+            was_tripped: bool = self.tripped
+            self.failures += failures
+            trips: bool = self.tripped and not was_tripped
+        if trips:
+            logger.warning(f"Fail-fast: {self.failures} failures reached the limit of {self.max_failures}, cancelling remaining tests")
+            for callback in self._callbacks:
+                callback()
+        return self.tripped
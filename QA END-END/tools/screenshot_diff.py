@@ -1,24 +1,279 @@
 from PIL import Image
 import imagehash
+import numpy as np
 from tools.logger import setup_logger
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
 import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = setup_logger()
 
+def _hash_file(path: str) -> str:
+    # Module level so it can be shipped to a process pool
+    with Image.open(path) as img:
+        return str(imagehash.average_hash(img))
+
+def _load_rgb(path: str) -> np.ndarray:
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGB"))
+
+def heatmap_path(screenshot_path: str) -> str:
+    root, _ = os.path.splitext(screenshot_path)
+    return f"{root}_diff.png"
+
+def _tile_sums(band: np.ndarray, cols: int, tile_size: int) -> np.ndarray:
+    # Sum of each tile_size-wide column block of a band, zero-padding the last partial tile
+    padded: np.ndarray = np.zeros((band.shape[0], cols * tile_size), dtype=np.float32)
+    padded[:, :band.shape[1]] = band
+    return padded.reshape(band.shape[0], cols, tile_size).sum(axis=(0, 2))
+
+def pixel_diff(screenshot_path: str, reference_path: str, tile_size: int = 32, tile_threshold: float = 0.02,
+               max_failed_tiles: int = 0, ignore_regions: Optional[List[List[int]]] = None,
+               write_heatmap: bool = True, reference: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Tile-by-tile pixel diff of two screenshots.
+
+    Each tile scores the mean per-pixel difference (max over RGB channels,
+    0..1); a tile fails above ``tile_threshold``. Tile rows are processed as
+    vectorised bands and the scan stops once more than ``max_failed_tiles``
+    tiles have failed. ``ignore_regions`` are ``[x, y, width, height]``
+    rectangles zeroed out before scoring, e.g. timestamps or ads.
+    """
+    captured: np.ndarray = _load_rgb(screenshot_path)
+    reference = _load_rgb(reference_path) if reference is None else reference
+    if captured.shape != reference.shape:
+        return {"passed": False, "failed_tiles": -1, "reason": f"Size mismatch {captured.shape[:2]} vs {reference.shape[:2]}"}
+
+    height, width = captured.shape[:2]
+    mask: Optional[np.ndarray] = None
+    if ignore_regions:
+        mask = np.ones((height, width), dtype=bool)
+        for x, y, w, h in ignore_regions:
+            mask[max(0, y):max(0, y + h), max(0, x):max(0, x + w)] = False
+
+    rows: int = -(-height // tile_size)
+    cols: int = -(-width // tile_size)
+    scores: np.ndarray = np.zeros((rows, cols), dtype=np.float32)
+    failed: int = 0
+    for row in range(rows):
+        top: int = row * tile_size
+        band_a = captured[top:top + tile_size].astype(np.int16)
+        band_b = reference[top:top + tile_size].astype(np.int16)
+        diff: np.ndarray = np.abs(band_a - band_b).max(axis=2).astype(np.float32) / 255.0
+        band_height: int = diff.shape[0]
+        if mask is not None:
+            diff *= mask[top:top + tile_size]
+            counts: np.ndarray = _tile_sums(mask[top:top + tile_size].astype(np.float32), cols, tile_size)
+        else:
+            counts = band_height * np.minimum(tile_size, width - np.arange(cols) * tile_size)
+        # Mean over each tile's visible pixels, so edge tiles and partly ignored tiles are not
+        # diluted; fully ignored tiles score 0 and cannot fail
+        scores[row] = np.divide(_tile_sums(diff, cols, tile_size), counts, out=np.zeros(cols, dtype=np.float32),
+                                where=counts > 0)
+        failed += int((scores[row] > tile_threshold).sum())
+        if failed > max_failed_tiles:
+            break
+
+    result: Dict[str, Any] = {"passed": failed <= max_failed_tiles, "failed_tiles": failed}
+    if write_heatmap and failed:
+        heat: np.ndarray = np.kron(scores, np.ones((tile_size, tile_size), dtype=np.float32))[:height, :width]
+        overlay: np.ndarray = (captured.astype(np.float32) * 0.5)
+        overlay[..., 0] += np.clip(heat / max(tile_threshold, 1e-6), 0, 1) * 127.5
+        path: str = heatmap_path(screenshot_path)
+        Image.fromarray(overlay.astype(np.uint8)).save(path)
+        result["heatmap"] = path
+    return result
+
+class HashCache:
+    """Persistent perceptual-hash cache keyed by path, mtime and size."""
+    def __init__(self, cache_file: str = os.path.join(".cache", "screenshot_hashes.json")) -> None:
+        self.cache_file: str = cache_file
+        self._entries: Optional[Dict[str, str]] = None
+        self._dirty: bool = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: str) -> str:
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+    def _load(self) -> Dict[str, str]:
+        if self._entries is None:
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, path: str) -> Optional[str]:
+        with self._lock:
+            return self._load().get(self.key(path))
+
+    def set(self, path: str, value: str) -> None:
+        with self._lock:
+            self._load()[self.key(path)] = value
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+            tmp_file: str = self.cache_file + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+
 class ScreenshotDiff:
+    def __init__(self, threshold: int = 5, hash_cache: Optional[HashCache] = None, processes: int = 0,
+                 mode: str = "hash", pixel_options: Optional[Dict[str, Any]] = None, reference_cache_size: int = 8) -> None:
+        self.threshold: int = threshold
+        self.hash_cache: HashCache = hash_cache or HashCache()
+        self.processes: int = processes
+        self.mode: str = mode  # "hash" (global average_hash) or "pixel" (tile-by-tile diff)
+        self.pixel_options: Dict[str, Any] = pixel_options or {}
+        self.details: Dict[str, Dict[str, Any]] = {}  # Pixel-mode results keyed by screenshot path
+        self.reference_cache_size: int = max(0, reference_cache_size)
+        self._references: "OrderedDict[str, np.ndarray]" = OrderedDict()  # Decoded references, least recently used first
+
+    @classmethod
+    def from_config(cls, ui_config: Dict[str, Any]) -> "ScreenshotDiff":
+        diff_config: Dict[str, Any] = dict(ui_config.get("screenshot_diff", {}))
+        return cls(
+            threshold=ui_config.get("screenshot_threshold", 5),
+            processes=ui_config.get("screenshot_hash_processes", 0),
+            mode=diff_config.pop("mode", "hash"),
+            reference_cache_size=diff_config.pop("reference_cache_size", 8),
+            pixel_options=diff_config
+        )
+
+    def _pixel_options(self, ignore_regions: Optional[List[List[int]]]) -> Dict[str, Any]:
+        options: Dict[str, Any] = dict(self.pixel_options)
+        options["ignore_regions"] = list(options.get("ignore_regions", [])) + list(ignore_regions or [])
+        return options
+
+    def compare_pixels(self, screenshot_path: str, reference_path: str,
+                       ignore_regions: Optional[List[List[int]]] = None) -> bool:
+        try:
+            if not self._comparable(screenshot_path, reference_path):
+                logger.warning("Reference screenshot missing. Assuming test passed for mock execution.")
+                return True
+            result: Dict[str, Any] = pixel_diff(screenshot_path, reference_path, reference=self._reference(reference_path),
+                                                **self._pixel_options(ignore_regions))
+            self.details[screenshot_path] = result
+            logger.info(f"Pixel comparison result: {'Passed' if result['passed'] else 'Failed'} (failed tiles: {result['failed_tiles']})")
+            return result["passed"]
+        except Exception as e:
+            logger.error(f"Error comparing screenshots: {str(e)}")
+            return False
+
+    def _reference(self, reference_path: str) -> np.ndarray:
+        # Recently used references stay decoded so repeated pages decode them once
+        reference: Optional[np.ndarray] = self._references.get(reference_path)
+        if reference is None:
+            reference = _load_rgb(reference_path)
+            self._references[reference_path] = reference
+            while len(self._references) > self.reference_cache_size:
+                self._references.popitem(last=False)
+        else:
+            self._references.move_to_end(reference_path)
+        return reference
+
+    @staticmethod
+    def _comparable(screenshot_path: str, reference_path: str) -> bool:
+        return bool(reference_path) and os.path.exists(screenshot_path) and os.path.exists(reference_path)
+
+    def _reference_hash(self, reference_path: str) -> str:
+        cached: Optional[str] = self.hash_cache.get(reference_path)
+        if cached is None:
+            cached = _hash_file(reference_path)
+            self.hash_cache.set(reference_path, cached)
+        return cached
+
     def compare(self, screenshot_path, reference_path):
+        if self.mode == "pixel":
+            return self.compare_pixels(screenshot_path, reference_path)
         try:
-            if not os.path.exists(screenshot_path) or not reference_path or not os.path.exists(reference_path):
+            if not self._comparable(screenshot_path, reference_path):
                 logger.warning("Reference screenshot missing. Assuming test passed for mock execution.")
                 return True
-            
-            with Image.open(screenshot_path) as img1, Image.open(reference_path) as img2:
-                hash1 = imagehash.average_hash(img1)
-                hash2 = imagehash.average_hash(img2)
-                diff = hash1 - hash2
-                passed = diff < 5
-                logger.info(f"Screenshot comparison result: {'Passed' if passed else 'Failed'} (diff: {diff})")
-                return passed
+
+            hash1 = imagehash.hex_to_hash(_hash_file(screenshot_path))
+            hash2 = imagehash.hex_to_hash(self._reference_hash(reference_path))
+            self.hash_cache.save()
+            diff = hash1 - hash2
+            passed = diff < self.threshold
+            logger.info(f"Screenshot comparison result: {'Passed' if passed else 'Failed'} (diff: {diff})")
+            return passed
         except Exception as e:
             logger.error(f"Error comparing screenshots: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+    def compare_batch(self, pairs: List[Tuple[str, str]],
+                      ignore_regions: Optional[List[Optional[List[List[int]]]]] = None) -> List[bool]:
+        """Compare many (screenshot, reference) pairs at once.
+
+        Reference hashes come from the persistent cache where possible; every
+        remaining image is hashed once, spread across a process pool when
+        ``processes`` is set. In pixel mode each pair is tile-diffed instead.
+        """
+        if self.mode == "pixel":
+            regions: List[Optional[List[List[int]]]] = ignore_regions or [None] * len(pairs)
+            return [self.compare_pixels(s, r, regions[i]) for i, (s, r) in enumerate(pairs)]
+        try:
+            to_hash: List[str] = []
+            hashes: Dict[str, str] = {}
+            for screenshot_path, reference_path in pairs:
+                if not self._comparable(screenshot_path, reference_path):
+                    continue
+                to_hash.append(screenshot_path)
+                cached: Optional[str] = self.hash_cache.get(reference_path)
+                if cached is None:
+                    to_hash.append(reference_path)
+                else:
+                    hashes[reference_path] = cached
+            to_hash = list(dict.fromkeys(p for p in to_hash if p not in hashes))
+
+            if self.processes and len(to_hash) > 1:
+                # Spawned, not forked: this runs beside the log listener and Playwright threads
+                with ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+                    computed: List[Optional[str]] = list(pool.map(self._safe_hash, to_hash))
+            else:
+                computed = [self._safe_hash(path) for path in to_hash]
+            for path, value in zip(to_hash, computed):
+                if value is not None:
+                    hashes[path] = value
+
+            references = {reference for _, reference in pairs}
+            for path in to_hash:
+                if path in references and path in hashes:
+                    self.hash_cache.set(path, hashes[path])
+            self.hash_cache.save()
+
+            results: List[bool] = []
+            for screenshot_path, reference_path in pairs:
+                if not self._comparable(screenshot_path, reference_path):
+                    results.append(True)  # Same mock-friendly default as compare()
+                elif screenshot_path not in hashes or reference_path not in hashes:
+                    results.append(False)
+                else:
+                    diff = imagehash.hex_to_hash(hashes[screenshot_path]) - imagehash.hex_to_hash(hashes[reference_path])
+                    results.append(diff < self.threshold)
+            logger.info(f"Batch screenshot comparison: {sum(results)}/{len(results)} passed")
+            return results
+        except Exception as e:
+            logger.error(f"Error comparing screenshot batch: {str(e)}")
+            raise
+
+    @staticmethod
+    def _safe_hash(path: str) -> Optional[str]:
+        try:
+            return _hash_file(path)
+        except Exception as e:
+            logger.error(f"Error hashing screenshot {path}: {str(e)}")
+            return None
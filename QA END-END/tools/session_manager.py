@@ -0,0 +1,85 @@
+from tools.logger import setup_logger
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+logger = setup_logger()
+
+class SessionManager:
+    """Runs session setup flows (e.g. login) once and caches the browser storage state.
+
+    The Playwright storage state (cookies and localStorage) is written to
+    ``state_file`` with a sidecar holding its creation time and a fingerprint of
+    the setup flows and target URL. It is reused until ``ttl`` seconds have
+    passed or the setup flows change, then refreshed by running them again.
+    """
+    def __init__(self, state_file: str = os.path.join(".cache", "session", "storage_state.json"),
+                 ttl: float = 3600) -> None:
+        self.state_file: str = state_file
+        self.meta_file: str = f"{os.path.splitext(state_file)[0]}.meta.json"
+        self.ttl: float = ttl
+
+    @classmethod
+    def from_config(cls, ui_config: Dict[str, Any]) -> "SessionManager":
+        session_config: Dict[str, Any] = ui_config.get("session", {})
+        return cls(
+            state_file=session_config.get("storage_state", os.path.join(".cache", "session", "storage_state.json")),
+            ttl=session_config.get("ttl", 3600)
+        )
+
+    @staticmethod
+    def setup_flows(ui_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [flow for flow in ui_config.get("flows", []) if flow.get("setup")]
+
+    @staticmethod
+    def fingerprint(url: str, setup_flows: List[Dict[str, Any]]) -> str:
+        payload: str = json.dumps({"url": url, "flows": setup_flows}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def cached_state(self, fingerprint: str) -> Optional[str]:
+        """Path of the stored state if it is still fresh and was produced by the same setup flows."""
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                meta: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(self.state_file) or meta.get("fingerprint") != fingerprint:
+            return None
+        if time.time() - meta.get("created", 0) > self.ttl:
+            logger.info("Cached session expired")
+            return None
+        return self.state_file
+
+    def invalidate(self) -> None:
+        for path in (self.state_file, self.meta_file):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    async def ensure(self, url: str, setup_flows: List[Dict[str, Any]],
+                     run_setup: Callable[[List[Dict[str, Any]], str], Awaitable[None]]) -> Dict[str, Any]:
+        """Return ``{"status": reused|refreshed|failed, "storage_state": path or None}``.
+
+        ``run_setup(flows, state_file)`` must run the flows in one browser
+        context and save its storage state to ``state_file``.
+        """
+        fingerprint: str = self.fingerprint(url, setup_flows)
+        cached: Optional[str] = self.cached_state(fingerprint)
+        if cached is not None:
+            logger.info(f"Reusing cached session from {cached}")
+            return {"status": "reused", "storage_state": cached}
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+            await run_setup(setup_flows, self.state_file)
+            with open(self.meta_file, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "fingerprint": fingerprint}, f)
+            logger.info(f"Session refreshed with {len(setup_flows)} setup flows")
+            return {"status": "refreshed", "storage_state": self.state_file}
+        except Exception as e:
+            # Later flows still run, just without a session
+            logger.error(f"Session setup failed: {str(e)}")
+            self.invalidate()
+            return {"status": "failed", "storage_state": None}
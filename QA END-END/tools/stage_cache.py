@@ -0,0 +1,116 @@
+from tools.disk_cache import evict
+from tools.logger import setup_logger
+from importlib import metadata
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+logger = setup_logger()
+
+CACHE_VERSION: int = 1
+TOOL_PACKAGES: List[str] = ["playwright", "pytest", "pytest-json-report", "pytest-cov", "langgraph", "openai",
+                            "Pillow", "imagehash", "numpy"]
+SOURCE_ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_environment: Optional[Dict[str, Any]] = None
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_digests(paths: List[str]) -> Dict[str, str]:
+    """Content hashes of the given files, and of every file below the given directories."""
+    digests: Dict[str, str] = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+                for name in sorted(names):
+                    digests[os.path.join(root, name)] = _sha256_file(os.path.join(root, name))
+        elif os.path.isfile(path):
+            digests[path] = _sha256_file(path)
+    return digests
+
+def environment() -> Dict[str, Any]:
+    """Tool versions and a digest of the agent's own sources; any change invalidates every entry."""
+    global _environment
+    if _environment is None:
+        packages: Dict[str, Optional[str]] = {}
+        for package in TOOL_PACKAGES:
+            try:
+                packages[package] = metadata.version(package)
+            except metadata.PackageNotFoundError:
+                packages[package] = None
+        sources: List[str] = [os.path.join(SOURCE_ROOT, name) for name in ("agents", "tools", "crewmaster.py", "tasks.py")]
+        source_digest: str = hashlib.sha256(json.dumps(
+            {os.path.relpath(path, SOURCE_ROOT): digest for path, digest in file_digests(sources).items()
+             if path.endswith(".py")}, sort_keys=True
+        ).encode("utf-8")).hexdigest()
+        _environment = {"cache_version": CACHE_VERSION, "python": sys.version, "packages": packages, "source": source_digest}
+    return _environment
+
+class StageCache:
+    """On-disk memoization of pipeline node outputs.
+
+    Entries are keyed by a hash of the node name, its inputs (config, PR diff,
+    upstream outputs, generated file contents) and ``environment()``. Files a
+    node produced are recorded with their hashes and a hit is only served if
+    they are all still in place unchanged. When the directory grows past
+    ``max_bytes`` the least recently written entries are evicted.
+    """
+    def __init__(self, cache_dir: str = os.path.join(".cache", "stages"), max_bytes: int = 200 * 1024 * 1024,
+                 enabled: bool = True) -> None:
+        self.cache_dir: str = cache_dir
+        self.max_bytes: int = max_bytes
+        self.enabled: bool = enabled
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, ui_config: Dict[str, Any], enabled: bool = True) -> "StageCache":
+        cache_config: Dict[str, Any] = ui_config.get("stage_cache", {})
+        return cls(
+            cache_dir=cache_config.get("dir", os.path.join(".cache", "stages")),
+            max_bytes=int(cache_config.get("max_mb", 200) * 1024 * 1024),
+            enabled=enabled and cache_config.get("enabled", True)
+        )
+
+    @staticmethod
+    def key(node: str, inputs: Dict[str, Any]) -> str:
+        payload: str = json.dumps({"node": node, "inputs": inputs, "environment": environment()}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        artifacts: Dict[str, str] = entry.get("artifacts", {})
+        if file_digests(list(artifacts)) != artifacts:
+            logger.debug(f"Stage cache entry {key[:12]} has missing or modified artifacts")
+            return None
+        return entry.get("output")
+
+    def set(self, key: str, output: Dict[str, Any], artifacts: Optional[List[str]] = None) -> None:
+        try:
+            with self._lock:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path: str = self._path(key) + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"created": time.time(), "output": output, "artifacts": file_digests(artifacts or [])},
+                              f, default=str)
+                os.replace(tmp_path, self._path(key))
+                evict(self.cache_dir, self.max_bytes)
+        except Exception as e:
+            # A cache write failure must not fail the stage that produced the output
+            logger.warning(f"Could not write stage cache entry: {str(e)}")
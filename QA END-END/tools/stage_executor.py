@@ -0,0 +1,94 @@
+from tools.logger import setup_logger
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Executor
+import asyncio
+import functools
+import os
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+logger = setup_logger()
+
+class StageExecutor:
+    """Moves blocking stage work off the event loop.
+
+    File and JSON work runs on a thread pool, CPU-heavy work on an optional
+    process pool (falling back to threads when ``processes`` is 0), and
+    subprocesses are awaited through asyncio instead of subprocess.run.
+    """
+    def __init__(self, threads: int = 4, processes: int = 0) -> None:
+        self.threads: int = max(1, threads)
+        self.processes: int = max(0, processes)
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_config(cls, ui_config: Dict[str, Any]) -> "StageExecutor":
+        pool_config: Dict[str, Any] = ui_config.get("stage_pool", {})
+        return cls(threads=pool_config.get("threads", 4), processes=pool_config.get("processes", 0))
+
+    def _threads(self) -> Executor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="stage")
+        return self._thread_pool
+
+    def _cpu(self) -> Executor:
+        if not self.processes:
+            return self._threads()
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.processes)
+        return self._process_pool
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._threads(), functools.partial(func, *args, **kwargs))
+
+    async def run_cpu(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        # func and its arguments must be picklable when a process pool is configured
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._cpu(), functools.partial(func, *args, **kwargs))
+
+    @staticmethod
+    async def _stream(process: asyncio.subprocess.Process, on_line: Callable[[str], None]) -> Tuple[bytes, bytes]:
+        # stdout is read in the calling task, so on_line sees it as asyncio.current_task() and
+        # cancel_pending from a fail-fast trip spares it; stderr drains alongside so a chatty
+        # process cannot block on a full pipe
+        lines: List[bytes] = []
+        stderr_task: asyncio.Task = asyncio.ensure_future(process.stderr.read())
+        try:
+            async for line in process.stdout:
+                lines.append(line)
+                on_line(line.decode(errors="replace").rstrip("\r\n"))
+            stderr: bytes = await stderr_task
+        finally:
+            stderr_task.cancel()
+        await process.wait()
+        return b"".join(lines), stderr
+
+    async def run_subprocess(self, cmd: List[str], env: Optional[Dict[str, str]] = None,
+                             on_line: Optional[Callable[[str], None]] = None) -> Tuple[int, str, str]:
+        """Run cmd to completion; ``on_line`` is called with each stdout line as it is printed."""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                env=env if env is not None else dict(os.environ)
+            )
+            try:
+                if on_line is not None:
+                    stdout, stderr = await self._stream(process, on_line)
+                else:
+                    stdout, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                process.kill()  # A cancelled stage must not leave its subprocess running
+                await process.wait()
+                raise
+            return process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+        except Exception as e:
+            logger.error(f"Error running subprocess {cmd[0]}: {str(e)}")
+            raise
+
+    def shutdown(self) -> None:
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
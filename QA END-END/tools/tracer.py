@@ -0,0 +1,122 @@
+from tools.logger import setup_logger
+from contextlib import contextmanager
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional, Iterator
+
+logger = setup_logger()
+
+class Tracer:
+    """Collects timing spans and writes them as a Chrome trace (chrome://tracing, Perfetto).
+
+    Spans are complete ("X") events. Concurrent asyncio tasks each get their own
+    track, so overlapping flows and pytest suites render side by side instead of
+    interleaving on one thread row. Worker processes ``drain`` their spans and
+    ship them to the coordinator, which ``merge``s them into its own trace.
+    """
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled: bool = enabled
+        self.events: List[Dict[str, Any]] = []
+        self._tracks: Dict[int, int] = {}
+        self._origin: float = time.perf_counter()
+        self._epoch: float = time.time()  # Wall clock at _origin; perf_counter is not comparable across processes
+        self._lock = threading.Lock()
+
+    def configure_from(self, ui_config: Dict[str, Any]) -> None:
+        self.enabled = ui_config.get("tracing", {}).get("enabled", True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.events = []
+            self._tracks = {}
+            self._origin = time.perf_counter()
+            self._epoch = time.time()
+
+    def now(self) -> float:
+        return time.perf_counter()
+
+    def _track(self) -> int:
+        try:
+            task: Optional[asyncio.Task] = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key: int = id(task) if task is not None else threading.get_ident()
+        if key not in self._tracks:
+            self._tracks[key] = len(self._tracks) + 1
+            name: str = task.get_name() if task is not None else threading.current_thread().name
+            self.events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": self._tracks[key],
+                                "args": {"name": name}})
+        return self._tracks[key]
+
+    def record(self, name: str, category: str, start: float, end: float, args: Optional[Dict[str, Any]] = None) -> None:
+        """Add a span from two ``now()`` readings, for work that a ``with`` block cannot wrap."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.events.append({
+                "name": name, "cat": category, "ph": "X", "pid": os.getpid(), "tid": self._track(),
+                "ts": round((start - self._origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+                "args": args or {}
+            })
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        # The yielded dict can be filled in by the caller, e.g. with a status code
+        start: float = self.now()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(name, category, start, self.now(), args)
+
+    def drain(self) -> Dict[str, Any]:
+        """Hand over the events recorded so far and forget them, for shipping to another process."""
+        with self._lock:
+            events, self.events = self.events, []
+        return {"epoch": self._epoch, "events": events}
+
+    def merge(self, batch: Optional[Dict[str, Any]]) -> None:
+        """Add events drained from another process's tracer, shifted onto this trace's clock."""
+        if not self.enabled or not batch or not batch.get("events"):
+            return
+        shift: float = (batch["epoch"] - self._epoch) * 1e6
+        with self._lock:
+            self.events.extend(dict(event, ts=round(event["ts"] + shift, 1)) if "ts" in event else event
+                               for event in batch["events"])
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Count, total, mean and max duration (seconds) per category and span name, slowest first."""
+        grouped: Dict[tuple, List[float]] = {}
+        with self._lock:
+            for event in self.events:
+                if event["ph"] == "X":
+                    grouped.setdefault((event["cat"], event["name"]), []).append(event["dur"] / 1e6)
+        rows: List[Dict[str, Any]] = [
+            {"category": category, "name": name, "count": len(durations), "total": round(sum(durations), 3),
+             "mean": round(sum(durations) / len(durations), 3), "max": round(max(durations), 3)}
+            for (category, name), durations in grouped.items()
+        ]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def write(self, trace_file: str = os.path.join("results", "trace.json")) -> Optional[str]:
+        if not self.enabled:
+            return None
+        try:
+            os.makedirs(os.path.dirname(trace_file) or ".", exist_ok=True)
+            with self._lock:
+                trace: Dict[str, Any] = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+            with open(trace_file, "w", encoding="utf-8") as f:
+                json.dump(trace, f)
+            logger.info(f"Trace with {len(trace['traceEvents'])} events written to {trace_file}")
+            return trace_file
+        except Exception as e:
+            logger.error(f"Error writing trace file: {str(e)}")
+            raise
+
+# Shared by every stage so one run produces one trace
+tracer = Tracer()
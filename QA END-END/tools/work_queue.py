@@ -0,0 +1,61 @@
+import multiprocessing
+import queue
+from typing import Dict, Any, Optional, Protocol
+
+class WorkQueue(Protocol):
+    """Task distribution between a coordinator and worker processes.
+
+    ``LocalWorkQueue`` is the in-machine implementation; a broker-backed one
+    (Redis, SQS, ...) only has to provide these methods to shard work across
+    hosts instead.
+    """
+    def submit(self, task: Dict[str, Any]) -> None:
+        ...
+
+    def next_task(self) -> Optional[Dict[str, Any]]:
+        """Block until a task is available; ``None`` tells the caller to stop."""
+        ...
+
+    def report(self, message: Dict[str, Any]) -> None:
+        ...
+
+    def next_result(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next worker message, or ``None`` if none arrived within ``timeout``."""
+        ...
+
+    def shutdown(self, consumers: int) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+class LocalWorkQueue:
+    """WorkQueue over two multiprocessing queues; picklable, so it can be handed to worker processes."""
+    def __init__(self, context: Optional[Any] = None) -> None:
+        context = context or multiprocessing.get_context("spawn")
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+
+    def submit(self, task: Dict[str, Any]) -> None:
+        self._tasks.put(task)
+
+    def next_task(self) -> Optional[Dict[str, Any]]:
+        return self._tasks.get()
+
+    def report(self, message: Dict[str, Any]) -> None:
+        self._results.put(message)
+
+    def next_result(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def shutdown(self, consumers: int) -> None:
+        for _ in range(consumers):
+            self._tasks.put(None)
+
+    def close(self) -> None:
+        for q in (self._tasks, self._results):
+            q.close()
+            q.cancel_join_thread()